@@ -0,0 +1,3 @@
+# Benchmarks de rendimiento. Se ejecutan desde la raíz del repositorio, p. ej.:
+#   python -m benchmarks.bench_plantillas
+#   python -m benchmarks.suite --rapido
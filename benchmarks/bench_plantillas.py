@@ -0,0 +1,38 @@
+import random
+import statistics
+import time
+
+from benchmarks.datos_sinteticos import datos_vigas, datos_rubrica, rubrica_sintetica
+from nucleo.reportes import generar_pdf, generar_reporte_dinamico_pdf
+
+# Latencia por reporte con y sin plantilla precompilada:
+#   python -m benchmarks.bench_plantillas
+
+
+def medir(funcion, datos, repeticiones):
+    funcion(datos[0])  # calentamiento (compila la plantilla si aplica)
+    tiempos = []
+    for i in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(datos[i % len(datos)])
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos) * 1000
+
+
+def main(repeticiones=300):
+    rng = random.Random(0)
+    casos = [("Taller de Vigas", generar_pdf, [datos_vigas(i, rng) for i in range(50)])]
+    for n_preguntas, n_sub_items in [(4, 3), (6, 4)]:
+        rubrica = rubrica_sintetica(n_preguntas, n_sub_items)
+        casos.append((f"Rúbrica {n_preguntas}x{n_sub_items}", generar_reporte_dinamico_pdf,
+                      [datos_rubrica(i, rubrica, rng) for i in range(50)]))
+
+    print(f"{'reporte':<20}{'sin plantilla (ms)':>20}{'con plantilla (ms)':>20}{'mejora':>10}")
+    for nombre, funcion, datos in casos:
+        antes = medir(lambda d: funcion(d, usar_plantilla=False), datos, repeticiones)
+        despues = medir(funcion, datos, repeticiones)
+        print(f"{nombre:<20}{antes:>20.3f}{despues:>20.3f}{antes / despues:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
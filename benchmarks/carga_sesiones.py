@@ -0,0 +1,324 @@
+"""Carga de extremo a extremo con sesiones de las apps sin navegador.
+
+    python -m benchmarks.carga_sesiones                          # 4 sesiones x 5 guardados, libro CSV
+    python -m benchmarks.carga_sesiones --sesiones 8 --guardados 10 --libro sqlite
+    python -m benchmarks.carga_sesiones --solo vigas --salida carga.json
+
+Cada sesión es un AppTest de streamlit en su propio proceso: AppTest guarda
+estado en variables globales de streamlit durante cada rerun (el Runtime, la
+opción "global.appTest") y dos sesiones en hilos del mismo proceso se pisan.
+Así cada sesión tiene su propio escritor del libro y lo que se pone a prueba
+es el bloqueo de archivo entre procesos (como con varios servidores sobre el
+mismo libro). Las sesiones de calificador_app.py y calificador_rubrica.py
+califican a la vez, cada una a sus propios estudiantes y con su propia
+actividad, sobre el mismo libro de notas; las de unir_notas.py unen cada una
+su carpeta de archivos mientras uno de ellos cambia entre reruns. Se mide la latencia de cada rerun (p50/p95 por
+acción), la del guardado (del clic a que los Futures del escritor se
+resuelven, es decir, a que la nota está en disco) y, al final, se consolida
+el libro y se cuentan las filas perdidas, duplicadas, ajenas (de un
+estudiante o actividad que nadie guardó así) o con otra nota.
+"""
+import argparse
+import collections
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import multiprocessing
+import tempfile
+import time
+import traceback
+
+from benchmarks.datos_sinteticos import archivos_notas, nombres_estudiantes, rubrica_csv_sintetica
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APPS = {
+    "vigas": ("calificador_app.py", "Calificacion Calculada", {"Calificacion Final": "Calificacion Calculada"}),
+    "rubrica": ("calificador_rubrica.py", "Calificacion Final", None),
+}
+ESPERA_GUARDADO = 30  # segundos máximos para que una nota llegue a disco
+
+
+# --- Archivos "subidos" ---
+#
+# AppTest no simula st.file_uploader: se reemplaza por uno que devuelve la
+# lista del curso o la rúbrica sintéticas según la etiqueta del widget.
+
+class ArchivoSubido(io.BytesIO):
+    def __init__(self, contenido, nombre):
+        super().__init__(contenido)
+        self.name, self.file_id, self.size = nombre, f"carga-{nombre}", len(contenido)
+
+
+def simular_subidas(lista, rubrica):
+    import streamlit as st
+
+    def file_uploader(etiqueta, *args, accept_multiple_files=False, **kwargs):
+        if accept_multiple_files:
+            return []
+        if "rúbrica" in etiqueta:
+            return ArchivoSubido(rubrica, "rubrica.csv")
+        return ArchivoSubido(lista, "lista_curso.csv")
+    st.file_uploader = file_uploader
+
+
+# --- Sesiones ---
+
+def compilar_una_vez():
+    """AppTest vuelve a compilar la app en cada rerun, lo que un servidor no
+    hace: los reruns de la sesión comparten un caché de bytecode, como en el servidor."""
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import local_script_runner
+    compartido = ScriptCache()
+    local_script_runner.ScriptCache = lambda: compartido
+
+
+class Sesion:
+    """Una sesión de una app con los tiempos de cada rerun, agrupados por acción."""
+
+    def __init__(self, archivo):
+        from streamlit.testing.v1 import AppTest
+        self.app = AppTest.from_file(os.path.join(RAIZ, archivo), default_timeout=120)
+        self.reruns = collections.defaultdict(list)
+        self.guardados = []
+
+    def ejecutar(self, accion, elemento=None):
+        inicio = time.perf_counter()
+        (elemento or self.app).run()
+        self.reruns[accion].append(time.perf_counter() - inicio)
+        if self.app.exception:
+            raise RuntimeError(f"{accion}: {self.app.exception[0].message}")
+        return self.app
+
+    def boton(self, texto):
+        return next(b for b in self.app.button if texto in b.label)
+
+    def guardar(self, boton):
+        # Del clic a que todas las escrituras encoladas por el clic están en disco.
+        inicio = time.perf_counter()
+        self.ejecutar("guardar", boton.click())
+        en_curso = self.app.session_state["guardados_en_curso"] if "guardados_en_curso" in self.app.session_state else []
+        if not en_curso:
+            raise RuntimeError("el clic no encoló ningún guardado: " + "; ".join(e.value for e in self.app.error))
+        for futuro in en_curso[-1]["futuros"]:
+            futuro.result(ESPERA_GUARDADO)
+        self.guardados.append(time.perf_counter() - inicio)
+
+    def agregar(self, estudiante):
+        self.ejecutar("elegir", self.app.selectbox[0].set_value(estudiante))
+        self.ejecutar("agregar", self.boton("Agregar Estudiante").click())
+
+    def nota(self, etiqueta):
+        return float(next(m.value for m in self.app.metric if m.label == etiqueta).split("/")[0])
+
+
+def sesion_vigas(sesion, estudiantes, tarea, rng):
+    """Califica a cada estudiante por separado; devuelve [(estudiante, tarea, nota)]."""
+    app = sesion.ejecutar("inicio")
+    sesion.ejecutar("actividad", app.text_input(key="tarea").input(tarea))
+    guardadas = []
+    for estudiante in estudiantes:
+        if app.session_state["current_group"]:
+            sesion.ejecutar("limpiar", sesion.boton("Limpiar Grupo").click())
+        sesion.agregar(estudiante)
+        for casilla in rng.sample(list(app.number_input)[:-1], 3):
+            sesion.ejecutar("puntaje", casilla.set_value(rng.randint(0, 5)))
+        sesion.ejecutar("comentario", app.text_area(key="comentario_final").input(f"Comentario para {estudiante}"))
+        nota = sesion.nota("Calificación Calculada")
+        sesion.guardar(sesion.boton("Guardar y Generar Reporte"))
+        guardadas.append((estudiante, tarea, nota))
+    return guardadas
+
+
+def sesion_rubrica(sesion, estudiantes, tarea, rng):
+    app = sesion.ejecutar("inicio")
+    sesion.ejecutar("usar_rubrica", sesion.boton("Usar Rúbrica Cargada").click())
+    guardadas = []
+    for estudiante in estudiantes:
+        if app.session_state["current_group"]:
+            sesion.ejecutar("limpiar", sesion.boton("Limpiar Grupo").click())
+        sesion.agregar(estudiante)
+        # El formulario no vuelve a ejecutar la app hasta enviarlo.
+        for casilla in app.number_input:
+            casilla.set_value(rng.choice([0.0, 2.5, 3.5, 5.0]))
+        next(t for t in app.text_area if "Comentario Final" in t.label).input(f"Comentario para {estudiante}")
+        next(t for t in app.text_input if "Actividad" in t.label).input(tarea)
+        sesion.guardar(sesion.boton("Calcular Nota Final y Guardar"))
+        guardadas.append((estudiante, tarea, sesion.nota("Calificación Final Calculada")))
+    return guardadas
+
+
+def sesion_unir(sesion, carpeta, reruns, rng):
+    """Une la carpeta y vuelve a leerla `reruns` veces, cambiando un archivo antes de cada una."""
+    app = sesion.ejecutar("inicio")
+    sesion.ejecutar("modo_carpeta", app.radio[0].set_value("Carpetas"))
+    sesion.ejecutar("primera_union", app.text_area(key="carpetas_notas").input(carpeta))
+    archivos = sorted(os.listdir(carpeta))
+    for _ in range(reruns):
+        ruta = os.path.join(carpeta, rng.choice(archivos))
+        with open(ruta, "a", encoding="utf-8") as f:
+            f.write(f"ESTUDIANTE NUEVO {rng.random():.6f},{rng.uniform(0, 5):.2f},2025-09-17\n")
+        sesion.ejecutar("volver_a_leer", sesion.boton("Volver a leer").click())
+    return []
+
+
+SESIONES = {"vigas": sesion_vigas, "rubrica": sesion_rubrica, "unir": sesion_unir}
+
+
+def proceso_sesion(app, args, ruta_libro, subidas, barrera, resultados):
+    """Cuerpo de cada proceso: una sesión de `app`; deja sus tiempos en `resultados`."""
+    os.environ["CALIFICADOR_LIBRO"] = ruta_libro  # las apps leen la ruta en cada ejecución
+    compilar_una_vez()
+    simular_subidas(*subidas)
+    sesion = Sesion(APPS[app][0] if app in APPS else "unir_notas.py")
+    guardadas, errores = [], []
+    barrera.wait()  # todas las sesiones empiezan juntas, ya importadas
+    try:
+        guardadas = SESIONES[app](sesion, *args)
+    except Exception as e:  # se informa al final, sin detener a las demás sesiones
+        errores.append(f"{type(e).__name__}: {e}\n{traceback.format_exc(limit=-3)}")
+    resultados.put({"reruns": dict(sesion.reruns), "guardados": sesion.guardados,
+                    "guardadas": guardadas, "errores": errores})
+
+
+def en_procesos(app, trabajos, ruta_libro, subidas):
+    """Una sesión por cada tupla de argumentos de `trabajos`, todas a la vez."""
+    contexto = multiprocessing.get_context("spawn")
+    barrera, resultados = contexto.Barrier(len(trabajos)), contexto.Queue()
+    procesos = [contexto.Process(target=proceso_sesion, args=(app, args, ruta_libro, subidas, barrera, resultados))
+                for args in trabajos]
+    for proceso in procesos:
+        proceso.start()
+    sesiones = [resultados.get() for _ in procesos]
+    for proceso in procesos:
+        proceso.join()
+    return sesiones
+
+
+# --- Integridad del libro ---
+
+def revisar_libro(ruta, columna_nota, renombrar, guardadas):
+    """Cuenta filas perdidas, duplicadas, ajenas y con otra nota tras consolidar el libro."""
+    from nucleo.libro_notas import abrir_libro
+    libro = abrir_libro(ruta, columna_nota=columna_nota, renombrar=renombrar)
+    libro.compactar()
+    df = libro.leer()
+    esperadas = {(estudiante, tarea): nota for estudiante, tarea, nota in guardadas}
+    filas = collections.Counter(zip(df["Estudiante"], df["Tarea"].fillna("")))
+    notas = dict(zip(zip(df["Estudiante"], df["Tarea"].fillna("")), df[columna_nota].astype(float)))
+    return {
+        "filas_esperadas": len(esperadas),
+        "filas_en_libro": len(df),
+        "perdidas": sum(1 for clave in esperadas if clave not in filas),
+        "duplicadas": sum(n - 1 for clave, n in filas.items() if n > 1),
+        "ajenas": sum(n for clave, n in filas.items() if clave not in esperadas),
+        "otra_nota": sum(1 for clave, nota in esperadas.items() if clave in notas and abs(notas[clave] - nota) > 0.005),
+    }
+
+
+# --- Resultados ---
+
+def percentiles(tiempos):
+    tiempos = sorted(tiempos)
+    p95 = tiempos[min(len(tiempos) - 1, int(round(0.95 * (len(tiempos) - 1))))]
+    return {"n": len(tiempos), "p50_ms": statistics.median(tiempos) * 1000, "p95_ms": p95 * 1000,
+            "max_ms": tiempos[-1] * 1000}
+
+
+def resumir(app, sesiones):
+    reruns = collections.defaultdict(list)
+    for sesion in sesiones:
+        for accion, tiempos in sesion["reruns"].items():
+            reruns[accion] += tiempos
+    todos = [t for tiempos in reruns.values() for t in tiempos]
+    resultado = {"app": app, "sesiones": len(sesiones),
+                 "reruns": {accion: percentiles(tiempos) for accion, tiempos in reruns.items()},
+                 "errores": [e for sesion in sesiones for e in sesion["errores"]]}
+    if todos:
+        resultado["reruns"]["todos"] = percentiles(todos)
+    guardados = [t for sesion in sesiones for t in sesion["guardados"]]
+    if guardados:
+        resultado["guardado"] = percentiles(guardados)
+    return resultado
+
+
+def imprimir(resultado):
+    print(f"\n{resultado['app']} ({resultado['sesiones']} sesiones a la vez)")
+    print(f"  {'acción':<24}{'n':>6}{'p50 (ms)':>12}{'p95 (ms)':>12}{'máx (ms)':>12}")
+    filas = [(f"rerun {accion}", p) for accion, p in resultado["reruns"].items()]
+    if "guardado" in resultado:
+        filas.append(("guardado", resultado["guardado"]))
+    for nombre, p in filas:
+        print(f"  {nombre:<24}{p['n']:>6}{p['p50_ms']:>12.1f}{p['p95_ms']:>12.1f}{p['max_ms']:>12.1f}")
+    if "libro" in resultado:
+        libro = resultado["libro"]
+        print("  libro: " + ", ".join(f"{clave} {valor}" for clave, valor in libro.items()))
+    for error in resultado["errores"]:
+        print(f"  ERROR {error}")
+
+
+# --- Escenarios ---
+
+def cargar_app(app, carpeta, sesiones, guardados, tipo_libro, lista, subidas, semilla):
+    """N sesiones de una app de calificación contra un libro nuevo."""
+    _, columna_nota, renombrar = APPS[app]
+    ruta = os.path.join(carpeta, f"libro_{app}" + (".db" if tipo_libro == "sqlite" else ".csv"))
+    trabajos = [(lista[s * guardados:(s + 1) * guardados], f"Carga {app} {s + 1}", random.Random(semilla + s))
+                for s in range(sesiones)]
+    resultados = en_procesos(app, trabajos, ruta, subidas)
+    resultado = resumir(app, resultados)
+    resultado["libro"] = revisar_libro(ruta, columna_nota, renombrar, [f for r in resultados for f in r["guardadas"]])
+    return resultado
+
+
+def cargar_unir(carpeta, sesiones, reruns, archivos, estudiantes, subidas, semilla):
+    """N sesiones de unir_notas.py, cada una sobre su propia carpeta."""
+    trabajos = []
+    for s in range(sesiones):
+        destino = os.path.join(carpeta, f"notas_{s + 1}")
+        os.makedirs(destino)
+        for nombre, contenido in archivos_notas(archivos, estudiantes, random.Random(semilla + s)):
+            with open(os.path.join(destino, nombre.replace("Nota ", "").lower().replace(" ", "_") + ".csv"), "wb") as f:
+                f.write(contenido.getvalue())
+        trabajos.append((destino, reruns, random.Random(semilla + s)))
+    return resumir("unir_notas", en_procesos("unir", trabajos, os.path.join(carpeta, "libro_unir.csv"), subidas))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sesiones", type=int, default=4, help="sesiones concurrentes por app")
+    parser.add_argument("--guardados", type=int, default=5, help="notas que guarda cada sesión")
+    parser.add_argument("--libro", choices=["csv", "sqlite"], default="csv")
+    parser.add_argument("--solo", nargs="+", choices=["vigas", "rubrica", "unir"], default=["vigas", "rubrica", "unir"])
+    parser.add_argument("--estudiantes", type=int, default=300, help="tamaño de la lista del curso")
+    parser.add_argument("--salida", help="guarda los resultados en este JSON")
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    lista = nombres_estudiantes(max(args.estudiantes, args.sesiones * args.guardados))
+    rubrica = rubrica_csv_sintetica(4, 3, random.Random(args.semilla))
+    subidas = (("NOMBRE COMPLETO\n" + "\n".join(lista) + "\n").encode("utf-8"), rubrica)
+    resultados, directorio = [], os.getcwd()
+    with tempfile.TemporaryDirectory() as carpeta:
+        # Los borradores, reportes y demás archivos relativos de las apps quedan en la carpeta temporal.
+        os.chdir(carpeta)
+        for app in args.solo:
+            if app == "unir":
+                resultado = cargar_unir(carpeta, args.sesiones, args.guardados, 8, args.estudiantes, subidas, args.semilla)
+            else:
+                resultado = cargar_app(app, carpeta, args.sesiones, args.guardados, args.libro, lista, subidas, args.semilla)
+            resultado["parametros"] = {"sesiones": args.sesiones, "guardados": args.guardados, "libro": args.libro}
+            imprimir(resultado)
+            resultados.append(resultado)
+        os.chdir(directorio)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
+    fallas = sum(r.get("libro", {}).get(c, 0) for r in resultados for c in ("perdidas", "duplicadas", "ajenas", "otra_nota"))
+    return 1 if fallas or any(r["errores"] for r in resultados) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
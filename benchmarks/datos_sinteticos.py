@@ -0,0 +1,81 @@
+import random
+
+from nucleo.taller_vigas import componentes_problemas, componentes_adicionales, problemas, MAX_SCORE
+
+# --- Generadores de datos sintéticos para los benchmarks ---
+
+
+def datos_vigas(i, rng=random):
+    scores_grid = {}
+    for comp in componentes_problemas:
+        scores_grid[comp] = {prob: rng.randint(0, 5) for prob in problemas}
+        scores_grid[comp]['Total'] = sum(scores_grid[comp][prob] for prob in problemas)
+    scores_adicionales = {comp: rng.randint(0, 5) for comp in componentes_adicionales}
+    puntaje_total = sum(s['Total'] for s in scores_grid.values()) + sum(scores_adicionales.values())
+    return {
+        "nombres": f"ESTUDIANTE {i} APELLIDO, COMPAÑERO {i} APELLIDO",
+        "scores_grid": scores_grid, "scores_adicionales": scores_adicionales,
+        "comentarios": {f"{problemas[0]} -> {comp}": "Revisar signos." for comp in list(componentes_problemas)[:2]},
+        "comentario_final": "Buen trabajo en general; faltó justificar algunos pasos.",
+        "puntaje_total": puntaje_total, "calificacion_final": 5 * puntaje_total / MAX_SCORE,
+        "fecha": "2025-09-17",
+    }
+
+
+def rubrica_sintetica(n_preguntas, n_sub_items):
+    return [{'pregunta': f"Punto {k + 1}", 'sub_items': [f"Competencia {j + 1}" for j in range(n_sub_items)],
+             'sobre': 5.0, 'peso': 1.0} for k in range(n_preguntas)]
+
+
+def datos_rubrica(i, rubrica, rng=random):
+    calificaciones = {p['pregunta']: {s: rng.choice([0.0, 2.5, 3.5, 5.0]) for s in p['sub_items']} for p in rubrica}
+    promedios = {k: (sum(v.values()) / len(v) if v else 0.0) for k, v in calificaciones.items()}
+    return {
+        "nombres": f"ESTUDIANTE {i} APELLIDO", "rubrica": rubrica, "calificaciones": calificaciones,
+        "promedios_por_pregunta": promedios, "calificacion_final": sum(promedios.values()) / max(len(promedios), 1),
+        "optional_comments": {rubrica[0]['pregunta']: "Bien planteado."}, "final_comment": "Buen trabajo.",
+        "firmar": True, "fecha": "2025-09-17",
+    }
+
+
+def con_texto_unicode(datos, i=0):
+    """Copia de `datos` con nombres y comentario final fuera de Latin-1."""
+    clave_comentario = "comentario_final" if "comentario_final" in datos else "final_comment"
+    return {**datos, "nombres": f"ESTUDIANTE {i} “ÑANDÚ” ŁUKASZ — ZOË",
+            clave_comentario: "Buen trabajo – faltó justificar “algunos” pasos… ✓ Δx ≈ 0,5 m"}
+
+
+def nombres_estudiantes(n):
+    return [f"ESTUDIANTE {i:07d} APELLIDO" for i in range(n)]
+
+
+def escribir_libro_csv(ruta, filas, rng=random):
+    """Instantánea CSV con `filas` notas, en el formato de calificaciones_finales.csv."""
+    import csv
+    with open(ruta, "w", newline="", encoding="utf-8") as f:
+        escritor = csv.writer(f, lineterminator="\n")
+        escritor.writerow(["Estudiante", "Calificacion Final", "Fecha"])
+        for nombre in nombres_estudiantes(filas):
+            escritor.writerow([nombre, round(rng.uniform(0, 5), 2), "2025-09-17"])
+
+
+def rubrica_csv_sintetica(n_preguntas, n_sub_items, rng=random):
+    """Bytes de una rúbrica en el CSV separado por ';' que exporta calificador_rubrica.py."""
+    lineas = [";".join(["Enunciado"] + [f"Competencia {j + 1}" for j in range(n_sub_items)] + ["sobre", "peso"])]
+    for k in range(n_preguntas):
+        marcas = [rng.choice(["si", "no"]) for _ in range(n_sub_items)]
+        lineas.append(";".join([f"Punto {k + 1}"] + marcas + ["5.0", "1.0"]))
+    return ("\n".join(lineas) + "\n").encode("utf-8")
+
+
+def archivos_notas(n_archivos, n_estudiantes, rng=random):
+    """(nombre, archivo) de `n_archivos` CSV de notas con nombres en mayúsculas/minúsculas mezcladas."""
+    import io
+    archivos = []
+    for k in range(n_archivos):
+        lineas = ["Estudiante,Calificacion Final,Fecha"]
+        for nombre in nombres_estudiantes(n_estudiantes):
+            nombre = nombre.lower() if rng.random() < 0.3 else nombre
+            lineas.append(f"{nombre},{rng.uniform(0, 5):.2f},2025-09-17")
+        archivos.append((f"Nota Tarea {k + 1}", io.BytesIO(("\n".join(lineas) + "\n").encode("utf-8"))))
+    return archivos
@@ -0,0 +1,225 @@
+"""Suite de microbenchmarks del núcleo con resultados en JSON.
+
+    python -m benchmarks.suite                       # todo (libro hasta 1M filas)
+    python -m benchmarks.suite --rapido              # tamaños pequeños
+    python -m benchmarks.suite --solo libro reportes
+    python -m benchmarks.suite --comparar benchmarks/resultados/abc1234.json
+
+Cada resultado es un registro {"grupo", "caso", "parametros", ...métricas}; al
+comparar se emparejan por (grupo, caso, parametros) y se muestra la razón
+nuevo / anterior de la mediana.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.datos_sinteticos import (archivos_notas, con_texto_unicode, datos_rubrica, datos_vigas, escribir_libro_csv,
+                                         nombres_estudiantes, rubrica_csv_sintetica, rubrica_sintetica)
+
+CARPETA_RESULTADOS = os.path.join(os.path.dirname(__file__), "resultados")
+
+
+def cronometrar(funcion, repeticiones, calentamiento=1):
+    for _ in range(calentamiento):
+        funcion()
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    tiempos.sort()
+    return {"mediana_ms": statistics.median(tiempos) * 1000,
+            "p95_ms": tiempos[min(len(tiempos) - 1, int(0.95 * len(tiempos)))] * 1000,
+            "repeticiones": repeticiones}
+
+
+def una_vez(funcion):
+    inicio = time.perf_counter()
+    funcion()
+    return (time.perf_counter() - inicio) * 1000
+
+
+# --- Libro de notas ---
+
+def bench_libro(tamanos, repeticiones):
+    from nucleo.libro_notas import abrir_libro
+    rng = random.Random(0)
+    grupo = ["ESTUDIANTE A", "ESTUDIANTE B", "ESTUDIANTE C"]
+    for filas in tamanos:
+        for backend, extension in (("csv", ".csv"), ("sqlite", ".db")):
+            with tempfile.TemporaryDirectory() as carpeta:
+                ruta = os.path.join(carpeta, "libro" + extension)
+                if backend == "csv":
+                    escribir_libro_csv(ruta, filas, rng)
+                    libro = abrir_libro(ruta)
+                else:
+                    libro = abrir_libro(ruta)
+                    libro.guardar_lote([([nombre], rng.uniform(0, 5), None) for nombre in nombres_estudiantes(filas)],
+                                       fecha="2025-09-17")
+                parametros = {"backend": backend, "filas": filas}
+                contador = iter(range(10 ** 9))
+                guardar = cronometrar(lambda: libro.guardar(grupo, 4.2, tarea=f"T{next(contador)}"), repeticiones)
+                yield {"grupo": "libro", "caso": "guardar_nota", "parametros": parametros, **guardar}
+                yield {"grupo": "libro", "caso": "pendientes", "parametros": parametros,
+                       **cronometrar(libro.pendientes, repeticiones)}
+                yield {"grupo": "libro", "caso": "leer", "parametros": parametros,
+                       **cronometrar(libro.leer, max(1, repeticiones // 50))}
+                if backend == "csv":
+                    yield {"grupo": "libro", "caso": "compactar", "parametros": parametros,
+                           "mediana_ms": una_vez(libro.compactar), "repeticiones": 1}
+                # Consultas filtradas (en CSV, desde la instantánea Parquet que dejó compactar).
+                estudiante = nombres_estudiantes(filas)[filas // 2]
+                yield {"grupo": "libro", "caso": "consultar_estudiante", "parametros": parametros,
+                       **cronometrar(lambda: libro.consultar(estudiante=estudiante), max(1, repeticiones // 10))}
+                yield {"grupo": "libro", "caso": "consultar_fecha", "parametros": parametros,
+                       **cronometrar(lambda: libro.consultar(columnas=["Estudiante", "Calificacion Final"],
+                                                             desde="2025-09-17"), max(1, repeticiones // 50))}
+        print(f"  libro: {filas} filas", file=sys.stderr)
+
+
+# --- Rúbricas ---
+
+def bench_rubricas(tamanos, repeticiones):
+    from nucleo.rubricas import leer_rubrica
+    rng = random.Random(0)
+    for n_preguntas, n_sub_items in tamanos:
+        contenido = rubrica_csv_sintetica(n_preguntas, n_sub_items, rng)
+        yield {"grupo": "rubricas", "caso": "leer_rubrica",
+               "parametros": {"preguntas": n_preguntas, "sub_items": n_sub_items},
+               **cronometrar(lambda: leer_rubrica(contenido), repeticiones)}
+
+
+# --- Reportes PDF ---
+
+def bench_reportes(repeticiones):
+    from nucleo.reportes import generar_pdf, generar_reporte_dinamico_pdf
+    rng = random.Random(0)
+    vigas = [datos_vigas(i, rng) for i in range(20)]
+    casos = [("generar_pdf", {}, generar_pdf, vigas),
+             # Texto fuera de Latin-1: fuente TrueType incrustada (subconjunto por reporte).
+             ("generar_pdf", {"texto": "unicode"}, generar_pdf, [con_texto_unicode(d, i) for i, d in enumerate(vigas)])]
+    for n_preguntas, n_sub_items in ((4, 3), (6, 4)):
+        rubrica = rubrica_sintetica(n_preguntas, n_sub_items)
+        casos.append(("generar_reporte_dinamico_pdf", {"preguntas": n_preguntas, "sub_items": n_sub_items},
+                      generar_reporte_dinamico_pdf, [datos_rubrica(i, rubrica, rng) for i in range(20)]))
+    casos.append(("generar_reporte_dinamico_pdf", {"preguntas": 4, "sub_items": 3, "texto": "unicode"},
+                  generar_reporte_dinamico_pdf,
+                  [con_texto_unicode(datos_rubrica(i, rubrica_sintetica(4, 3), rng), i) for i in range(20)]))
+    for caso, parametros, funcion, datos in casos:
+        indice = iter(range(10 ** 9))
+        tiempos = cronometrar(lambda: funcion(datos[next(indice) % len(datos)]), repeticiones)
+        tracemalloc.start()
+        funcion(datos[0])
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        yield {"grupo": "reportes", "caso": caso, "parametros": parametros, **tiempos, "memoria_pico_kb": pico / 1024,
+               "tamano_kb": len(funcion(datos[0])) / 1024}
+
+
+# --- Unión de archivos de notas ---
+
+def bench_fusion(tamanos, repeticiones):
+    from nucleo.fusion_notas import CacheFusion, unir_archivos
+    rng = random.Random(0)
+    for n_archivos, n_estudiantes in tamanos:
+        fuentes = archivos_notas(n_archivos, n_estudiantes, rng)
+        parametros = {"archivos": n_archivos, "estudiantes": n_estudiantes}
+        yield {"grupo": "fusion", "caso": "unir_archivos", "parametros": parametros,
+               **cronometrar(lambda: unir_archivos(fuentes), repeticiones)}
+        # Con la caché llena, cada repetición cambia el contenido del último archivo.
+        cache = CacheFusion()
+        unir_archivos(fuentes, cache)
+        cambios = iter([nuevo for _, nuevo in archivos_notas(repeticiones + 1, n_estudiantes, rng)])
+        yield {"grupo": "fusion", "caso": "unir_archivos_un_cambio", "parametros": parametros,
+               **cronometrar(lambda: unir_archivos(fuentes[:-1] + [(fuentes[-1][0], next(cambios))], cache),
+                             repeticiones)}
+
+
+# --- Ejecución y comparación ---
+
+def commit_actual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "sin-git"
+
+
+def clave(resultado):
+    return (resultado["grupo"], resultado["caso"], json.dumps(resultado["parametros"], sort_keys=True))
+
+
+def comparar(resultados, ruta_anterior):
+    with open(ruta_anterior, encoding="utf-8") as f:
+        anteriores = {clave(r): r for r in json.load(f)["resultados"]}
+    print(f"{'caso':<80}{'anterior (ms)':>15}{'nuevo (ms)':>13}{'razón':>9}")
+    for r in resultados:
+        anterior = anteriores.get(clave(r))
+        if anterior is None:
+            continue
+        nombre = f"{r['grupo']}.{r['caso']} {json.dumps(r['parametros'], sort_keys=True)}"
+        razon = r["mediana_ms"] / anterior["mediana_ms"] if anterior["mediana_ms"] else float("nan")
+        marca = "  <-- más lento" if razon > 1.2 else ""
+        print(f"{nombre[:79]:<80}{anterior['mediana_ms']:>15.3f}{r['mediana_ms']:>13.3f}{razon:>8.2f}x{marca}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Microbenchmarks del núcleo de calificación.")
+    parser.add_argument("--rapido", action="store_true", help="Solo tamaños pequeños (para revisar en segundos).")
+    parser.add_argument("--solo", nargs="+", choices=["libro", "rubricas", "reportes", "fusion"],
+                        help="Grupos a ejecutar (por defecto, todos).")
+    parser.add_argument("--salida", help="Archivo JSON de resultados (por defecto benchmarks/resultados/<commit>.json).")
+    parser.add_argument("--comparar", metavar="JSON", help="Resultados anteriores con los que comparar.")
+    args = parser.parse_args(argv)
+
+    grupos = set(args.solo or ["libro", "rubricas", "reportes", "fusion"])
+    if args.rapido:
+        tamanos_libro, rep_libro = [1_000, 10_000], 50
+        tamanos_rubrica, rep_rubrica = [(5, 5), (20, 30)], 20
+        rep_reportes = 30
+        tamanos_fusion, rep_fusion = [(2, 1_000), (10, 1_000)], 5
+    else:
+        tamanos_libro, rep_libro = [1_000, 10_000, 100_000, 1_000_000], 200
+        tamanos_rubrica, rep_rubrica = [(5, 5), (20, 30), (100, 300), (300, 500)], 20
+        rep_reportes = 200
+        tamanos_fusion, rep_fusion = [(2, 1_000), (10, 1_000), (50, 1_000), (10, 50_000)], 5
+
+    resultados = []
+    if "libro" in grupos:
+        resultados += bench_libro(tamanos_libro, rep_libro)
+    if "rubricas" in grupos:
+        resultados += bench_rubricas(tamanos_rubrica, rep_rubrica)
+    if "reportes" in grupos:
+        resultados += bench_reportes(rep_reportes)
+    if "fusion" in grupos:
+        resultados += bench_fusion(tamanos_fusion, rep_fusion)
+
+    commit = commit_actual()
+    salida = args.salida or os.path.join(CARPETA_RESULTADOS, f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(salida)), exist_ok=True)
+    with open(salida, "w", encoding="utf-8") as f:
+        json.dump({"commit": commit, "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+                   "python": platform.python_version(), "plataforma": platform.platform(),
+                   "rapido": args.rapido, "resultados": resultados}, f, ensure_ascii=False, indent=1)
+
+    for r in resultados:
+        extra = f"  pico {r['memoria_pico_kb']:.0f} KB, PDF {r['tamano_kb']:.1f} KB" if "memoria_pico_kb" in r else ""
+        nombre = f"{r['grupo']}.{r['caso']}"
+        print(f"{nombre:<38}{json.dumps(r['parametros'], sort_keys=True):<45}{r['mediana_ms']:>12.3f} ms{extra}")
+    print(f"Resultados en '{salida}'.")
+    if args.comparar:
+        comparar(resultados, args.comparar)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
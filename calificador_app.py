@@ -1,8 +1,13 @@
 import streamlit as st
-from fpdf import FPDF
 import datetime
-import pandas as pd
 import os
+from nucleo.borradores import Borrador, id_sesion, podar_borradores, ruta_borrador
+from nucleo.libro_notas import abrir_libro
+from nucleo.escritor import escritor_para
+from nucleo.interfaz import (acciones_libro, cargar_lista_curso, descarga_reporte, elegir_estudiantes, estado_guardados,
+                             panel_perfil, pedir_reporte, reportes_en_lote, seguir_guardado, vista_estadisticas)
+from nucleo.perfilado import perfilador_desde_entorno
+from nucleo.taller_vigas import componentes_problemas, componentes_adicionales, problemas, MAX_SCORE, FILA_ADICIONALES, motor_taller_vigas
 
 # --- Configuración de la Página ---
 st.set_page_config(
@@ -11,117 +16,94 @@ st.set_page_config(
     layout="wide"
 )
 
-# --- Definiciones ---
-componentes_problemas = {
-    "C1: Diagrama de cuerpo libre": 25, "C2: Reacciones en los apoyos": 25,
-    "C3: Función de singularidad": 25, "C4: Función de carga cortante": 25,
-    "C5: Función de momento flector": 25, "C6: Diagrama de momento flector": 25,
-    "C7: Diagrama de fuerza cortante": 25,
-}
-componentes_adicionales = {
-    "C8: Deflexión en viga (Punto 2)": 5, "C9: Validación con Software (Punto 3)": 5
-}
-problemas = ["1.a", "1.b", "1.c", "1.d", "1.e"]
-MAX_SCORE = 185
-GRADEBOOK_FILE = "calificaciones_finales.csv"
-
-# --- Función de PDF (sin cambios) ---
-def generar_pdf(datos_estudiante):
-    # (Esta función no necesita cambios, se mantiene igual)
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_font("Arial", "B", 16)
-    pdf.cell(0, 10, "Reporte de Calificación - Taller de Vigas", 0, 1, "C")
-    pdf.ln(10)
-    pdf.set_font("Arial", "", 12)
-    pdf.cell(0, 8, f"Estudiante(s): {datos_estudiante['nombres']}", 0, 1)
-    pdf.cell(0, 8, f"Fecha de calificación: {datetime.date.today().strftime('%Y-%m-%d')}", 0, 1)
-    pdf.ln(10)
+# Fases de cada ejecución (CALIFICADOR_PERFIL / CALIFICADOR_PERFIL_ARCHIVO).
+perfil = perfilador_desde_entorno("vigas")
 
-    pdf.set_font("Arial", "B", 10)
-    COLOR_ROJO, COLOR_AMARILLO, COLOR_VERDE, COLOR_NEGRO = (220, 53, 69), (255, 193, 7), (40, 167, 69), (0, 0, 0)
+# --- Definiciones ---
+# Un archivo .db/.sqlite activa el libro en SQLite; cualquier otro usa CSV.
+GRADEBOOK_FILE = os.environ.get("CALIFICADOR_LIBRO", "calificaciones_finales.csv")
+libro = abrir_libro(GRADEBOOK_FILE, columna_nota="Calificacion Calculada",
+                    renombrar={'Calificacion Final': 'Calificacion Calculada'})
+# Todas las escrituras pasan por un único hilo escritor por libro (group commit
+# con bloqueo de archivo); la interfaz no espera al disco.
+escritor = escritor_para(libro)
 
-    def get_color_for_score(score):
-        if score < 2.5: return COLOR_ROJO
-        elif score < 3.5: return COLOR_AMARILLO
-        else: return COLOR_VERDE
+# --- Función de Guardado ---
+def guardar_nota(lista_estudiantes, calificacion_calculada, calificacion_subjetiva, tarea="", puntajes=None):
+    """Encola la nota (y los puntajes por componente) y devuelve los Futures de las escrituras."""
+    # En CSV solo se anexan las filas nuevas al diario; en SQLite se actualiza
+    # la fila de cada (estudiante, tarea).
+    futuros = [escritor.guardar(lista_estudiantes, calificacion_calculada, calificacion_subjetiva, tarea=tarea)]
+    if puntajes is not None:
+        # Puntajes por componente + estadísticas del curso, actualizadas en el acto.
+        futuros.append(escritor.ejecutar("guardar_puntajes", list(lista_estudiantes), puntajes.copy(),
+                                         calificacion_calculada, tarea=tarea))
+    # Cuando la nota ya está en el libro, el borrador de esta calificación sobra.
+    futuros[0].add_done_callback(lambda f, borrador=borrador: f.exception() is None and borrador.descartar())
+    return futuros
 
-    col_width_comp, col_width_prob, col_width_total = 75, 16, 20
-    pdf.cell(col_width_comp, 8, "Competencia", 1, 0, "C")
-    for prob in problemas: pdf.cell(col_width_prob, 8, prob, 1, 0, "C")
-    pdf.cell(col_width_total, 8, "Total", 1, 1, "C")
+# --- Borrador de la calificación en curso ---
+# Cada campo que cambia se anexa al borrador; si se recarga el navegador o se
+# pierde la conexión, la siguiente sesión lo reproduce y continúa donde iba.
+# Un borrador por sesión (su identificador va en la URL); el ".lock" es común a
+# todos los borradores de la app sobre este libro.
+borrador = Borrador(ruta_borrador(GRADEBOOK_FILE, "vigas", id_sesion(st.query_params)),
+                    bloqueo=ruta_borrador(GRADEBOOK_FILE, "vigas"))
+CAMPOS_FORMULARIO = ("comentario_final", "calificacion_subjetiva")
 
-    pdf.set_font("Arial", "", 9)
-    for comp, scores in datos_estudiante['scores_grid'].items():
-        pdf.cell(col_width_comp, 8, comp.split(':')[1].strip(), 1, 0, "L")
-        for prob in problemas:
-            score = scores[prob]
-            color = get_color_for_score(score)
-            pdf.set_text_color(*color)
-            pdf.cell(col_width_prob, 8, str(score), 1, 0, "C")
-            pdf.set_text_color(*COLOR_NEGRO)
-        total_comp, max_comp = scores['Total'], componentes_problemas[comp]
-        pdf.set_font("Arial", "B", 9)
-        pdf.cell(col_width_total, 8, f"{total_comp}/{max_comp}", 1, 1, "C")
-        pdf.set_font("Arial", "", 9)
+def anotar_campo(clave):
+    borrador.anotar(clave, st.session_state[clave])
 
-    pdf.ln(5)
-    pdf.set_font("Arial", "B", 10)
-    pdf.cell(col_width_comp, 8, "Componentes Adicionales", 1, 0, "C")
-    pdf.cell(col_width_prob * 5 + col_width_total, 8, "Puntaje", 1, 1, "C")
-    pdf.set_font("Arial", "", 9)
-    for comp, score in datos_estudiante['scores_adicionales'].items():
-        pdf.cell(col_width_comp, 8, comp.split(':')[1].strip(), 1, 0, "L")
-        color, max_score_add = get_color_for_score(score), componentes_adicionales[comp]
-        pdf.set_text_color(*color)
-        pdf.set_font("Arial", "B", 9)
-        pdf.cell(col_width_prob * 5 + col_width_total, 8, f"{score}/{max_score_add}", 1, 1, "C")
-        pdf.set_text_color(*COLOR_NEGRO)
-        pdf.set_font("Arial", "", 9)
+def limpiar_calificacion():
+    st.session_state.calificaciones = {}
+    st.session_state.puntajes = motor.vacio()
+    for clave in [k for k in st.session_state if k.endswith(("_score_input", "_comment_input")) or k in CAMPOS_FORMULARIO]:
+        del st.session_state[clave]
+    st.session_state.current_group = []
+    st.session_state.borrador_recuperado = 0
+    st.session_state.pop("reporte_individual", None)
+    borrador.descartar()
 
-    pdf.ln(10)
-    pdf.set_font("Arial", "B", 12)
-    pdf.cell(0, 10, "Comentarios por Componente", 0, 1)
-    pdf.set_font("Arial", "", 10)
-    comentarios_ingresados = False
-    for key, value in datos_estudiante['comentarios'].items():
-        if value.strip():
-            pdf.multi_cell(0, 6, f"- {key}: {value}")
-            comentarios_ingresados = True
-    if not comentarios_ingresados: pdf.multi_cell(0, 6, "No se ingresaron comentarios específicos.")
-    pdf.ln(5)
-    pdf.set_font("Arial", "B", 12)
-    pdf.cell(0, 10, "Comentario Final", 0, 1)
-    pdf.set_font("Arial", "I", 10)
-    pdf.multi_cell(0, 6, datos_estudiante['comentario_final'])
-    pdf.ln(10)
-    pdf.set_font("Arial", "B", 14)
-    pdf.cell(0, 12, f"Puntaje Total: {datos_estudiante['puntaje_total']} / {MAX_SCORE}", 0, 1, "R")
-    pdf.cell(0, 12, f"Calificación Final (Calculada): {datos_estudiante['calificacion_final']:.2f} / 5.0", 0, 1, "R")
-    return pdf.output(dest='S').encode('latin-1')
+# --- Grilla de calificación ---
+motor = motor_taller_vigas()
 
-# --- Función de Guardado (sin cambios) ---
-def guardar_nota(lista_estudiantes, calificacion_calculada, calificacion_subjetiva):
-    columnas = ["Estudiante", "Calificacion Calculada", "Calificacion Subjetiva", "Fecha"]
-    if not os.path.exists(GRADEBOOK_FILE):
-        df_gradebook = pd.DataFrame(columns=columnas)
-        df_gradebook.to_csv(GRADEBOOK_FILE, index=False)
+def mostrar_resumen(contenedor):
+    resultado = motor.puntuar(st.session_state.puntajes)
+    total_score, calculated_grade = int(resultado.puntaje_total), float(resultado.nota_final)
+    with contenedor.container():
+        st.header("Resumen y Acciones")
+        st.metric(label="Puntaje Total", value=f"{total_score} / {MAX_SCORE}")
+        st.metric(label="Calificación Calculada", value=f"{calculated_grade:.2f} / 5.0")
+    return total_score, calculated_grade
 
-    df_gradebook = pd.read_csv(GRADEBOOK_FILE)
-    nuevas_notas_lista = []
-    for estudiante in lista_estudiantes:
-        nuevas_notas_lista.append({
-            "Estudiante": estudiante,
-            "Calificacion Calculada": f"{calificacion_calculada:.2f}",
-            "Calificacion Subjetiva": f"{calificacion_subjetiva:.2f}",
-            "Fecha": datetime.date.today().strftime('%Y-%m-%d')
-        })
-    if nuevas_notas_lista:
-        nuevas_notas_df = pd.DataFrame(nuevas_notas_lista)
-        df_gradebook = pd.concat([df_gradebook, nuevas_notas_df], ignore_index=True)
-        if 'Calificacion Final' in df_gradebook.columns:
-            df_gradebook = df_gradebook.rename(columns={'Calificacion Final': 'Calificacion Calculada'})
-        df_gradebook.to_csv(GRADEBOOK_FILE, index=False)
+# Cada bloque de la grilla es un fragmento: editar una casilla solo vuelve a
+# ejecutar su bloque. Los puntajes van a un arreglo denso (fila del motor x
+# componente) y el resumen se recalcula con el motor solo si algo cambió.
+@st.fragment
+def grilla_componentes(fila, prefijo, componentes, resumen_sidebar, con_titulo=False):
+    puntajes, i, cambio = st.session_state.puntajes, motor.fila[fila], False
+    for comp_key in componentes:
+        unique_key = f"{prefijo}{comp_key}"
+        if con_titulo:
+            st.markdown(f"#### {comp_key}")
+        sub_col1, sub_col2 = st.columns([1, 2])
+        with sub_col1:
+            score = st.number_input(
+                label=comp_key, min_value=0, max_value=5, step=1,
+                key=f"{unique_key}_score_input", label_visibility="collapsed",
+                on_change=anotar_campo, args=(f"{unique_key}_score_input",)
+            )
+        with sub_col2:
+            st.session_state.calificaciones[f"{unique_key}_comment"] = st.text_input(
+                "Comentario", key=f"{unique_key}_comment_input",
+                label_visibility="collapsed", placeholder=f"Comentario para {comp_key}",
+                on_change=anotar_campo, args=(f"{unique_key}_comment_input",)
+            )
+        j = motor.columna[comp_key]
+        if puntajes[i, j] != score:
+            puntajes[i, j], cambio = score, True
+    if cambio:
+        mostrar_resumen(resumen_sidebar)
 
 # --- Interfaz Principal ---
 st.title("📏 Calificador Avanzado: Taller de Vigas")
@@ -132,31 +114,39 @@ uploaded_file = st.file_uploader(
 )
 
 if uploaded_file is not None:
-    try:
-        st.session_state.df_students = pd.read_csv(uploaded_file, encoding='latin1')
-        st.success(f"Archivo '{uploaded_file.name}' cargado. Se encontraron {len(st.session_state.df_students)} estudiantes.")
-    except Exception as e:
-        st.error(f"Ocurrió un error al leer el archivo CSV: {e}")
-        st.stop()
+    with perfil.fase("lista"):
+        student_list = cargar_lista_curso(uploaded_file)
+    repetidos = (student_list.importacion or {}).get("duplicados", 0)
+    st.success(f"Archivo '{uploaded_file.name}' cargado. Se encontraron {len(student_list)} estudiantes."
+               + (f" Se omitieron {repetidos} filas repetidas." if repetidos else ""))
 
     if 'calificaciones' not in st.session_state:
         st.session_state.calificaciones = {}
     if 'current_group' not in st.session_state:
         st.session_state.current_group = []
+    if 'borrador_revisado' not in st.session_state:
+        # Primera ejecución de la sesión: se reanuda el borrador pendiente, si
+        # hay, y se borran los de pestañas abandonadas.
+        st.session_state.borrador_revisado = True
+        podar_borradores(GRADEBOOK_FILE, "vigas", conservar=(borrador.ruta,))
+        recuperado = borrador.compactar()
+        st.session_state.update(recuperado)
+        st.session_state.borrador_recuperado = len(recuperado)
+    if st.session_state.get('borrador_recuperado'):
+        col_info, col_descartar = st.columns([0.8, 0.2])
+        col_info.info(f"Se recuperó una calificación sin guardar ({st.session_state.borrador_recuperado} campos).")
+        if col_descartar.button("🗑️ Descartar borrador", use_container_width=True):
+            limpiar_calificacion()
+            st.rerun()
 
     st.header("2. Seleccionar Estudiantes del Grupo")
-    try:
-        student_list = st.session_state.df_students['NOMBRE COMPLETO'].tolist()
-    except KeyError:
-        st.error("Error: No se encontró la columna 'NOMBRE COMPLETO' en el archivo CSV.")
-        st.stop()
-    
     col_select, col_group = st.columns(2)
     with col_select:
-        selected_student = st.selectbox("Elige un estudiante para agregar:", student_list)
-        if st.button("➕ Agregar Estudiante"):
-            if selected_student not in st.session_state.current_group:
-                st.session_state.current_group.append(selected_student)
+        nuevos = elegir_estudiantes(student_list)
+        grupo = list(dict.fromkeys(st.session_state.current_group + nuevos))
+        if grupo != st.session_state.current_group:
+            st.session_state.current_group = grupo
+            borrador.anotar("current_group", grupo)
     
     with col_group:
         st.write("**Grupo Actual:**")
@@ -165,6 +155,7 @@ if uploaded_file is not None:
                 st.markdown(f"- {student}")
             if st.button("🗑️ Limpiar Grupo"):
                 st.session_state.current_group = []
+                borrador.anotar("current_group", [])
                 st.rerun()
         else:
             st.write("Aún no se han agregado estudiantes.")
@@ -173,56 +164,45 @@ if uploaded_file is not None:
     st.markdown("---")
 
     st.header("3. Calificación por Componentes")
+    if 'puntajes' not in st.session_state:
+        st.session_state.puntajes = motor.vacio()
+    # El resumen de la barra lateral se reserva aquí para que cada fragmento de
+    # la grilla lo actualice sin volver a ejecutar toda la app.
+    resumen_sidebar = st.sidebar.empty()
     col1, col2 = st.columns([0.7, 0.3])
-    with col1:
+    with col1, perfil.fase("widgets"):
         with st.expander("**Problemas 1.a al 1.e**", expanded=True):
-             for prob in problemas:
+            for prob in problemas:
                 st.markdown(f"#### Problema {prob}")
-                for comp_key in componentes_problemas.keys():
-                    unique_key = f"{prob}_{comp_key}"
-                    sub_col1, sub_col2 = st.columns([1, 2])
-                    with sub_col1:
-                        st.session_state.calificaciones[f"{unique_key}_score"] = st.number_input(
-                            label=comp_key, min_value=0, max_value=5, step=1,
-                            key=f"{unique_key}_score_input", label_visibility="collapsed"
-                        )
-                    with sub_col2:
-                        st.session_state.calificaciones[f"{unique_key}_comment"] = st.text_input(
-                            "Comentario", key=f"{unique_key}_comment_input",
-                            label_visibility="collapsed", placeholder=f"Comentario para {comp_key}"
-                        )
+                grilla_componentes(prob, f"{prob}_", list(componentes_problemas.keys()), resumen_sidebar)
         with st.expander("**Puntos Adicionales**", expanded=True):
-            for comp_key in componentes_adicionales.keys():
-                unique_key = comp_key
-                st.markdown(f"#### {comp_key}")
-                sub_col1, sub_col2 = st.columns([1, 2])
-                with sub_col1:
-                    st.session_state.calificaciones[f"{unique_key}_score"] = st.number_input(
-                        label=comp_key, min_value=0, max_value=5, step=1,
-                        key=f"{unique_key}_score_input", label_visibility="collapsed"
-                    )
-                with sub_col2:
-                    st.session_state.calificaciones[f"{unique_key}_comment"] = st.text_input(
-                        "Comentario", key=f"{unique_key}_comment_input",
-                        label_visibility="collapsed", placeholder=f"Comentario para {comp_key}"
-                    )
+            grilla_componentes(FILA_ADICIONALES, "", list(componentes_adicionales.keys()),
+                               resumen_sidebar, con_titulo=True)
         st.header("4. Comentario Final")
-        final_comment = st.text_area("Escriba aquí un comentario general (Obligatorio).", height=150)
+        final_comment = st.text_area("Escriba aquí un comentario general (Obligatorio).", height=150,
+                                     key="comentario_final", on_change=anotar_campo, args=("comentario_final",))
         
         st.header("5. Calificación Subjetiva (Opcional)")
+        # El valor inicial va en session_state: un borrador reanudado ya puede
+        # haberlo fijado, y el widget no debe traer además su propio `value`.
+        st.session_state.setdefault("calificacion_subjetiva", 3.0)
         subjective_grade = st.number_input(
             "Ingrese una calificación basada en la apreciación del docente (de 0.0 a 5.0).",
-            min_value=0.0, max_value=5.0, value=3.0, step=0.1
+            min_value=0.0, max_value=5.0, step=0.1,
+            key="calificacion_subjetiva", on_change=anotar_campo, args=("calificacion_subjetiva",)
         )
 
+        st.header("6. Estadísticas del Curso")
+        if st.toggle("Mostrar estadísticas del curso"):
+            vista_estadisticas(libro, motor)
+
     # --- BARRA LATERAL ---
     with col2:
         with st.sidebar:
-            st.header("Resumen y Acciones")
-            total_score = sum(v for k, v in st.session_state.calificaciones.items() if "score" in k)
-            calculated_grade = (5 * total_score / MAX_SCORE) if MAX_SCORE > 0 else 0
-            st.metric(label="Puntaje Total", value=f"{total_score} / {MAX_SCORE}")
-            st.metric(label="Calificación Calculada", value=f"{calculated_grade:.2f} / 5.0")
+            with perfil.fase("puntuacion"):
+                total_score, calculated_grade = mostrar_resumen(resumen_sidebar)
+            tarea = st.text_input("Actividad (opcional)", key="tarea", placeholder="Ej: Taller 1",
+                                  on_change=anotar_campo, args=("tarea",))
             st.markdown("---")
 
             if st.button("💾 Guardar y Generar Reporte", use_container_width=True, type="primary"):
@@ -231,36 +211,40 @@ if uploaded_file is not None:
                 elif not final_comment.strip():
                     st.error("El comentario final es obligatorio.")
                 else:
-                    scores_grid = {comp: {} for comp in componentes_problemas.keys()}
+                    puntajes = st.session_state.puntajes
+                    totales_competencia = motor.puntuar(puntajes).totales_competencia
+                    scores_grid = {}
                     for comp_key in componentes_problemas.keys():
-                        comp_total = 0
-                        for prob in problemas:
-                            score = st.session_state.calificaciones.get(f"{prob}_{comp_key}_score", 0)
-                            scores_grid[comp_key][prob] = score
-                            comp_total += score
-                        scores_grid[comp_key]['Total'] = comp_total
-                    scores_adicionales = {comp_key: st.session_state.calificaciones.get(f"{comp_key}_score", 0) for comp_key in componentes_adicionales.keys()}
+                        j = motor.columna[comp_key]
+                        scores_grid[comp_key] = {prob: int(puntajes[motor.fila[prob], j]) for prob in problemas}
+                        scores_grid[comp_key]['Total'] = int(totales_competencia[j])
+                    fila_adicionales = motor.fila[FILA_ADICIONALES]
+                    scores_adicionales = {comp_key: int(puntajes[fila_adicionales, motor.columna[comp_key]]) for comp_key in componentes_adicionales.keys()}
                     comentarios = {k.replace("_comment_input", "").replace("_", " -> "): v for k, v in st.session_state.calificaciones.items() if "comment" in k and v.strip()}
                     
                     datos_estudiante = {
                         "nombres": student_names_str, "scores_grid": scores_grid,
                         "scores_adicionales": scores_adicionales, "comentarios": comentarios,
                         "comentario_final": final_comment, "puntaje_total": total_score,
-                        "calificacion_final": calculated_grade
+                        "calificacion_final": calculated_grade,
+                        "fecha": datetime.date.today().strftime('%Y-%m-%d')
                     }
                     
-                    guardar_nota(st.session_state.current_group, calculated_grade, subjective_grade)
-                    st.success(f"¡Calificaciones guardadas en '{GRADEBOOK_FILE}'!")
+                    with perfil.fase("guardar_nota"):
+                        futuros = guardar_nota(st.session_state.current_group, calculated_grade, subjective_grade, tarea=tarea.strip(), puntajes=puntajes)
+                        futuros.append(escritor.ejecutar("guardar_reporte", student_names_str, "vigas", datos_estudiante, tarea=tarea.strip()))
+                    seguir_guardado(student_names_str, futuros)
+                    st.session_state.borrador_recuperado = 0
 
-                    pdf_data = generar_pdf(datos_estudiante)
-                    st.download_button(
-                        label="📥 Descargar Reporte PDF Individual",
-                        data=pdf_data,
-                        file_name=f"calificacion_{student_names_str.replace(' ', '_').replace(',', '')}.pdf",
-                        mime="application/pdf",
-                        use_container_width=True
-                    )
+                    with perfil.fase("pdf"):
+                        pedir_reporte("vigas", datos_estudiante, f"calificacion_{student_names_str.replace(' ', '_').replace(',', '')}.pdf")
             
+            descarga_reporte("📥 Descargar Reporte PDF Individual", ancho_completo=True)
+            estado_guardados(GRADEBOOK_FILE)
+            st.markdown("---")
+
+            acciones_libro(libro, GRADEBOOK_FILE, ancho_completo=True)
+            reportes_en_lote(libro)
             st.markdown("---")
             
             # --- NUEVA SECCIÓN DE RESET ---
@@ -276,8 +260,7 @@ if uploaded_file is not None:
                 with col_reset_1:
                     if st.button("✅ Sí, resetear", use_container_width=True, type="primary"):
                         # Lógica de reseteo
-                        st.session_state.calificaciones = {}
-                        st.session_state.current_group = []
+                        limpiar_calificacion()
                         st.session_state.confirm_reset = False
                         st.success("Formulario reseteado.")
                         st.rerun() # Recargar la app para ver los cambios
@@ -291,4 +274,6 @@ if uploaded_file is not None:
                     st.rerun()
 
 else:
-    st.info("Por favor, carga el archivo CSV con la lista del curso para comenzar a calificar.")
\ No newline at end of file
+    st.info("Por favor, carga el archivo CSV con la lista del curso para comenzar a calificar.")
+
+panel_perfil(perfil)
@@ -1,94 +1,33 @@
 import streamlit as st
-import pandas as pd
 import datetime
 import os
-from fpdf import FPDF
 import io
+from nucleo.libro_notas import abrir_libro
+from nucleo.rubricas import Rubrica
+from nucleo.escritor import escritor_para
+from nucleo.interfaz import (acciones_libro, cargar_lista_curso, cargar_rubrica, descarga_reporte, elegir_estudiantes,
+                             estado_guardados, panel_perfil, panel_reponderar, pedir_reporte, reportes_en_lote,
+                             seguir_guardado)
+from nucleo.perfilado import perfilador_desde_entorno
 
 # --- CONFIGURACIÓN INICIAL ---
 st.set_page_config(page_title="Calificador Flexible por Rúbricas", layout="wide", page_icon="📝")
-GRADEBOOK_FILE = "calificaciones_finales.csv"
+# Un archivo .db/.sqlite activa el libro en SQLite; cualquier otro usa CSV.
+GRADEBOOK_FILE = os.environ.get("CALIFICADOR_LIBRO", "calificaciones_finales.csv")
+libro = abrir_libro(GRADEBOOK_FILE)
+# Las escrituras pasan por el escritor único del libro, en segundo plano.
+escritor = escritor_para(libro)
+# Fases de cada ejecución (CALIFICADOR_PERFIL / CALIFICADOR_PERFIL_ARCHIVO).
+perfil = perfilador_desde_entorno("rubrica")
 
 # --- FUNCIONES AUXILIARES ---
 
-def guardar_nota(lista_estudiantes, calificacion_final):
-    if not os.path.exists(GRADEBOOK_FILE):
-        pd.DataFrame(columns=["Estudiante", "Calificacion Final", "Fecha"]).to_csv(GRADEBOOK_FILE, index=False)
-    df_gradebook = pd.read_csv(GRADEBOOK_FILE)
-    nuevas_notas = [{"Estudiante": est, "Calificacion Final": f"{calificacion_final:.2f}", "Fecha": datetime.date.today().strftime('%Y-%m-%d')} for est in lista_estudiantes]
-    df_nuevas_notas = pd.DataFrame(nuevas_notas)
-    df_gradebook = pd.concat([df_gradebook, df_nuevas_notas], ignore_index=True)
-    df_gradebook.to_csv(GRADEBOOK_FILE, index=False)
-
-def parse_rubric_csv(df):
-    preguntas_col, sub_item_cols = df.columns[0], df.columns[1:-2]
-    rubric = [{'pregunta': row[preguntas_col], 'sub_items': [item for item in sub_item_cols if str(row[item]).strip().lower() == 'si'], 'sobre': row['sobre'], 'peso': row['peso']} for _, row in df.iterrows()]
-    return rubric
-
-def generar_reporte_dinamico_pdf(datos_reporte):
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_font("Arial", "B", 16)
-    pdf.cell(0, 10, "Reporte de Calificación", 0, 1, "C")
-    pdf.ln(5)
-    pdf.set_font("Arial", "", 12)
-    pdf.multi_cell(0, 8, f"Estudiante(s): {datos_reporte['nombres']}", 0, 1)
-    pdf.cell(0, 8, f"Fecha: {datetime.date.today().strftime('%Y-%m-%d')}", 0, 1)
-    pdf.ln(10)
-    COLOR_ROJO, COLOR_AMARILLO, COLOR_VERDE, COLOR_NEGRO = (220, 53, 69), (255, 193, 7), (40, 167, 69), (0, 0, 0)
-    def get_color_for_score_0_5(score): # Modificado para escala 0-5
-        if score < 3.0: return COLOR_ROJO
-        elif score < 4.0: return COLOR_AMARILLO
-        else: return COLOR_VERDE
-    pdf.set_font("Arial", "B", 10)
-    pdf.cell(90, 8, "Item Evaluado", 1, 0, "C")
-    pdf.cell(70, 8, "Sub-item", 1, 0, "C")
-    pdf.cell(30, 8, "Puntaje (0-5)", 1, 1, "C")
-    pdf.set_font("Arial", "", 9)
-    for pregunta in datos_reporte['rubrica']:
-        nombre_pregunta = pregunta['pregunta']
-        # Usar el promedio guardado para el color
-        promedio_pregunta = datos_reporte['promedios_por_pregunta'][nombre_pregunta]
-        pdf.set_font("Arial", "B", 9)
-        pdf.cell(90, 8, nombre_pregunta, 1, 0, "L")
-        pdf.cell(70, 8, f"Promedio: {promedio_pregunta:.2f}", 1, 0, "C")
-        color = get_color_for_score_0_5(promedio_pregunta)
-        pdf.set_text_color(*color)
-        pdf.cell(30, 8, f"{promedio_pregunta:.2f}", 1, 1, "C")
-        pdf.set_text_color(*COLOR_NEGRO)
-        pdf.set_font("Arial", "", 9)
-        for sub_item in pregunta['sub_items']:
-            puntaje_sub_item = datos_reporte['calificaciones'][pregunta['pregunta']][sub_item]
-            pdf.cell(90, 6, "", 'L', 0)
-            pdf.cell(70, 6, f"- {sub_item}", 'LR', 0, "L")
-            pdf.cell(30, 6, f"{puntaje_sub_item:.2f}", 'R', 1, "C")
-    pdf.ln(10)
-    # ... (resto de la función de PDF sin cambios)
-    pdf.set_font("Arial", "B", 12)
-    pdf.cell(0, 10, "Comentarios de Retroalimentación", 0, 1)
-    pdf.set_font("Arial", "", 10)
-    comentarios_opcionales_ingresados = False
-    for pregunta, comentario in datos_reporte.get('optional_comments', {}).items():
-        if comentario.strip():
-            pdf.set_font("Arial", "B", 10)
-            pdf.multi_cell(0, 6, f"- Sobre '{pregunta}':")
-            pdf.set_font("Arial", "I", 10)
-            pdf.multi_cell(0, 6, f'"{comentario}"')
-            comentarios_opcionales_ingresados = True
-    pdf.ln(5)
-    pdf.set_font("Arial", "B", 12)
-    pdf.cell(0, 10, "Comentario Final", 0, 1)
-    pdf.set_font("Arial", "", 10)
-    pdf.multi_cell(0, 6, datos_reporte.get('final_comment', ''))
-    pdf.ln(10)
-    pdf.set_font("Arial", "B", 14)
-    pdf.cell(0, 12, f"Calificación Final: {datos_reporte['calificacion_final']:.2f} / 5.0", 0, 1, "R")
-    if datos_reporte.get('firmar', False):
-        pdf.set_y(-40)
-        pdf.set_font("Arial", "", 10)
-        pdf.cell(80, 8, "_" * 35, 0, 1, "C")
-        pdf.cell(80, 8, "Firma del Docente", 0, 1, "C")
-    return pdf.output(dest='S').encode('latin-1')
+def guardar_nota(lista_estudiantes, calificacion_final, rubrica, puntajes, tarea=""):
+    """Encola la nota y los puntajes crudos (con la versión de la rúbrica); devuelve los Futures."""
+    # Con los puntajes crudos, corregir después un peso recalcula la nota sin volver a calificar.
+    return [escritor.guardar(lista_estudiantes, calificacion_final, tarea=tarea),
+            escritor.ejecutar("guardar_puntajes_rubrica", rubrica,
+                              [(list(lista_estudiantes), puntajes.copy(), calificacion_final)], tarea=tarea)]
 
 def add_enunciado_callback():
     new_pregunta = st.session_state.new_enunciado_input
@@ -131,23 +70,26 @@ if st.session_state.app_mode == 'define_rubric':
                 if st.button("✅ Finalizar y Usar esta Rúbrica", type="primary"):
                     if not st.session_state.rubric_builder_data['preguntas']: st.error("Debes agregar al menos un enunciado.")
                     else:
-                        st.session_state.rubric = st.session_state.rubric_builder_data['preguntas']
-                        st.session_state.app_mode = 'grading'
-                        st.rerun()
+                        try:
+                            st.session_state.rubric = Rubrica.desde_lista(st.session_state.rubric_builder_data['preguntas'], st.session_state.rubric_builder_data['all_sub_items'])
+                        except ValueError as e:
+                            st.error(f"Rúbrica no válida: {e}")
+                        else:
+                            st.session_state.app_mode = 'grading'
+                            st.rerun()
             with col_download:
                 if st.session_state.rubric_builder_data['preguntas']:
-                    rows = [{'Enunciado': p['pregunta'], **{si:('si' if si in p['sub_items'] else 'no') for si in st.session_state.rubric_builder_data['all_sub_items']}, 'sobre':p['sobre'], 'peso':p['peso']} for p in st.session_state.rubric_builder_data['preguntas']]
-                    df_to_download = pd.DataFrame(rows)
-                    st.download_button(label="📥 Descargar Rúbrica como CSV", data=df_to_download.to_csv(index=False, sep=';').encode('utf-8'), file_name="rubrica_generada.csv", mime="text/csv")
+                    rubrica_csv = Rubrica.desde_lista(st.session_state.rubric_builder_data['preguntas'], st.session_state.rubric_builder_data['all_sub_items']).a_csv()
+                    st.download_button(label="📥 Descargar Rúbrica como CSV", data=rubrica_csv, file_name="rubrica_generada.csv", mime="text/csv")
     with tab2:
         st.info("Sube un archivo CSV de una rúbrica que hayas generado y descargado previamente.")
         uploaded_rubric_file = st.file_uploader("Cargar archivo de rúbrica (.csv)", type=["csv"], key="rubric_uploader")
         if uploaded_rubric_file is not None:
             try:
-                df = pd.read_csv(uploaded_rubric_file, sep=';')
-                st.write("**Vista Previa de la Rúbrica Cargada:**"); st.dataframe(df)
+                rubrica_cargada = cargar_rubrica(uploaded_rubric_file)
+                st.write("**Vista Previa de la Rúbrica Cargada:**"); st.dataframe(rubrica_cargada.tabla())
                 if st.button("Usar Rúbrica Cargada"):
-                    st.session_state.rubric = parse_rubric_csv(df)
+                    st.session_state.rubric = rubrica_cargada
                     st.session_state.app_mode = 'grading'
                     st.rerun()
             except Exception as e:
@@ -157,15 +99,14 @@ elif st.session_state.app_mode == 'grading':
     st.header("Paso 2: Cargar Lista del Curso")
     uploaded_students = st.file_uploader("Sube el archivo .csv con la lista de estudiantes", type=["csv"])
     if uploaded_students:
-        df_students = pd.read_csv(uploaded_students, encoding='latin1')
-        student_list = df_students['NOMBRE COMPLETO'].tolist()
+        with perfil.fase("lista"):
+            student_list = cargar_lista_curso(uploaded_students)
         st.header("Paso 3: Seleccionar Grupo y Calificar")
         if 'current_group' not in st.session_state: st.session_state.current_group = []
         col_select, col_group = st.columns(2)
         with col_select:
-            selected_student = st.selectbox("Elige un estudiante:", student_list)
-            if st.button("➕ Agregar Estudiante"):
-                if selected_student not in st.session_state.current_group: st.session_state.current_group.append(selected_student)
+            nuevos = elegir_estudiantes(student_list, "Elige un estudiante:")
+            st.session_state.current_group = list(dict.fromkeys(st.session_state.current_group + nuevos))
         with col_group:
             st.write("**Grupo Actual:**", ", ".join(st.session_state.current_group) or "Ninguno")
             if st.button("🗑️ Limpiar Grupo"):
@@ -173,21 +114,26 @@ elif st.session_state.app_mode == 'grading':
                 st.rerun()
         student_names_str = ", ".join(st.session_state.current_group)
         st.markdown("---")
-        calificaciones, optional_comments, total_peso = {}, {}, sum(p['peso'] for p in st.session_state.rubric)
-        with st.form("grading_form"):
-            for pregunta_data in st.session_state.rubric:
-                pregunta = pregunta_data['pregunta']
+        # La rúbrica ya está compilada: el formulario recorre su estructura y
+        # puntúa con su motor, sin volver a interpretarla en cada rerun.
+        rubrica = st.session_state.rubric
+        motor = rubrica.motor
+        calificaciones, optional_comments, puntajes = {}, {}, motor.vacio()
+        with st.form("grading_form"), perfil.fase("widgets"):
+            for fila, (pregunta, sub_items) in enumerate(rubrica.estructura):
                 st.markdown(f"#### {pregunta}")
                 calificaciones[pregunta] = {}
                 # --- CAMBIO IMPORTANTE: max_value AHORA ES 5.0 ---
                 # Cada sub-item se califica de 0 a 5
-                cols = st.columns(len(pregunta_data['sub_items'])) if pregunta_data['sub_items'] else [st]
-                for i, sub_item in enumerate(pregunta_data['sub_items']):
+                cols = st.columns(len(sub_items)) if sub_items else [st]
+                for i, sub_item in enumerate(sub_items):
                     with cols[i]:
                         calificaciones[pregunta][sub_item] = st.number_input(label=sub_item, min_value=0.0, max_value=5.0, step=0.5, key=f"{pregunta}_{sub_item}")
+                        puntajes[fila, motor.columna[sub_item]] = calificaciones[pregunta][sub_item]
                 optional_comments[pregunta] = st.text_input("Comentario opcional para este enunciado:", key=f"comment_{pregunta}")
             st.markdown("---")
             final_comment = st.text_area("Comentario Final (Obligatorio):", height=150)
+            tarea = st.text_input("Actividad (opcional):", placeholder="Ej: Parcial 1")
             firmar_documento = st.checkbox("Incluir firma del docente en el reporte")
             submitted = st.form_submit_button("Calcular Nota Final y Guardar")
         if submitted:
@@ -195,41 +141,38 @@ elif st.session_state.app_mode == 'grading':
                 st.error("¡Error! El comentario final es obligatorio.")
                 st.stop()
 
-            # --- LÓGICA DE CÁLCULO COMPLETAMENTE CORREGIDA ---
-            final_score_ponderado = 0
-            promedios_por_pregunta = {} # Para el reporte PDF
-            
-            for pregunta_data in st.session_state.rubric:
-                pregunta, peso = pregunta_data['pregunta'], pregunta_data['peso']
-                
-                # 1. Calcular el promedio de las competencias (sub-items) para esta pregunta
-                scores_sub_items = calificaciones[pregunta].values()
-                num_sub_items = len(scores_sub_items)
-                
-                if num_sub_items > 0:
-                    promedio_pregunta = sum(scores_sub_items) / num_sub_items
-                else:
-                    promedio_pregunta = 0
-                
-                promedios_por_pregunta[pregunta] = promedio_pregunta
-                
-                # 2. Sumar al puntaje final ponderado
-                final_score_ponderado += promedio_pregunta * peso
-
-            # 3. Normalizar el resultado final
-            if total_peso > 0:
-                nota_final = final_score_ponderado / total_peso
-            else:
-                nota_final = 0.0
+            # Promedio de los sub-items de cada pregunta y promedio ponderado por
+            # los pesos, en una sola llamada al motor.
+            with perfil.fase("puntuacion"):
+                resultado = motor.puntuar(puntajes)
+            nota_final = float(resultado.nota_final)
+            promedios_por_pregunta = dict(zip(motor.preguntas, resultado.promedios.tolist())) # Para el reporte PDF
 
             st.session_state.final_grade, st.session_state.calificaciones_data = nota_final, calificaciones
             st.metric("Calificación Final Calculada", f"{st.session_state.final_grade:.2f} / 5.0")
             
             if st.session_state.current_group:
-                guardar_nota(st.session_state.current_group, st.session_state.final_grade)
-                st.success(f"¡Calificación guardada individualmente en '{GRADEBOOK_FILE}'!")
-                datos_reporte = {"nombres": student_names_str, "calificacion_final": st.session_state.final_grade, "rubrica": st.session_state.rubric, "calificaciones": st.session_state.calificaciones_data, "firmar": firmar_documento, "optional_comments": optional_comments, "final_comment": final_comment, "promedios_por_pregunta": promedios_por_pregunta}
-                pdf_data = generar_reporte_dinamico_pdf(datos_reporte)
-                st.download_button(label="📥 Descargar Reporte en PDF", data=pdf_data, file_name=f"calificacion_{student_names_str.replace(' ', '_')}.pdf", mime="application/pdf")
+                with perfil.fase("guardar_nota"):
+                    futuros = guardar_nota(st.session_state.current_group, st.session_state.final_grade, rubrica, puntajes,
+                                           tarea=tarea.strip())
+                datos_reporte = {"nombres": student_names_str, "calificacion_final": st.session_state.final_grade, "rubrica": rubrica, "calificaciones": st.session_state.calificaciones_data, "firmar": firmar_documento, "optional_comments": optional_comments, "final_comment": final_comment, "promedios_por_pregunta": promedios_por_pregunta, "fecha": datetime.date.today().strftime('%Y-%m-%d')}
+                # El mismo contenido que queda en el libro, así que también es la clave de la caché de PDF.
+                datos_reporte = {**datos_reporte, "rubrica": rubrica.como_lista()}
+                with perfil.fase("guardar_nota"):
+                    futuros.append(escritor.ejecutar("guardar_reporte", student_names_str, "rubrica", datos_reporte, tarea=tarea.strip()))
+                seguir_guardado(student_names_str, futuros)
+                with perfil.fase("pdf"):
+                    pedir_reporte("rubrica", datos_reporte, f"calificacion_{student_names_str.replace(' ', '_')}.pdf")
             else:
-                st.warning("Por favor, selecciona al menos un estudiante para guardar la nota.")
\ No newline at end of file
+                st.warning("Por favor, selecciona al menos un estudiante para guardar la nota.")
+        descarga_reporte("📥 Descargar Reporte en PDF")
+        estado_guardados(GRADEBOOK_FILE)
+        acciones_libro(libro, GRADEBOOK_FILE)
+        with st.sidebar:
+            reportes_en_lote(libro)
+            corregida = panel_reponderar(escritor, rubrica)
+            if corregida is not None:
+                # Lo que se califique desde ahora usa los pesos corregidos.
+                st.session_state.rubric = corregida
+
+panel_perfil(perfil)
@@ -0,0 +1,170 @@
+"""Calificador por lotes, sin navegador.
+
+Lee una rúbrica (el CSV separado por ';' que exporta calificador_rubrica.py)
+y un CSV de puntajes con una fila por grupo, calcula todas las notas con el
+motor de puntuación, las guarda en el libro de notas y, si se pide, genera
+todos los reportes PDF en un ZIP.
+
+Formato del CSV de puntajes:
+  * "Estudiantes": nombres del grupo separados por ';'.
+  * Una columna "<enunciado> | <sub-item>" por cada sub-item de la rúbrica
+    (puntajes de 0 a 5; una celda vacía cuenta como 0).
+  * Opcionales: "Comentario Final" y "Comentario | <enunciado>".
+
+Los puntajes crudos quedan en el libro con la versión de la rúbrica: con
+--reponderar, una rúbrica corregida (p. ej. otro peso) recalcula las notas ya
+guardadas de la actividad sin volver a calificar.
+
+Ejemplos:
+  python calificar_lote.py rubrica.csv --plantilla puntajes.csv
+  python calificar_lote.py rubrica.csv puntajes.csv --tarea "Parcial 1" --pdf reportes.zip
+  python calificar_lote.py rubrica_corregida.csv --reponderar --tarea "Parcial 1"
+"""
+import argparse
+import csv
+import datetime
+import sys
+import time
+
+from nucleo.libro_notas import abrir_libro
+from nucleo.reportes import generar_lote_zip, nombre_archivo_reporte
+from nucleo.rubricas import leer_rubrica_csv
+
+COLUMNA_ESTUDIANTES = "Estudiantes"
+COLUMNA_COMENTARIO_FINAL = "Comentario Final"
+SEPARADOR_COLUMNA = " | "
+
+
+def columna_puntaje(pregunta, sub_item):
+    return f"{pregunta}{SEPARADOR_COLUMNA}{sub_item}"
+
+
+def columna_comentario(pregunta):
+    return f"Comentario{SEPARADOR_COLUMNA}{pregunta}"
+
+
+def escribir_plantilla(rubrica, destino):
+    columnas = [COLUMNA_ESTUDIANTES]
+    columnas += [columna_puntaje(p, s) for p, sub_items in rubrica.estructura for s in sub_items]
+    columnas += [columna_comentario(p) for p in rubrica.preguntas] + [COLUMNA_COMENTARIO_FINAL]
+    with open(destino, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f, lineterminator="\n").writerow(columnas)
+
+
+def leer_puntajes(df, rubrica):
+    """Arreglo (grupos, preguntas, sub-items) con los puntajes de todas las filas."""
+    import pandas as pd
+    faltantes = [columna_puntaje(p, s) for p, sub_items in rubrica.estructura for s in sub_items
+                 if columna_puntaje(p, s) not in df.columns]
+    if COLUMNA_ESTUDIANTES not in df.columns:
+        faltantes.insert(0, COLUMNA_ESTUDIANTES)
+    if faltantes:
+        raise ValueError("Faltan columnas en el CSV de puntajes: " + ", ".join(faltantes))
+
+    motor = rubrica.motor
+    puntajes = motor.vacio(len(df))
+    for i, (p, sub_items) in enumerate(rubrica.estructura):
+        for s in sub_items:
+            columna = pd.to_numeric(df[columna_puntaje(p, s)], errors='coerce')
+            invalidos = df.index[columna.notna() & ~columna.between(0, 5)]
+            if len(invalidos):
+                filas = ", ".join(str(f + 2) for f in invalidos[:5])
+                raise ValueError(f"Puntajes fuera de 0-5 en '{columna_puntaje(p, s)}' (filas {filas}).")
+            puntajes[:, i, motor.columna[s]] = columna.fillna(0.0).to_numpy()
+    return puntajes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Califica muchos grupos a partir de una rúbrica y un CSV de puntajes.")
+    parser.add_argument("rubrica", help="CSV de la rúbrica (separado por ';').")
+    parser.add_argument("puntajes", nargs="?", help="CSV con una fila por grupo.")
+    parser.add_argument("--plantilla", metavar="CSV", help="Escribe un CSV de puntajes vacío para la rúbrica y termina.")
+    parser.add_argument("--libro", default="calificaciones_finales.csv", help="Libro de notas (.csv, o .db/.sqlite para SQLite).")
+    parser.add_argument("--tarea", default="", help="Nombre de la actividad.")
+    parser.add_argument("--fecha", default=None, help="Fecha de calificación (AAAA-MM-DD); por defecto, hoy.")
+    parser.add_argument("--pdf", metavar="ZIP", help="Genera todos los reportes PDF en este ZIP.")
+    parser.add_argument("--reponderar", action="store_true",
+                        help="Recalcula con esta rúbrica las notas ya guardadas de --tarea y termina.")
+    parser.add_argument("--firmar", action="store_true", help="Incluye la firma del docente en los reportes.")
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos para generar los PDF (por defecto, todos los núcleos).")
+    args = parser.parse_args(argv)
+
+    rubrica = leer_rubrica_csv(args.rubrica)
+    if args.plantilla:
+        escribir_plantilla(rubrica, args.plantilla)
+        print(f"Plantilla de puntajes escrita en '{args.plantilla}'.")
+        return 0
+    if args.reponderar:
+        inicio = time.perf_counter()
+        resultado = abrir_libro(args.libro).reponderar(rubrica, tarea=args.tarea)
+        print(f"{resultado.recalculadas} notas recalculadas con la rúbrica {resultado.version} en "
+              f"{time.perf_counter() - inicio:.2f} s; {len(resultado.cambios)} cambiaron.")
+        if resultado.omitidas:
+            print(f"{resultado.omitidas} registros de otra rúbrica no se tocaron.")
+        if len(resultado.cambios):
+            print(resultado.cambios.to_string(index=False))
+        return 0
+    if not args.puntajes:
+        parser.error("falta el CSV de puntajes (o use --plantilla o --reponderar).")
+
+    # pandas se carga aquí y no al importar el módulo: --help no lo necesita.
+    import pandas as pd
+
+    inicio = time.perf_counter()
+    motor = rubrica.motor
+    df = pd.read_csv(args.puntajes, dtype={COLUMNA_ESTUDIANTES: str}, keep_default_na=False, na_values=[""])
+    try:
+        puntajes = leer_puntajes(df, rubrica)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    resultado = motor.puntuar(puntajes)
+
+    grupos = [[n.strip() for n in str(nombres).split(";") if n.strip()] for nombres in df[COLUMNA_ESTUDIANTES].fillna("")]
+    fecha = args.fecha or datetime.date.today().strftime('%Y-%m-%d')
+    notas = resultado.nota_final.tolist()
+    # Las filas sin estudiantes no se guardan ni cuentan en el resumen.
+    filas = [i for i, g in enumerate(grupos) if g]
+    libro = abrir_libro(args.libro)
+    libro.guardar_lote([(grupos[i], notas[i], None) for i in filas], tarea=args.tarea, fecha=fecha)
+    libro.guardar_puntajes_rubrica(rubrica, [(grupos[i], puntajes[i], notas[i]) for i in filas],
+                                   tarea=args.tarea, fecha=fecha)
+    n_estudiantes = sum(len(grupos[i]) for i in filas)
+    promedio = sum(notas[i] for i in filas) / len(filas) if filas else 0
+    print(f"{len(filas)} grupos ({n_estudiantes} estudiantes) calificados y guardados en '{args.libro}' "
+          f"en {time.perf_counter() - inicio:.2f} s. Nota promedio: {promedio:.2f}.")
+    if len(filas) < len(df):
+        print(f"{len(df) - len(filas)} filas sin estudiantes no se guardaron.")
+
+    if args.pdf:
+        trabajos = []
+        for fila, (grupo, nota, promedios) in enumerate(zip(grupos, resultado.nota_final.tolist(), resultado.promedios.tolist())):
+            if not grupo:
+                continue
+            calificaciones = {p: {s: float(puntajes[fila, i, motor.columna[s]]) for s in sub_items}
+                              for i, (p, sub_items) in enumerate(rubrica.estructura)}
+            comentarios = {p: str(df.at[fila, columna_comentario(p)])
+                           for p in rubrica.preguntas if columna_comentario(p) in df.columns
+                           and pd.notna(df.at[fila, columna_comentario(p)])}
+            comentario_final = df.at[fila, COLUMNA_COMENTARIO_FINAL] if COLUMNA_COMENTARIO_FINAL in df.columns else ""
+            nombres = ", ".join(grupo)
+            datos_reporte = {"nombres": nombres, "calificacion_final": nota, "rubrica": rubrica.como_lista(),
+                             "calificaciones": calificaciones, "firmar": args.firmar,
+                             "optional_comments": comentarios,
+                             "final_comment": "" if pd.isna(comentario_final) else str(comentario_final),
+                             "promedios_por_pregunta": dict(zip(motor.preguntas, promedios)), "fecha": fecha}
+            trabajos.append((nombre_archivo_reporte(nombres, args.tarea), "rubrica", datos_reporte))
+
+        def progreso(hechos, total, velocidad):
+            if hechos == total or hechos % max(1, total // 100) == 0:
+                print(f"\r{hechos}/{total} reportes · {velocidad:.1f} reportes/s", end="", file=sys.stderr)
+
+        with open(args.pdf, "wb") as destino:
+            _, resumen = generar_lote_zip(trabajos, destino=destino, procesos=args.procesos, progreso=progreso)
+        print(file=sys.stderr)
+        print(f"{resumen['reportes']} reportes en '{args.pdf}' ({resumen['reportes_por_segundo']:.1f} reportes/s).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,4 @@
+# Núcleo compartido (sin Streamlit) de las aplicaciones de calificación.
+# pandas y fpdf se importan dentro de las funciones que los usan: importar el
+# núcleo (y arrancar las apps o la CLI) no los carga hasta que hacen falta.
+# La única pieza que depende de Streamlit es nucleo.interfaz.
@@ -0,0 +1,116 @@
+import glob
+import json
+import os
+import re
+import time
+import uuid
+
+from nucleo.libro_notas import bloqueo_libro
+
+# --- Borradores de calificación ---
+#
+# Mientras se califica, cada campo que cambia se anexa como una línea
+# {"clave": ..., "valor": ...} a un registro local (write-ahead). No se vuelve a
+# escribir el estado completo en cada cambio: reanudar es reproducir el
+# registro en orden (el último valor de cada clave gana). Al guardar la nota el
+# borrador se elimina.
+#
+# Cada sesión del navegador tiene su propio borrador: varios docentes califican
+# sobre el mismo libro y ninguno debe ver (ni borrar) lo que otro no ha
+# guardado. El identificador va en la URL, así que recargar la página retoma
+# el mismo borrador. Los de pestañas abandonadas se borran a los
+# DIAS_BORRADOR días sin cambios, al abrir otra sesión.
+
+PARAMETRO_SESION = "borrador"
+DIAS_BORRADOR = 7
+
+
+def id_sesion(parametros):
+    """Identificador del borrador de la sesión, guardado en `parametros` (st.query_params).
+
+    Si la URL no trae uno válido, se crea uno nuevo.
+    """
+    actual = parametros.get(PARAMETRO_SESION, "")
+    if not re.fullmatch(r"[0-9a-f]{12}", actual or ""):
+        actual = uuid.uuid4().hex[:12]
+        parametros[PARAMETRO_SESION] = actual
+    return actual
+
+
+def ruta_borrador(ruta_libro, aplicacion, sesion=""):
+    """'calificaciones_finales.csv', 'vigas', 'a1b2' -> 'calificaciones_finales.borrador_vigas_a1b2.jsonl'."""
+    return f"{os.path.splitext(ruta_libro)[0]}.borrador_{aplicacion}{'_' + sesion if sesion else ''}.jsonl"
+
+
+def podar_borradores(ruta_libro, aplicacion, conservar=(), dias=DIAS_BORRADOR):
+    """Borra los borradores de `aplicacion` sin cambios hace más de `dias` días.
+
+    Devuelve cuántos borró; los de `conservar` (rutas) no se tocan.
+    """
+    limite = time.time() - dias * 86400
+    patron = glob.escape(ruta_borrador(ruta_libro, aplicacion, "x"))[:-len("x.jsonl")] + "*.jsonl"
+    borrados = 0
+    with bloqueo_libro(ruta_borrador(ruta_libro, aplicacion)):
+        for ruta in glob.glob(patron):
+            if ruta in conservar:
+                continue
+            try:
+                if os.path.getmtime(ruta) < limite:
+                    os.remove(ruta)
+                    borrados += 1
+            except FileNotFoundError:
+                continue
+    return borrados
+
+
+class Borrador:
+    def __init__(self, ruta, bloqueo=None):
+        # `bloqueo` es la ruta cuyo ".lock" serializa anexos, compactación y
+        # borrado (por defecto, la del propio borrador).
+        self.ruta = ruta
+        self.bloqueo = bloqueo or ruta
+
+    def anotar(self, clave, valor):
+        # Sin fsync: un borrador se puede perder con el sistema operativo, no
+        # con el navegador ni con la app, y así cada cambio cuesta microsegundos.
+        linea = json.dumps({"clave": clave, "valor": valor}, ensure_ascii=False) + "\n"
+        with bloqueo_libro(self.bloqueo), open(self.ruta, "a", encoding="utf-8") as f:
+            f.write(linea)
+
+    def existe(self):
+        return os.path.exists(self.ruta)
+
+    def leer(self):
+        """Estado reconstruido a partir del registro ({} si no hay borrador)."""
+        estado = {}
+        if not os.path.exists(self.ruta):
+            return estado
+        with open(self.ruta, encoding="utf-8") as f:
+            for linea in f:
+                try:
+                    cambio = json.loads(linea)
+                except json.JSONDecodeError:
+                    # La última línea puede haber quedado cortada.
+                    continue
+                if isinstance(cambio, dict) and "clave" in cambio:
+                    estado[cambio["clave"]] = cambio.get("valor")
+        return estado
+
+    def compactar(self):
+        """Reescribe el registro con una línea por clave y devuelve el estado."""
+        with bloqueo_libro(self.bloqueo):
+            estado = self.leer()
+            if not estado:
+                self.descartar()
+                return estado
+            temporal = self.ruta + ".tmp"
+            with open(temporal, "w", encoding="utf-8") as f:
+                for clave, valor in estado.items():
+                    f.write(json.dumps({"clave": clave, "valor": valor}, ensure_ascii=False) + "\n")
+            os.replace(temporal, self.ruta)
+        return estado
+
+    def descartar(self):
+        with bloqueo_libro(self.bloqueo):
+            if os.path.exists(self.ruta):
+                os.remove(self.ruta)
@@ -0,0 +1,89 @@
+import collections
+import concurrent.futures
+import hashlib
+import json
+import threading
+
+from nucleo.reportes import GENERADORES
+
+# --- Reportes PDF en segundo plano, con caché por contenido ---
+#
+# Los PDF individuales se generan en un pool de hilos y se guardan en una
+# caché LRU cuya clave es el SHA-1 de (tipo, datos del reporte). Pedir dos
+# veces el mismo reporte (volver a descargarlo, o la ejecución que sigue a la
+# descarga) no lo renderiza de nuevo; si ya se está generando, se devuelve el
+# mismo Future. Los datos se congelan en JSON al pedirlos: el reporte no cambia
+# si la sesión sigue editando los mismos diccionarios mientras se genera.
+
+MAXIMO_REPORTES = 64
+MAXIMO_BYTES = 32 * 1024 * 1024
+HILOS = 2
+
+
+def huella_reporte(tipo, datos):
+    """SHA-1 del tipo y los datos del reporte (serializados con claves ordenadas)."""
+    texto = json.dumps([tipo, datos], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(texto.encode("utf-8")).hexdigest(), texto
+
+
+class CacheReportes:
+    def __init__(self, maximo=MAXIMO_REPORTES, maximo_bytes=MAXIMO_BYTES, hilos=HILOS):
+        self.maximo, self.maximo_bytes = maximo, maximo_bytes
+        self._pdfs = collections.OrderedDict()
+        self._en_curso = {}
+        self._bytes = 0
+        self._bloqueo = threading.Lock()
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="reportes")
+        self.aciertos = self.fallos = 0
+
+    def pedir(self, tipo, datos):
+        """Future con los bytes del PDF; ya resuelto si el reporte está en caché."""
+        huella, texto = huella_reporte(tipo, datos)
+        with self._bloqueo:
+            if huella in self._pdfs:
+                self._pdfs.move_to_end(huella)
+                self.aciertos += 1
+                futuro = concurrent.futures.Future()
+                futuro.set_result(self._pdfs[huella])
+                return futuro
+            if huella in self._en_curso:
+                self.aciertos += 1
+                return self._en_curso[huella]
+            self.fallos += 1
+            futuro = self._pool.submit(self._renderizar, huella, texto)
+            self._en_curso[huella] = futuro
+            return futuro
+
+    def _renderizar(self, huella, texto):
+        try:
+            tipo, datos = json.loads(texto)
+            pdf = GENERADORES[tipo](datos)
+        except BaseException:
+            with self._bloqueo:
+                self._en_curso.pop(huella, None)
+            raise
+        with self._bloqueo:
+            self._en_curso.pop(huella, None)
+            self._pdfs[huella] = pdf
+            self._bytes += len(pdf)
+            # Se expulsan los menos usados hasta volver a los límites.
+            while len(self._pdfs) > self.maximo or (self._bytes > self.maximo_bytes and len(self._pdfs) > 1):
+                _, expulsado = self._pdfs.popitem(last=False)
+                self._bytes -= len(expulsado)
+        return pdf
+
+    def __len__(self):
+        return len(self._pdfs)
+
+
+_cache = None
+_cache_bloqueo = threading.Lock()
+
+
+def cache_reportes():
+    """La caché de reportes de este proceso (compartida por todas las sesiones)."""
+    global _cache
+    with _cache_bloqueo:
+        if _cache is None:
+            _cache = CacheReportes()
+        return _cache
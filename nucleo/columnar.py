@@ -0,0 +1,180 @@
+import datetime
+import io
+import os
+
+# --- Instantánea columnar (Parquet) del libro de notas ---
+#
+# Junto al CSV del libro ("calificaciones_finales.csv") se guarda una copia en
+# Parquet ("calificaciones_finales.parquet") con columnas tipadas: notas en
+# float64 y fechas como fechas (date32). Una consulta por estudiante, actividad
+# o fecha lee solo las columnas que pide y salta los grupos de filas cuyas
+# estadísticas (mínimo/máximo) no pueden coincidir, sin volver a interpretar
+# texto. Es opcional: sin pyarrow instalado todo sigue funcionando con el CSV.
+
+SUFIJO_COLUMNAR = ".parquet"
+FILAS_POR_GRUPO = 64 * 1024
+COLUMNAS_TEXTO = ("Estudiante", "Tarea")
+COLUMNA_FECHA = "Fecha"
+
+
+def hay_pyarrow():
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def ruta_columnar(ruta_libro):
+    return os.path.splitext(ruta_libro)[0] + SUFIJO_COLUMNAR
+
+
+def _tipar_tabla(tabla):
+    # Texto para nombres y actividades, fecha para "Fecha" y float64 para lo
+    # numérico (una columna vacía se lee como nula y también pasa a float64).
+    import pyarrow as pa
+    campos = []
+    for campo in tabla.schema:
+        tipo = campo.type
+        if campo.name in COLUMNAS_TEXTO:
+            tipo = pa.string()
+        elif campo.name == COLUMNA_FECHA and pa.types.is_timestamp(tipo):
+            tipo = pa.date32()
+        elif pa.types.is_null(tipo) or pa.types.is_integer(tipo):
+            tipo = pa.float64()
+        campos.append(pa.field(campo.name, tipo))
+    return tabla.cast(pa.schema(campos))
+
+
+def tabla_desde_csv(ruta_csv, renombrar=None):
+    """Lee el CSV del libro con pyarrow (sin pandas) y devuelve la tabla tipada."""
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    renombrar = renombrar or {}
+    texto = {c: pa.string() for c in COLUMNAS_TEXTO}
+    texto.update({original: pa.string() for original, nuevo in renombrar.items() if nuevo in COLUMNAS_TEXTO})
+    try:
+        tabla = pacsv.read_csv(ruta_csv, convert_options=pacsv.ConvertOptions(
+            column_types={**texto, COLUMNA_FECHA: pa.date32()}, strings_can_be_null=False))
+    except pa.ArrowInvalid:
+        # Fechas escritas a mano en otro formato: la columna queda como texto.
+        tabla = pacsv.read_csv(ruta_csv, convert_options=pacsv.ConvertOptions(column_types=texto))
+    tabla = tabla.rename_columns([renombrar.get(c, c) for c in tabla.column_names])
+    return _tipar_tabla(tabla)
+
+
+def escribir_parquet(tabla, destino):
+    """Escribe `tabla` en `destino` (ruta o archivo) con estadísticas por grupo de filas."""
+    import pyarrow.parquet as pq
+    pq.write_table(tabla, destino, row_group_size=FILAS_POR_GRUPO, compression="zstd")
+
+
+def escribir_instantanea(ruta_libro, renombrar=None):
+    """Rehace "<libro>.parquet" a partir del CSV y lo sustituye de forma atómica.
+
+    Se llama con el bloqueo del libro tomado. Devuelve la ruta escrita, o None
+    si no hay pyarrow o no hay CSV.
+    """
+    if not hay_pyarrow() or not os.path.exists(ruta_libro):
+        return None
+    destino = ruta_columnar(ruta_libro)
+    temporal = destino + ".tmp"
+    escribir_parquet(tabla_desde_csv(ruta_libro, renombrar), temporal)
+    os.replace(temporal, destino)
+    return destino
+
+
+def instantanea_al_dia(ruta_libro):
+    """True si el Parquet existe y no es más antiguo que el CSV."""
+    destino = ruta_columnar(ruta_libro)
+    return os.path.exists(destino) and os.stat(destino).st_mtime_ns >= os.stat(ruta_libro).st_mtime_ns
+
+
+def _fecha(valor):
+    if valor is None or isinstance(valor, datetime.date):
+        return valor
+    return datetime.date.fromisoformat(str(valor))
+
+
+def filtros_parquet(columnas, estudiante=None, tarea=None, desde=None, hasta=None):
+    """Filtros de pyarrow para las consultas del libro, o None si la consulta no
+    puede coincidir con ninguna fila (una actividad en un libro sin "Tarea")."""
+    filtros = []
+    if estudiante is not None:
+        filtros.append(("Estudiante", "in", [estudiante] if isinstance(estudiante, str) else list(estudiante)))
+    if tarea is not None:
+        if "Tarea" in columnas:
+            filtros.append(("Tarea", "==", tarea))
+        elif tarea != "":
+            return None
+    if desde is not None:
+        filtros.append((COLUMNA_FECHA, ">=", _fecha(desde)))
+    if hasta is not None:
+        filtros.append((COLUMNA_FECHA, "<=", _fecha(hasta)))
+    return filtros
+
+
+def leer_parquet(ruta, columnas=None, estudiante=None, tarea=None, desde=None, hasta=None):
+    """DataFrame con las columnas pedidas de las filas que cumplen los filtros."""
+    import pyarrow.parquet as pq
+    disponibles = pq.read_schema(ruta).names
+    columnas = [c for c in columnas if c in disponibles] if columnas else disponibles
+    filtros = filtros_parquet(disponibles, estudiante, tarea, desde, hasta)
+    if filtros is None:
+        tabla = pq.read_schema(ruta).empty_table().select(columnas)
+    else:
+        tabla = pq.read_table(ruta, columns=columnas, filters=filtros or None)
+    return tabla.to_pandas(date_as_object=False)
+
+
+# --- El mismo tipado y los mismos filtros en pandas ---
+#
+# Para las filas del diario, el libro SQLite y el caso sin pyarrow.
+
+def tipar_df(df, columnas_nota=()):
+    """Notas a float64 y "Fecha" a datetime64, como en la instantánea Parquet."""
+    import pandas as pd
+    df = df.copy()
+    for c in df.columns:
+        if c == COLUMNA_FECHA:
+            df[c] = pd.to_datetime(df[c], format="%Y-%m-%d", errors="coerce").astype("datetime64[ms]")
+        elif c in COLUMNAS_TEXTO:
+            df[c] = df[c].fillna("").astype(str)
+        elif c in columnas_nota or df[c].isna().all():
+            df[c] = pd.to_numeric(df[c], errors="coerce").astype("float64")
+    return df
+
+
+def filtrar_df(df, estudiante=None, tarea=None, desde=None, hasta=None):
+    import pandas as pd
+    mascara = pd.Series(True, index=df.index)
+    if estudiante is not None:
+        mascara &= df["Estudiante"].isin([estudiante] if isinstance(estudiante, str) else list(estudiante))
+    if tarea is not None:
+        mascara &= (df["Tarea"] if "Tarea" in df.columns else pd.Series("", index=df.index)) == tarea
+    if desde is not None:
+        mascara &= df[COLUMNA_FECHA] >= pd.Timestamp(_fecha(desde))
+    if hasta is not None:
+        mascara &= df[COLUMNA_FECHA] <= pd.Timestamp(_fecha(hasta))
+    return df[mascara]
+
+
+def parquet_desde_df(df, destino=None):
+    """Escribe un DataFrame de notas en Parquet ("Fecha" como date32).
+
+    Si `destino` es None devuelve los bytes (para un download_button).
+    """
+    import pyarrow as pa
+    try:
+        tabla = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Columnas que mezclan números y texto (p. ej. "NP" entre notas): van como texto.
+        df = df.copy()
+        for c in df.columns[df.dtypes == object]:
+            df[c] = df[c].map(lambda v: None if v is None or v != v else str(v))
+        tabla = pa.Table.from_pandas(df, preserve_index=False)
+    tabla = _tipar_tabla(tabla)
+    salida = destino if destino is not None else io.BytesIO()
+    escribir_parquet(tabla, salida)
+    if destino is None:
+        return salida.getvalue()
@@ -0,0 +1,114 @@
+import atexit
+import concurrent.futures
+import datetime
+import itertools
+import os
+import queue
+import threading
+
+from nucleo.libro_notas import bloqueo_libro
+
+# --- Escritor único del libro de notas ---
+#
+# Las apps no escriben en el libro desde el hilo de la sesión: encolan la
+# operación y reciben un Future. Un solo hilo por libro (compartido por todas
+# las sesiones del proceso) toma todo lo que haya en la cola y la ejecuta en
+# orden bajo un mismo bloqueo de archivo; los guardados de notas seguidos se
+# agrupan por actividad y fecha en un solo guardar_lote (un anexo y un fsync:
+# "group commit"). Cada Future se resuelve cuando su escritura ya está en
+# disco; si falla el lote entero (p. ej. al tomar el bloqueo), fallan todos sus
+# Future y el hilo sigue atendiendo la cola.
+
+MAXIMO_POR_LOTE = 256
+ESPERA_LOTE = 0.005  # segundos que se espera a que lleguen más guardados
+
+_FIN = object()
+
+
+class EscritorLibro:
+    def __init__(self, libro):
+        self.libro = libro
+        self._cola = queue.Queue()
+        self._hilo = threading.Thread(target=self._bucle, name=f"escritor-{os.path.basename(libro.ruta)}", daemon=True)
+        self._hilo.start()
+        atexit.register(self.cerrar)
+
+    def guardar(self, estudiantes, calificacion, calificacion_subjetiva=None, tarea="", fecha=None):
+        """Encola las notas de un grupo; la fecha se fija al encolar."""
+        fecha = fecha or datetime.date.today().strftime('%Y-%m-%d')
+        return self._encolar(("guardar", (list(estudiantes), calificacion, calificacion_subjetiva), {"tarea": tarea, "fecha": fecha}))
+
+    def ejecutar(self, metodo, *args, **kwargs):
+        """Encola otra escritura del libro, p. ej. ejecutar("guardar_reporte", grupo, tipo, datos)."""
+        return self._encolar((metodo, args, kwargs))
+
+    def _encolar(self, operacion):
+        futuro = concurrent.futures.Future()
+        self._cola.put((operacion, futuro))
+        return futuro
+
+    def cerrar(self, espera=10):
+        """Vacía la cola y detiene el hilo (al salir del proceso)."""
+        if self._hilo.is_alive():
+            self._cola.put(_FIN)
+            self._hilo.join(espera)
+
+    def _bucle(self):
+        while True:
+            lote = [self._cola.get()]
+            try:
+                while len(lote) < MAXIMO_POR_LOTE:
+                    lote.append(self._cola.get(timeout=ESPERA_LOTE))
+            except queue.Empty:
+                pass
+            fin = _FIN in lote
+            lote = [elemento for elemento in lote if elemento is not _FIN]
+            if lote:
+                self._escribir(lote)
+            if fin:
+                return
+
+    def _escribir(self, lote):
+        lote = [(operacion, futuro) for operacion, futuro in lote if futuro.set_running_or_notify_cancel()]
+        try:
+            with bloqueo_libro(self.libro.ruta):
+                for son_notas, tramo in itertools.groupby(lote, key=lambda elemento: elemento[0][0] == "guardar"):
+                    if son_notas:
+                        self._guardar_notas(tramo)
+                        continue
+                    for (metodo, args, kwargs), futuro in tramo:
+                        try:
+                            futuro.set_result(getattr(self.libro, metodo)(*args, **kwargs))
+                        except Exception as e:
+                            futuro.set_exception(e)
+        except Exception as e:
+            for _, futuro in lote:
+                if not futuro.done():
+                    futuro.set_exception(e)
+
+    def _guardar_notas(self, tramo):
+        notas = {}
+        for (_, args, kwargs), futuro in tramo:
+            notas.setdefault((kwargs["tarea"], kwargs["fecha"]), []).append((args, futuro))
+        for (tarea, fecha), grupos in notas.items():
+            try:
+                self.libro.guardar_lote([args for args, _ in grupos], tarea=tarea, fecha=fecha)
+            except Exception as e:
+                for _, futuro in grupos:
+                    futuro.set_exception(e)
+            else:
+                for _, futuro in grupos:
+                    futuro.set_result(len(grupos))
+
+
+_escritores = {}
+_escritores_bloqueo = threading.Lock()
+
+
+def escritor_para(libro):
+    """El escritor del libro en este proceso (se crea la primera vez)."""
+    clave = (os.path.abspath(libro.ruta), libro.columna_nota)
+    with _escritores_bloqueo:
+        if clave not in _escritores:
+            _escritores[clave] = EscritorLibro(libro)
+        return _escritores[clave]
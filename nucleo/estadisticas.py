@@ -0,0 +1,117 @@
+import numpy as np
+
+# --- Estadísticas del curso, acumuladas por guardado ---
+#
+# Cada guardado suma (o, al recalificar, resta) los puntajes de un estudiante a
+# acumuladores de Welford: conteo, media y suma de cuadrados de las
+# desviaciones por celda (problema x componente), más un histograma por celda.
+# Así la vista de estadísticas lee un tamaño fijo sin importar cuántas entregas
+# haya, y nada se recalcula recorriendo el libro.
+
+BORDES_PUNTAJE = np.arange(7.0)                # 0, 1, ..., 5 (puntajes enteros de 0 a 5)
+BORDES_NOTA = np.linspace(0.0, 5.0, 11)        # 0.0, 0.5, ..., 5.0
+
+
+class Acumulador:
+    __slots__ = ("n", "media", "m2", "histograma", "bordes")
+
+    def __init__(self, forma, bordes):
+        self.bordes = np.asarray(bordes, dtype=float)
+        self.n = 0
+        self.media = np.zeros(forma)
+        self.m2 = np.zeros(forma)
+        self.histograma = np.zeros(tuple(forma) + (len(self.bordes) - 1,), dtype=np.int64)
+
+    def _cubetas(self, x):
+        # La última cubeta incluye el borde superior.
+        return np.clip(np.searchsorted(self.bordes, x, side="right") - 1, 0, len(self.bordes) - 2)
+
+    def _contar(self, x, signo):
+        plano = self.histograma.reshape(-1, self.histograma.shape[-1])
+        np.add.at(plano, (np.arange(plano.shape[0]), self._cubetas(x).ravel()), signo)
+
+    def agregar(self, x):
+        x = np.asarray(x, dtype=float)
+        self.n += 1
+        delta = x - self.media
+        self.media = self.media + delta / self.n
+        self.m2 = self.m2 + delta * (x - self.media)
+        self._contar(x, 1)
+
+    def quitar(self, x):
+        """Deshace un `agregar(x)` anterior (para recalificaciones)."""
+        x = np.asarray(x, dtype=float)
+        if self.n <= 1:
+            self.__init__(self.media.shape, self.bordes)
+            return
+        media_anterior = self.media
+        self.n -= 1
+        self.media = (media_anterior * (self.n + 1) - x) / self.n
+        self.m2 = np.maximum(self.m2 - (x - media_anterior) * (x - self.media), 0.0)
+        self._contar(x, -1)
+
+    @property
+    def varianza(self):
+        return self.m2 / (self.n - 1) if self.n > 1 else np.zeros_like(self.m2)
+
+    def a_dict(self):
+        return {"n": self.n, "media": self.media.tolist(), "m2": self.m2.tolist(),
+                "histograma": self.histograma.tolist(), "bordes": self.bordes.tolist()}
+
+    @classmethod
+    def desde_dict(cls, datos):
+        acumulador = cls(np.shape(datos["media"]), datos["bordes"])
+        acumulador.n = datos["n"]
+        acumulador.media = np.asarray(datos["media"], dtype=float)
+        acumulador.m2 = np.asarray(datos["m2"], dtype=float)
+        acumulador.histograma = np.asarray(datos["histograma"], dtype=np.int64)
+        return acumulador
+
+
+class EstadisticasTarea:
+    """Acumuladores de una actividad: puntajes por celda y nota final."""
+    __slots__ = ("puntajes", "nota")
+
+    def __init__(self, forma):
+        self.puntajes = Acumulador(forma, BORDES_PUNTAJE)
+        self.nota = Acumulador((), BORDES_NOTA)
+
+    def agregar(self, puntajes, nota):
+        self.puntajes.agregar(puntajes)
+        self.nota.agregar(nota)
+
+    def quitar(self, puntajes, nota):
+        self.puntajes.quitar(puntajes)
+        self.nota.quitar(nota)
+
+    def a_dict(self):
+        return {"puntajes": self.puntajes.a_dict(), "nota": self.nota.a_dict()}
+
+    @classmethod
+    def desde_dict(cls, datos):
+        estadisticas = cls.__new__(cls)
+        estadisticas.puntajes = Acumulador.desde_dict(datos["puntajes"])
+        estadisticas.nota = Acumulador.desde_dict(datos["nota"])
+        return estadisticas
+
+
+def estadisticas_desde_dict(datos):
+    """{tarea: EstadisticasTarea} a partir de lo guardado en JSON."""
+    return {tarea: EstadisticasTarea.desde_dict(d) for tarea, d in datos.items()}
+
+
+def actualizar_estadisticas(estadisticas, tarea, nuevos, anteriores=()):
+    """Resta las entregas `anteriores` y suma los `nuevos` ((puntajes, nota)) de `tarea`."""
+    nuevos, anteriores = list(nuevos), list(anteriores)
+    if not nuevos and not anteriores:
+        return estadisticas
+    forma = np.shape((nuevos or anteriores)[0][0])
+    if tarea not in estadisticas:
+        estadisticas[tarea] = EstadisticasTarea(forma)
+    elif estadisticas[tarea].puntajes.media.shape != forma:
+        raise ValueError(f"Los puntajes de '{tarea}' deben tener la forma {estadisticas[tarea].puntajes.media.shape}.")
+    for puntajes, nota in anteriores:
+        estadisticas[tarea].quitar(puntajes, nota)
+    for puntajes, nota in nuevos:
+        estadisticas[tarea].agregar(puntajes, nota)
+    return estadisticas
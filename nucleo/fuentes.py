@@ -0,0 +1,270 @@
+import functools
+import os
+import struct
+import tempfile
+import unicodedata
+import warnings
+
+# --- Fuentes Unicode para los reportes PDF ---
+#
+# Las fuentes estándar de FPDF (Arial) solo cubren Latin-1. Un reporte cuyo
+# texto cabe en Latin-1 se sigue generando igual que siempre (sin fuente
+# incrustada); si trae algo más (comillas tipográficas, otros alfabetos), solo
+# las celdas con esos textos se dibujan con una fuente TrueType y el PDF
+# incrusta solo los estilos y glifos que usan.
+
+# Familias TrueType que se buscan, en orden: (regular, negrita, cursiva).
+FAMILIAS_TTF = [
+    ("DejaVuSans.ttf", "DejaVuSans-Bold.ttf", "DejaVuSans-Oblique.ttf"),
+    ("arial.ttf", "arialbd.ttf", "ariali.ttf"),
+    ("Arial.ttf", "Arial Bold.ttf", "Arial Italic.ttf"),
+]
+CARPETAS_FUENTES = [
+    os.environ.get("CALIFICADOR_FUENTES", ""),
+    "/usr/share/fonts/truetype/dejavu",
+    "/usr/share/fonts/dejavu",
+    "/usr/share/fonts/TTF",
+    "/Library/Fonts",
+    "/System/Library/Fonts/Supplemental",
+    os.path.join(os.environ.get("WINDIR", r"C:\Windows"), "Fonts"),
+]
+
+# Equivalentes Latin-1 cuando no hay ninguna fuente Unicode instalada.
+_EQUIVALENTES = str.maketrans({"“": '"', "”": '"', "„": '"', "‘": "'", "’": "'", "‚": "'",
+                               "–": "-", "—": "-", "•": "-", "…": "...", "€": "EUR"})
+
+
+@functools.lru_cache(maxsize=None)
+def archivos_unicode():
+    """{estilo: ruta del TTF} de la primera familia instalada, o None si no hay ninguna.
+
+    Si falta la negrita o la cursiva se usa la regular.
+    """
+    for carpeta in filter(None, CARPETAS_FUENTES):
+        for regular, negrita, cursiva in FAMILIAS_TTF:
+            if os.path.isfile(os.path.join(carpeta, regular)):
+                rutas = {}
+                for estilo, nombre in (("B", negrita), ("", regular), ("I", cursiva)):
+                    ruta = os.path.join(carpeta, nombre)
+                    rutas[estilo] = ruta if os.path.isfile(ruta) else os.path.join(carpeta, regular)
+                return rutas
+    return None
+
+
+# --- Textos del reporte ---
+
+def _mapear(datos, funcion):
+    # Una Rubrica compilada se pasa a su lista de dicts para que los nombres de
+    # sus enunciados cambien igual que las claves de "calificaciones".
+    if hasattr(datos, "como_lista"):
+        datos = datos.como_lista()
+    if isinstance(datos, str):
+        return funcion(datos)
+    if isinstance(datos, dict):
+        return {_mapear(k, funcion): _mapear(v, funcion) for k, v in datos.items()}
+    if isinstance(datos, (list, tuple)):
+        return type(datos)(_mapear(v, funcion) for v in datos)
+    return datos
+
+
+def _textos(datos):
+    if isinstance(datos, str):
+        yield datos
+    elif isinstance(datos, dict):
+        for k, v in datos.items():
+            yield from _textos(k)
+            yield from _textos(v)
+    elif isinstance(datos, (list, tuple)):
+        for v in datos:
+            yield from _textos(v)
+
+
+def _a_latin1(texto):
+    texto = unicodedata.normalize("NFKC", texto.translate(_EQUIVALENTES))
+    return texto.encode("latin-1", "replace").decode("latin-1")
+
+
+def preparar_textos(datos):
+    """Normaliza (NFC) los textos del reporte y dice si necesita la fuente Unicode.
+
+    Devuelve (datos, unicode). Sin fuente Unicode instalada, lo que no cabe en
+    Latin-1 se reemplaza por su equivalente más cercano (o "?"); con ella, lo
+    que la fuente no tiene.
+    """
+    datos = _mapear(datos, lambda texto: unicodedata.normalize("NFC", texto))
+    try:
+        "".join(_textos(datos)).encode("latin-1")
+        return datos, False
+    except UnicodeEncodeError:
+        pass
+    if archivos_unicode() is None:
+        return _mapear(datos, _a_latin1), False
+    # Lo que la fuente compacta no tiene (p. ej. emoji, que FPDF 1.7 tampoco
+    # sabe incrustar) se reemplaza igual que sin fuente Unicode.
+    caracteres = caracteres_unicode()
+    return _mapear(datos, lambda texto: "".join(
+        c if c in caracteres else _a_latin1(c) for c in texto)), True
+
+
+# --- Fuente TrueType en FPDF ---
+#
+# FPDF 1.7 incrusta una fuente TrueType leyendo de nuevo su archivo en cada
+# documento: recorre su tabla de caracteres y sus métricas completas y calcula
+# en Python la suma de verificación de todo lo que copia, incluidos los textos
+# de licencia de la tabla 'name'. Por eso, una vez (y se guarda en
+# CARPETA_CACHE para los demás procesos), se arma de cada estilo una copia
+# compacta: solo los bloques de REPERTORIO y una tabla 'name' con el nombre
+# PostScript y nada más. La primera vez que add_font la lee deja junto a ella
+# su .pkl de métricas, así que en cada documento no se vuelve a analizar.
+#
+# Además, la fuente se usa solo en las celdas cuyo texto no cabe en Latin-1
+# (ver clase_pdf_unicode) y se registra al primer uso de cada estilo: un
+# reporte con un nombre “entre comillas” incrusta un estilo con los glifos de
+# esa celda, no tres fuentes con todo el alfabeto.
+
+CARPETA_CACHE = os.environ.get("CALIFICADOR_CACHE_FUENTES") or os.path.join(tempfile.gettempdir(), "calificador_fuentes")
+FAMILIA_UNICODE = "Unicode"
+
+# Bloques de la copia compacta: latinos, griego, cirílico, puntuación y símbolos.
+REPERTORIO = (
+    (0x0020, 0x024F),  # Latin-1 y Latin extendido
+    (0x0370, 0x03FF),  # griego
+    (0x0400, 0x045F),  # cirílico
+    (0x2010, 0x205E),  # puntuación general
+    (0x20A0, 0x20BF),  # monedas
+    (0x2190, 0x2199),  # flechas
+    (0x2200, 0x22FF),  # operadores matemáticos
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _metricas(ruta):
+    from fpdf.ttfonts import TTFontFile
+    fuente = TTFontFile()
+    fuente.getMetrics(ruta)
+    return fuente
+
+
+@functools.lru_cache(maxsize=None)
+def caracteres_unicode():
+    """Caracteres de REPERTORIO que tienen glifo en todos los estilos de la fuente."""
+    anchos = [_metricas(ruta).charWidths for ruta in set(archivos_unicode().values())]
+    return frozenset(chr(c) for inicio, fin in REPERTORIO for c in range(inicio, fin + 1)
+                     if all(c < len(a) and a[c] for a in anchos))
+
+
+def _tabla_nombre(nombre_postscript):
+    # Formato 0 con un único registro: nombre PostScript (id 6) en Macintosh Roman.
+    texto = nombre_postscript.encode("latin-1", "replace")
+    return struct.pack(">6H", 0, 1, 18, 1, 0, 0) + struct.pack(">3H", 6, len(texto), 0) + texto
+
+
+def _suma(datos):
+    datos += b"\0" * (-len(datos) % 4)
+    return sum(struct.unpack(f">{len(datos) // 4}L", datos)) & 0xFFFFFFFF
+
+
+def _reemplazar_tabla(fuente, etiqueta, datos):
+    """Devuelve el TTF `fuente` (bytes) con la tabla `etiqueta` cambiada por `datos`."""
+    n_tablas = struct.unpack(">H", fuente[4:6])[0]
+    tablas = {}
+    for k in range(n_tablas):
+        tag, _, desde, largo = struct.unpack(">4s3L", fuente[12 + 16 * k:28 + 16 * k])
+        tablas[tag] = fuente[desde:desde + largo]
+    tablas[etiqueta] = datos
+    # head se suma con checkSumAdjustment en cero y se corrige al final.
+    tablas[b"head"] = tablas[b"head"][:8] + b"\0\0\0\0" + tablas[b"head"][12:]
+    directorio, cuerpo, inicio = [], b"", 12 + 16 * n_tablas
+    for tag in sorted(tablas):
+        datos = tablas[tag]
+        if tag == b"head":
+            ajuste = inicio + len(cuerpo) + 8
+        directorio.append(struct.pack(">4s3L", tag, _suma(datos), inicio + len(cuerpo), len(datos)))
+        cuerpo += datos + b"\0" * (-len(datos) % 4)
+    salida = bytearray(fuente[:12] + b"".join(directorio) + cuerpo)
+    struct.pack_into(">L", salida, ajuste, (0xB1B0AFBA - _suma(bytes(salida))) & 0xFFFFFFFF)
+    return bytes(salida)
+
+
+def _copia_compacta(ruta):
+    estado = os.stat(ruta)
+    base = os.path.splitext(os.path.basename(ruta))[0]
+    destino = os.path.join(CARPETA_CACHE, f"{base}-{estado.st_size}-{len(caracteres_unicode())}.ttf")
+    if not os.path.exists(destino):
+        from fpdf.ttfonts import TTFontFile
+        with warnings.catch_warnings():
+            # makeSubset avisa de cada glifo compuesto que referencia al glifo 0.
+            warnings.simplefilter("ignore")
+            compacta = TTFontFile().makeSubset(ruta, sorted(map(ord, caracteres_unicode())))
+        compacta = _reemplazar_tabla(compacta, b"name", _tabla_nombre(_metricas(ruta).name))
+        with open(destino + ".tmp", "wb") as f:
+            f.write(compacta)
+        os.replace(destino + ".tmp", destino)
+    return destino
+
+
+@functools.lru_cache(maxsize=None)
+def _fuentes_compactas():
+    """{estilo: copia compacta del TTF}, una vez por proceso.
+
+    Se arman y se registran una vez en un FPDF descartable (para que add_font
+    deje escrito su .pkl) con el bloqueo de la carpeta, y así otro proceso no
+    lee una copia o un .pkl a medio escribir.
+    """
+    from fpdf import FPDF
+    from nucleo.libro_notas import bloqueo_libro
+    os.makedirs(CARPETA_CACHE, exist_ok=True)
+    with bloqueo_libro(os.path.join(CARPETA_CACHE, "fuentes")):
+        copias = {estilo: _copia_compacta(ruta) for estilo, ruta in archivos_unicode().items()}
+        pdf = FPDF()
+        for estilo, ruta in copias.items():
+            pdf.add_font(FAMILIA_UNICODE, estilo, ruta, uni=True)
+    return copias
+
+
+def _fuente_compacta(estilo):
+    copias = _fuentes_compactas()
+    if not os.path.exists(copias[estilo]):
+        # Alguien limpió la carpeta temporal: se vuelve a armar.
+        _fuentes_compactas.cache_clear()
+        copias = _fuentes_compactas()
+    return copias[estilo]
+
+
+def _cabe_en_latin1(texto):
+    try:
+        texto.encode("latin-1")
+        return True
+    except UnicodeEncodeError:
+        return False
+
+
+@functools.lru_cache(maxsize=None)
+def clase_pdf_unicode():
+    """Subclase de FPDF para los reportes con texto fuera de Latin-1.
+
+    cell() y multi_cell() cambian a la fuente Unicode, con el mismo estilo y
+    tamaño, solo si su texto no cabe en Latin-1, y luego vuelven a la fuente
+    que estaba; cada estilo se registra con add_font la primera vez.
+    """
+    from fpdf import FPDF
+
+    class PDFUnicode(FPDF):
+        def _con_fuente_unicode(self, texto, dibujar):
+            if self.font_family == FAMILIA_UNICODE.lower() or _cabe_en_latin1(texto):
+                return dibujar()
+            familia, estilo, tamano = self.font_family, self.font_style, self.font_size_pt
+            self.add_font(FAMILIA_UNICODE, estilo, _fuente_compacta(estilo), uni=True)
+            self.set_font(FAMILIA_UNICODE, estilo, tamano)
+            try:
+                return dibujar()
+            finally:
+                self.set_font(familia, estilo, tamano)
+
+        def cell(self, w, h=0, txt="", border=0, ln=0, align="", fill=0, link=""):
+            return self._con_fuente_unicode(txt, lambda: super(PDFUnicode, self).cell(w, h, txt, border, ln, align, fill, link))
+
+        def multi_cell(self, w, h, txt="", border=0, align="J", fill=0, split_only=False):
+            return self._con_fuente_unicode(txt, lambda: super(PDFUnicode, self).multi_cell(w, h, txt, border, align, fill, split_only))
+
+    return PDFUnicode
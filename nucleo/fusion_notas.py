@@ -0,0 +1,259 @@
+import collections
+import csv
+import hashlib
+import io
+import os
+import re
+import threading
+import unicodedata
+
+# --- Unión de N archivos de calificaciones ---
+#
+# Cada archivo se recorre fila por fila una sola vez y se vuelca en una tabla
+# indexada por estudiante (clave normalizada); la unión alinea esas tablas por
+# la clave de una sola vez. No hay uniones por pares: el costo es lineal en el
+# total de filas y la memoria, la de la tabla final. Un archivo Parquet (la
+# instantánea del libro o un consolidado anterior) se lee solo en las columnas
+# que se van a unir, con las notas ya numéricas.
+#
+# La lectura de cada archivo no depende del nombre de su columna ni de los
+# demás archivos, así que `CacheFusion` la guarda por el SHA-1 del contenido:
+# al agregar o cambiar un archivo solo se vuelve a leer ese.
+#
+# Un mismo archivo puede traer varias actividades (la columna "Tarea" del
+# libro): cada tarea da sus propias columnas, "<nombre> · <tarea>".
+
+MAXIMO_ARCHIVOS_EN_CACHE = 256
+EXTENSIONES_NOTAS = (".csv", ".parquet")
+
+COLUMNA_CLAVE = "Estudiante"
+COLUMNA_TAREA = "Tarea"
+COLUMNAS_IGNORADAS = {"Fecha"}
+COLUMNAS_NOTA = ("Calificacion Final", "Calificacion Calculada")
+PREFIJOS_ARCHIVO = ("calificaciones_finales", "calificaciones", "calificacion")
+
+
+def normalizar_nombre(nombre):
+    """Clave de un estudiante sin tildes, mayúsculas ni espacios repetidos."""
+    sin_tildes = unicodedata.normalize("NFKD", str(nombre)).encode("ascii", "ignore").decode("ascii")
+    return " ".join(sin_tildes.casefold().split())
+
+
+def nombre_columna(nombre_archivo):
+    """'calificaciones_finales_tarea_1.csv' -> 'Nota Tarea 1'; 'calificaciones_finales.csv' -> 'Nota Final'."""
+    base = os.path.splitext(os.path.basename(nombre_archivo))[0].lower()
+    for prefijo in PREFIJOS_ARCHIVO:
+        if base.startswith(prefijo):
+            base = base[len(prefijo):]
+            break
+    base = re.sub(r"[_\-\s]+", " ", base).strip()
+    return f"Nota {base.title()}" if base else "Nota Final"
+
+
+def _contenido(archivo):
+    if hasattr(archivo, "getvalue"):
+        return archivo.getvalue()
+    with open(archivo, "rb") as f:
+        return f.read()
+
+
+def _texto(contenido):
+    try:
+        return contenido.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        return contenido.decode("latin1")
+
+
+def _columnas_y_filas(contenido):
+    """(columnas, iterador de filas) de un CSV o, si empieza por la firma "PAR1", de un Parquet.
+
+    Las filas son secuencias en el orden de las columnas; una fila de CSV más
+    corta que el encabezado se completa con None.
+    """
+    if not contenido.startswith(b"PAR1"):
+        lector = csv.reader(io.StringIO(_texto(contenido)))
+        columnas = next(lector, None)
+        if not columnas:
+            return columnas, iter(())
+        return columnas, (fila if len(fila) >= len(columnas) else fila + [None] * (len(columnas) - len(fila))
+                          for fila in lector if fila)
+    import pyarrow.parquet as pq
+    archivo = pq.ParquetFile(io.BytesIO(contenido))
+    columnas = [c for c in archivo.schema_arrow.names if c not in COLUMNAS_IGNORADAS]
+    tabla = archivo.read(columns=columnas)
+    return columnas, zip(*(tabla.column(c).to_pylist() for c in columnas))
+
+
+def _numero(valor):
+    try:
+        return float(valor.replace(",", "."))
+    except (AttributeError, ValueError):
+        return valor if valor != "" else None
+
+
+def leer_notas(contenido):
+    """Lee un archivo de notas (bytes de un CSV o un Parquet).
+
+    Devuelve (columna de nota o None, nombres, valores): `nombres` es la Serie
+    de nombres tal como aparecen y `valores` el DataFrame de las demás
+    columnas, ambos indexados por la clave normalizada del estudiante. Las
+    columnas de `valores` son pares (columna, tarea): primero las filas sin
+    tarea (o todas, si no hay columna "Tarea") y luego una tanda por tarea, en
+    el orden en que aparecen. Si un
+    estudiante aparece varias veces en la misma tarea, gana la última fila.
+    """
+    import pandas as pd
+    campos, filas = _columnas_y_filas(contenido)
+    if not campos or COLUMNA_CLAVE not in campos:
+        raise KeyError(COLUMNA_CLAVE)
+    # Como en csv.DictReader, si un encabezado se repite vale su última columna.
+    posicion = {c: i for i, c in enumerate(campos)}
+    columnas = [c for c in posicion if c not in (COLUMNA_CLAVE, COLUMNA_TAREA) and c not in COLUMNAS_IGNORADAS]
+    i_clave, posiciones = posicion[COLUMNA_CLAVE], [posicion[c] for c in columnas]
+    i_tarea = posicion.get(COLUMNA_TAREA)
+    nombres, registros = {}, {"": {}}
+    for fila in filas:
+        estudiante = str(fila[i_clave] or "").strip()
+        if not estudiante:
+            continue
+        clave = normalizar_nombre(estudiante)
+        nombres.setdefault(clave, estudiante)
+        tarea = str(fila[i_tarea] or "").strip() if i_tarea is not None else ""
+        registros.setdefault(tarea, {})[clave] = [_numero(fila[i]) for i in posiciones]
+    if not registros[""] and len(registros) > 1:
+        del registros[""]
+    vacio = [None] * len(columnas)
+    etiquetas, por_columna = [], []
+    for tarea, por_clave in registros.items():
+        etiquetas += [(c, tarea) for c in columnas]
+        filas_tarea = [por_clave.get(clave, vacio) for clave in nombres]
+        por_columna += zip(*filas_tarea) if filas_tarea else [[] for _ in columnas]
+    claves = pd.Index(list(nombres), dtype=object)
+    valores = pd.DataFrame(dict(enumerate(por_columna)), index=claves)
+    valores.columns = pd.Index(etiquetas, dtype=object, tupleize_cols=False)
+    return (next((c for c in COLUMNAS_NOTA if c in campos), None),
+            pd.Series(list(nombres.values()), index=claves, dtype=object), valores)
+
+
+def unir_archivos(fuentes, cache=None):
+    """Une cualquier número de archivos de notas por estudiante.
+
+    `fuentes` es una lista de (nombre_columna, archivo); `archivo` es una ruta o
+    un objeto con getvalue() (como los de st.file_uploader), de un CSV o un
+    Parquet. La columna de nota de cada archivo toma el nombre dado; sus otras
+    columnas, '<nombre> - <columna>'. Si el archivo trae varias tareas, cada
+    una agrega ' · <tarea>' a sus columnas. Con `cache` (una CacheFusion) solo se
+    leen los archivos que no se habían leído antes.
+    """
+    import pandas as pd
+    columnas, nombres, tablas = [COLUMNA_CLAVE], [], []
+    for nombre, archivo in fuentes:
+        try:
+            nota, nombres_archivo, valores = cache.leer(archivo) if cache is not None else leer_notas(_contenido(archivo))
+        except KeyError:
+            raise KeyError(f"El archivo '{nombre}' no tiene una columna '{COLUMNA_CLAVE}'.") from None
+        destino = [(nombre if c == nota else f"{nombre} - {c}") + (f" · {tarea}" if tarea else "")
+                   for c, tarea in valores.columns]
+        for c in destino:
+            if c in columnas:
+                raise ValueError(f"La columna '{c}' se repite; use nombres distintos para cada archivo.")
+            columnas.append(c)
+        nombres.append(nombres_archivo)
+        # set_axis no copia los datos: la tabla en caché no se modifica.
+        tablas.append(valores.set_axis(destino, axis=1))
+    if not tablas:
+        return pd.DataFrame(columns=columnas)
+    # El nombre que se muestra es el del primer archivo en que aparece el
+    # estudiante; cada archivo solo aporta las claves que aún no estaban.
+    todos = nombres[0]
+    for nombres_archivo in nombres[1:]:
+        nuevos = ~nombres_archivo.index.isin(todos.index)
+        if nuevos.any():
+            todos = pd.concat([todos, nombres_archivo[nuevos]])
+    todos = todos.sort_index()
+    unido = pd.concat([todos.rename(COLUMNA_CLAVE)] + [tabla.reindex(todos.index) for tabla in tablas], axis=1)
+    return unido.reset_index(drop=True)
+
+
+# --- Caché de archivos leídos ---
+
+def huella_contenido(contenido):
+    return hashlib.sha1(contenido).hexdigest()
+
+
+class CacheFusion:
+    """Archivos de notas ya leídos, por el SHA-1 de su contenido (LRU).
+
+    Para una ruta, si su tamaño y fecha de modificación no cambiaron desde la
+    última vez ni siquiera se vuelve a abrir el archivo.
+    """
+
+    def __init__(self, maximo=MAXIMO_ARCHIVOS_EN_CACHE):
+        self.maximo = maximo
+        self._leidos = collections.OrderedDict()
+        self._firmas = {}
+        self._bloqueo = threading.Lock()
+        self.aciertos = self.fallos = 0
+
+    def _huella(self, archivo):
+        if hasattr(archivo, "getvalue"):
+            contenido = archivo.getvalue()
+            return huella_contenido(contenido), contenido
+        estado = os.stat(archivo)
+        firma = (estado.st_mtime_ns, estado.st_size)
+        with self._bloqueo:
+            guardada = self._firmas.get(os.path.abspath(archivo))
+        if guardada and guardada[0] == firma:
+            return guardada[1], None
+        contenido = _contenido(archivo)
+        huella = huella_contenido(contenido)
+        with self._bloqueo:
+            self._firmas[os.path.abspath(archivo)] = (firma, huella)
+        return huella, contenido
+
+    def leer(self, archivo):
+        """(columna de nota, nombres, valores) de `archivo`, como `leer_notas`."""
+        huella, contenido = self._huella(archivo)
+        with self._bloqueo:
+            if huella in self._leidos:
+                self._leidos.move_to_end(huella)
+                self.aciertos += 1
+                return self._leidos[huella]
+            self.fallos += 1
+        leido = leer_notas(contenido if contenido is not None else _contenido(archivo))
+        with self._bloqueo:
+            self._leidos[huella] = leido
+            while len(self._leidos) > self.maximo:
+                self._leidos.popitem(last=False)
+        return leido
+
+
+_cache = None
+_cache_bloqueo = threading.Lock()
+
+
+def cache_fusion():
+    """La caché de archivos leídos de este proceso (compartida por todas las sesiones)."""
+    global _cache
+    with _cache_bloqueo:
+        if _cache is None:
+            _cache = CacheFusion()
+        return _cache
+
+
+# --- Modo carpeta ---
+
+def archivos_de_carpetas(carpetas):
+    """(nombre_columna, ruta) de los CSV y Parquet de notas de cada carpeta, en orden.
+
+    Si dos archivos darían la misma columna (p. ej. 'calificaciones_finales.csv'
+    en dos cortes), se distinguen con el nombre de su carpeta.
+    """
+    rutas = []
+    for carpeta in carpetas:
+        rutas += sorted(os.path.join(carpeta, nombre) for nombre in os.listdir(carpeta)
+                        if nombre.lower().endswith(EXTENSIONES_NOTAS) and not nombre.startswith("."))
+    conteo = collections.Counter(nombre_columna(ruta) for ruta in rutas)
+    return [(nombre_columna(ruta) if conteo[nombre_columna(ruta)] == 1
+             else f"{nombre_columna(ruta)} ({os.path.basename(os.path.dirname(os.path.abspath(ruta)))})", ruta)
+            for ruta in rutas]
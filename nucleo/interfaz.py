@@ -0,0 +1,255 @@
+import streamlit as st
+
+from nucleo.cache_reportes import cache_reportes
+from nucleo.columnar import hay_pyarrow
+from nucleo.lista_curso import ALIAS_NOMBRE, huella_subida, leer_indice
+from nucleo.reportes import generar_lote_zip, nombre_archivo_reporte
+from nucleo.rubricas import Rubrica, leer_rubrica
+
+# --- Piezas de Streamlit compartidas por las aplicaciones ---
+
+
+# La lista (y su índice de búsqueda) se construye una vez por contenido y se
+# comparte entre reruns y sesiones.
+@st.cache_resource(max_entries=8, show_spinner=False)
+def _lista_en_cache(huella_lista, _archivo):
+    # Se lee por bloques desde el archivo subido, sin copiar su contenido.
+    return leer_indice(_archivo)
+
+
+def cargar_lista_curso(archivo):
+    """IndiceLista de la lista subida; si no se puede leer, muestra el error y detiene la app."""
+    try:
+        return _lista_en_cache(huella_subida(archivo, st.session_state), archivo)
+    except KeyError:
+        st.error(f"Error: No se encontró la columna de nombres en el archivo CSV (se acepta '{ALIAS_NOMBRE[0]}', "
+                 f"'{ALIAS_NOMBRE[1]}' o 'NOMBRES' con 'APELLIDOS', entre otras).")
+    except Exception as e:
+        st.error(f"Ocurrió un error al leer el archivo CSV: {e}")
+    st.stop()
+
+
+# Igual que la lista: cada rúbrica subida se compila una vez por contenido.
+@st.cache_resource(max_entries=16, show_spinner=False)
+def _rubrica_en_cache(huella_rubrica, _archivo):
+    return leer_rubrica(_archivo.getvalue())
+
+
+def cargar_rubrica(archivo):
+    """Rúbrica compilada del CSV subido; los errores de formato se propagan."""
+    return _rubrica_en_cache(huella_subida(archivo, st.session_state, clave="_huella_rubrica"), archivo)
+
+
+def elegir_estudiantes(indice, etiqueta="Elige un estudiante para agregar:"):
+    """Buscador sobre el índice de la lista y alta en bloque.
+
+    Devuelve los nombres que se pidió agregar al grupo en esta ejecución.
+    """
+    consulta = st.text_input("Buscar (nombre, apellido o código; sin importar tildes):", key="buscar_estudiante")
+    opciones = indice.buscar(consulta) if consulta.strip() else indice.nombres
+    if consulta.strip() and not opciones:
+        st.caption("Sin coincidencias.")
+    seleccionado = st.selectbox(etiqueta, opciones)
+    nuevos = []
+    if st.button("➕ Agregar Estudiante") and seleccionado:
+        nuevos.append(seleccionado)
+    with st.expander("📋 Agregar varios a la vez"):
+        texto = st.text_area("Pega nombres o códigos (uno por línea, o separados por ';' o ','):", key="alta_en_bloque")
+        if st.button("Agregar todos"):
+            encontrados, sin_resolver = indice.resolver(texto)
+            nuevos += encontrados
+            if sin_resolver:
+                st.warning("Sin coincidencia única: " + "; ".join(sin_resolver))
+    return nuevos
+
+
+def acciones_libro(libro, ruta, ancho_completo=False):
+    """Botones para consolidar el diario y exportar el libro a CSV (y a Parquet, si hay pyarrow)."""
+    pendientes = libro.pendientes()
+    if pendientes:
+        st.caption(f"{pendientes} nota(s) en el diario, pendientes de consolidar en '{ruta}'.")
+        if st.button("🗜️ Consolidar libro de notas", use_container_width=ancho_completo):
+            integradas = libro.compactar()
+            st.success(f"Se integraron {integradas} nota(s) en '{ruta}'.")
+    if st.button("📤 Exportar libro a CSV", use_container_width=ancho_completo):
+        st.download_button(
+            label="📥 Descargar calificaciones_finales.csv",
+            data=libro.exportar_csv(),
+            file_name="calificaciones_finales.csv",
+            mime="text/csv",
+            use_container_width=ancho_completo
+        )
+    if hay_pyarrow() and st.button("📤 Exportar libro a Parquet", use_container_width=ancho_completo):
+        st.download_button(
+            label="📥 Descargar calificaciones_finales.parquet",
+            data=libro.exportar_parquet(),
+            file_name="calificaciones_finales.parquet",
+            mime="application/vnd.apache.parquet",
+            use_container_width=ancho_completo
+        )
+
+
+def reportes_en_lote(libro):
+    """Expander para generar en un ZIP los reportes guardados en el libro."""
+    with st.expander("📦 Reportes en lote"):
+        # El cuerpo del expander se ejecuta aunque esté cerrado: los reportes
+        # guardados se leen solo cuando se piden.
+        if not st.toggle("Cargar reportes guardados", key="cargar_reportes_lote"):
+            return
+        guardados = libro.reportes()
+        etiquetas = [f"{r['grupo']} ({r['tarea']})" if r['tarea'] else r['grupo'] for r in guardados]
+        elegidos = st.multiselect("Grupos (vacío = todos):", etiquetas)
+        if st.button("Generar ZIP de reportes", disabled=not guardados, use_container_width=True):
+            trabajos = [(nombre_archivo_reporte(r['grupo'], r['tarea']), r['tipo'], r['datos'])
+                        for r, etiqueta in zip(guardados, etiquetas) if not elegidos or etiqueta in elegidos]
+            barra = st.progress(0.0, text="Generando reportes...")
+            zip_data, resumen = generar_lote_zip(
+                trabajos, progreso=lambda hechos, total, vel: barra.progress(hechos / total, text=f"{hechos}/{total} reportes · {vel:.1f} reportes/s"))
+            st.success(f"{resumen['reportes']} reportes en {resumen['segundos']:.1f} s ({resumen['reportes_por_segundo']:.1f} reportes/s).")
+            st.download_button("📥 Descargar ZIP", data=zip_data, file_name="reportes.zip", mime="application/zip", use_container_width=True)
+
+
+def panel_reponderar(escritor, rubrica):
+    """Expander para corregir pesos de la rúbrica y recalcular las notas ya guardadas.
+
+    Devuelve la rúbrica corregida si se aplicó en esta ejecución, o None.
+    """
+    with st.expander("⚖️ Corregir pesos y recalcular notas"):
+        st.caption("Las notas guardadas con esta rúbrica se recalculan con sus puntajes por sub-item. "
+                   "El puntaje 'sobre' es informativo y no entra en la nota, así que solo se corrigen los pesos.")
+        pesos = [st.number_input(f"Peso: {pregunta}", min_value=0.0, value=float(peso), key=f"repeso_{i}")
+                 for i, (pregunta, peso) in enumerate(zip(rubrica.preguntas, rubrica.pesos))]
+        tarea = st.text_input("Actividad:", key="tarea_reponderar", placeholder="Vacío = sin actividad")
+        if not st.button("Recalcular notas guardadas", use_container_width=True):
+            return None
+        try:
+            nueva = Rubrica(rubrica.preguntas, rubrica.sub_items, rubrica.mascara, rubrica.sobre, pesos)
+            with st.spinner("Recalculando notas..."):
+                resultado = escritor.ejecutar("reponderar", nueva, tarea=tarea.strip()).result()
+        except Exception as e:
+            st.error(f"No se pudieron recalcular las notas: {e}")
+            return None
+        st.success(f"Notas de {resultado.recalculadas} estudiante(s) recalculadas; {len(resultado.cambios)} cambiaron "
+                   f"(rúbrica {resultado.version}).")
+        if resultado.omitidas:
+            st.caption(f"{resultado.omitidas} estudiante(s) calificados con otra rúbrica no se tocaron.")
+        if len(resultado.cambios):
+            st.dataframe(resultado.cambios, hide_index=True)
+        st.download_button("📥 Descargar rúbrica corregida", data=nueva.a_csv(), file_name="rubrica_corregida.csv",
+                           mime="text/csv", on_click="ignore", use_container_width=True)
+        return nueva
+
+
+def panel_perfil(perfil):
+    """Tiempos de esta ejecución en la barra lateral (solo con el perfilado activo)."""
+    if not perfil.activo:
+        return
+    perfil.exportar()
+    with st.sidebar.expander("⏱️ Perfil de esta ejecución"):
+        st.caption(f"Total: {perfil.total_ms():.1f} ms")
+        st.text("\n".join(f"{nombre:<14}{ms:>9.1f} ms" for nombre, ms in perfil.fases.items()) or "Sin fases medidas.")
+        if perfil.archivo:
+            st.caption(f"Registrado en '{perfil.archivo}'.")
+
+
+def vista_estadisticas(libro, motor):
+    """Estadísticas acumuladas del curso (sin recorrer el libro) para los puntajes de `motor`."""
+    import numpy as np
+    import pandas as pd
+    estadisticas = libro.estadisticas()
+    if not estadisticas:
+        st.info("Aún no hay puntajes guardados.")
+        return
+    tareas = sorted(estadisticas)
+    tarea = st.selectbox("Actividad:", tareas, format_func=lambda t: t or "(sin actividad)") if len(tareas) > 1 else tareas[0]
+    e = estadisticas[tarea]
+    col_n, col_media, col_desv = st.columns(3)
+    col_n.metric("Entregas", e.nota.n)
+    col_media.metric("Nota promedio", f"{float(e.nota.media):.2f}")
+    col_desv.metric("Desviación", f"{float(np.sqrt(e.nota.varianza)):.2f}")
+    bordes = e.nota.bordes
+    st.bar_chart(pd.DataFrame({"Estudiantes": e.nota.histograma},
+                              index=[f"{a:.1f}–{b:.1f}" for a, b in zip(bordes[:-1], bordes[1:])]))
+    if e.puntajes.media.shape != motor.forma:
+        return
+    tab_media, tab_desv, tab_hist = st.tabs(["Media por componente", "Desviación", "Histograma"])
+    celdas = lambda valores: pd.DataFrame(np.where(motor.mascara, valores, np.nan),
+                                          index=list(motor.preguntas), columns=list(motor.sub_items))
+    tab_media.dataframe(celdas(e.puntajes.media).style.format("{:.2f}", na_rep=""))
+    tab_desv.dataframe(celdas(np.sqrt(e.puntajes.varianza)).style.format("{:.2f}", na_rep=""))
+    with tab_hist:
+        fila = st.selectbox("Problema:", motor.preguntas)
+        i = motor.fila[fila]
+        columna = st.selectbox("Componente:", [s for j, s in enumerate(motor.sub_items) if motor.mascara[i, j]])
+        bordes = e.puntajes.bordes
+        st.bar_chart(pd.DataFrame({"Estudiantes": e.puntajes.histograma[i, motor.columna[columna]]},
+                                  index=[f"{a:.0f}" for a in bordes[:-1]]))
+
+
+# --- Guardados en segundo plano ---
+
+def seguir_guardado(descripcion, futuros):
+    """Registra escrituras encoladas en el escritor del libro para mostrar cuándo quedan en disco."""
+    st.session_state.setdefault("guardados_en_curso", []).append({"descripcion": descripcion, "futuros": futuros})
+
+
+@st.fragment(run_every=0.5)
+def _estado_guardados(ruta):
+    for guardado in st.session_state.guardados_en_curso:
+        futuros = guardado["futuros"]
+        if not all(f.done() for f in futuros):
+            st.caption(f"⏳ Guardando la calificación de {guardado['descripcion']}...")
+            continue
+        errores = [f.exception() for f in futuros if f.exception() is not None]
+        if errores:
+            st.error(f"No se pudo guardar la calificación de {guardado['descripcion']}: {errores[0]}")
+        else:
+            st.success(f"✅ Calificación de {guardado['descripcion']} guardada en '{ruta}'.")
+        guardado["mostrado"] = True
+
+
+def estado_guardados(ruta):
+    """Estado de los guardados de la sesión; se actualiza solo mientras hay alguno en curso."""
+    en_curso = [g for g in st.session_state.get("guardados_en_curso", []) if not g.get("mostrado")]
+    st.session_state.guardados_en_curso = en_curso
+    if en_curso:
+        _estado_guardados(ruta)
+
+
+# --- Reporte individual en segundo plano ---
+
+def pedir_reporte(tipo, datos, nombre_archivo, clave="reporte_individual"):
+    """Encola el PDF del grupo (o lo toma de la caché) para `descarga_reporte`."""
+    st.session_state[clave] = {"futuro": cache_reportes().pedir(tipo, datos), "nombre": nombre_archivo}
+
+
+def _boton_descarga(reporte, etiqueta, ancho_completo):
+    futuro = reporte["futuro"]
+    if futuro.exception() is not None:
+        st.error(f"No se pudo generar el reporte: {futuro.exception()}")
+        return
+    # on_click="ignore": descargar no vuelve a ejecutar la app.
+    st.download_button(label=etiqueta, data=futuro.result(), file_name=reporte["nombre"], mime="application/pdf",
+                       on_click="ignore", use_container_width=ancho_completo)
+
+
+@st.fragment(run_every=0.5)
+def _reporte_en_curso(clave, etiqueta, ancho_completo):
+    reporte = st.session_state.get(clave)
+    if reporte is None:
+        return
+    if reporte["futuro"].done():
+        _boton_descarga(reporte, etiqueta, ancho_completo)
+    else:
+        st.caption("⏳ Generando el reporte PDF...")
+
+
+def descarga_reporte(etiqueta, clave="reporte_individual", ancho_completo=False):
+    """Botón de descarga del último reporte pedido; mientras se genera, un aviso que se actualiza solo."""
+    reporte = st.session_state.get(clave)
+    if reporte is None:
+        return
+    if reporte["futuro"].done():
+        _boton_descarga(reporte, etiqueta, ancho_completo)
+    else:
+        _reporte_en_curso(clave, etiqueta, ancho_completo)
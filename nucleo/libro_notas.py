@@ -0,0 +1,525 @@
+import contextlib
+import csv
+import datetime
+import json
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from nucleo.columnar import (escribir_instantanea, filtrar_df, hay_pyarrow, instantanea_al_dia, leer_parquet,
+                             parquet_desde_df, ruta_columnar, tipar_df)
+from nucleo.estadisticas import actualizar_estadisticas, estadisticas_desde_dict
+from nucleo.libro_sqlite import LibroSQLite
+from nucleo.reponderacion import Reponderacion, recalcular, reponderar_reporte, tabla_cambios
+
+# --- Libro de notas con diario de solo-anexado ---
+#
+# El libro se guarda en dos partes:
+#   * la instantánea, el CSV de siempre (p. ej. "calificaciones_finales.csv"),
+#   * el diario, un archivo JSON Lines al lado ("calificaciones_finales.diario.jsonl")
+#     al que cada guardado solo le anexa las filas nuevas.
+# `compactar_libro` integra el diario en la instantánea. Un CSV antiguo sin
+# diario se sigue leyendo tal cual. Con pyarrow instalado, cada compactación
+# deja además la instantánea en Parquet ("calificaciones_finales.parquet", ver
+# nucleo/columnar.py) para las consultas de `LibroCSV.consultar`.
+
+SUFIJO_DIARIO = ".diario.jsonl"
+SUFIJO_REPORTES = ".reportes.jsonl"
+SUFIJO_PUNTAJES = ".puntajes.jsonl"
+SUFIJO_ESTADISTICAS = ".estadisticas.json"
+SUFIJO_PUNTAJES_RUBRICA = ".puntajes_rubrica.jsonl"
+SUFIJO_RUBRICAS = ".rubricas.jsonl"
+SUFIJO_COMPACTANDO = ".compactando"
+SUFIJO_BLOQUEO = ".lock"
+
+
+# --- Bloqueo entre procesos ---
+#
+# Todas las escrituras del libro CSV (diario, compactación, reportes, puntajes y
+# estadísticas) toman un bloqueo exclusivo sobre "<libro>.lock", así varias
+# sesiones, procesos o la CLI pueden escribir en el mismo libro sin perder
+# filas. Es reentrante dentro de un mismo hilo.
+
+_bloqueos = threading.local()
+
+
+def _bloquear(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        return
+    while True:
+        try:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            continue  # LK_LOCK se rinde tras unos segundos; se vuelve a intentar.
+
+
+def _desbloquear(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextlib.contextmanager
+def bloqueo_libro(ruta_libro):
+    ruta = os.path.splitext(ruta_libro)[0] + SUFIJO_BLOQUEO
+    tenidos = _bloqueos.__dict__.setdefault("tenidos", {})
+    if tenidos.get(ruta):
+        tenidos[ruta] += 1
+        try:
+            yield
+        finally:
+            tenidos[ruta] -= 1
+        return
+    with open(ruta, "a+b") as f:
+        _bloquear(f)
+        tenidos[ruta] = 1
+        try:
+            yield
+        finally:
+            tenidos[ruta] = 0
+            _desbloquear(f)
+
+
+def ruta_diario(ruta_libro):
+    return os.path.splitext(ruta_libro)[0] + SUFIJO_DIARIO
+
+
+def agregar_notas(ruta_libro, filas):
+    """Anexa `filas` (lista de dicts) al diario del libro sin reescribir nada."""
+    if not filas:
+        return
+    lineas = "".join(json.dumps(fila, ensure_ascii=False) + "\n" for fila in filas)
+    with bloqueo_libro(ruta_libro), open(ruta_diario(ruta_libro), "a", encoding="utf-8") as f:
+        f.write(lineas)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _leer_diario(ruta):
+    if not os.path.exists(ruta):
+        return
+    with open(ruta, encoding="utf-8") as f:
+        for linea in f:
+            linea = linea.strip()
+            if not linea:
+                continue
+            try:
+                yield json.loads(linea)
+            except json.JSONDecodeError:
+                # Una línea cortada por un cierre abrupto no invalida el resto.
+                continue
+
+
+def _filas_pendientes(ruta_libro):
+    diario = ruta_diario(ruta_libro)
+    # Si una compactación anterior se interrumpió, sus filas siguen pendientes.
+    yield from _leer_diario(diario + SUFIJO_COMPACTANDO)
+    yield from _leer_diario(diario)
+
+
+def _reescribir_jsonl(ruta, registros):
+    temporal = ruta + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        f.writelines(json.dumps(registro, ensure_ascii=False) + "\n" for registro in registros)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporal, ruta)
+
+
+def _ultimos_reportes(registros):
+    ultimos = {}
+    for registro in registros:
+        ultimos[(registro["grupo"], registro.get("tarea", ""))] = registro
+    return list(ultimos.values())
+
+
+def _ultimos_puntajes(registros):
+    ultimos = {}
+    for registro in registros:
+        ultimos[(registro["Estudiante"], registro["Tarea"])] = registro
+    return list(ultimos.values())
+
+
+def _compactar_jsonl(ruta, ultimos):
+    registros = list(_leer_diario(ruta))
+    vigentes = ultimos(registros)
+    if len(vigentes) < len(registros):
+        _reescribir_jsonl(ruta, vigentes)
+    return vigentes
+
+
+def _escribir_estadisticas(ruta, estadisticas):
+    temporal = ruta + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump({t: e.a_dict() for t, e in estadisticas.items()}, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporal, ruta)
+
+
+def _puntajes_anteriores(ruta, estudiantes, tarea):
+    """(puntajes, calificacion) del último guardado de cada estudiante en `tarea`."""
+    if not estudiantes or not os.path.exists(ruta):
+        return []
+    # Cada línea empieza por su estudiante: solo se decodifican las de `estudiantes`.
+    prefijos = tuple('{"Estudiante": ' + json.dumps(est, ensure_ascii=False) + "," for est in estudiantes)
+    ultimos = {}
+    with open(ruta, encoding="utf-8") as f:
+        for linea in f:
+            if not linea.startswith(prefijos):
+                continue
+            try:
+                registro = json.loads(linea)
+            except json.JSONDecodeError:
+                continue
+            if registro["Tarea"] == tarea:
+                ultimos[registro["Estudiante"]] = (registro["puntajes"], registro["Calificacion"])
+    return list(ultimos.values())
+
+
+def _contar_lineas(ruta):
+    if not os.path.exists(ruta):
+        return 0
+    lineas = 0
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(1 << 20), b""):
+            lineas += bloque.count(b"\n")
+    return lineas
+
+
+def contar_pendientes(ruta_libro):
+    # Cada fila del diario se escribe completa y terminada en salto de línea:
+    # basta contar saltos, sin decodificar JSON. Una última línea cortada por
+    # un cierre abrupto no lleva salto y no se cuenta.
+    diario = ruta_diario(ruta_libro)
+    return _contar_lineas(diario + SUFIJO_COMPACTANDO) + _contar_lineas(diario)
+
+
+def leer_libro(ruta_libro, columnas=None, renombrar=None):
+    """Devuelve instantánea + diario como un único DataFrame."""
+    import pandas as pd
+    renombrar = renombrar or {}
+    if os.path.exists(ruta_libro):
+        df = pd.read_csv(ruta_libro).rename(columns=renombrar)
+    else:
+        df = pd.DataFrame(columns=columnas or [])
+    pendientes = list(_filas_pendientes(ruta_libro))
+    if pendientes:
+        df = pd.concat([df, pd.DataFrame(pendientes).rename(columns=renombrar)], ignore_index=True)
+    return df
+
+
+def compactar_libro(ruta_libro, renombrar=None):
+    """Integra el diario en la instantánea CSV y lo vacía.
+
+    Recorre ambos archivos fila por fila, escribe la instantánea nueva en un
+    temporal y la sustituye de forma atómica; luego rehace la instantánea
+    Parquet, si hay pyarrow. Devuelve el número de filas integradas.
+    """
+    with bloqueo_libro(ruta_libro):
+        renombrar = renombrar or {}
+        diario = ruta_diario(ruta_libro)
+        compactando = diario + SUFIJO_COMPACTANDO
+        if os.path.exists(diario) and not os.path.exists(compactando):
+            # El diario se aparta: si la compactación se interrumpe, sus filas siguen pendientes.
+            os.replace(diario, compactando)
+        filas_nuevas = [{renombrar.get(k, k): v for k, v in fila.items()} for fila in _leer_diario(compactando)]
+        if not filas_nuevas:
+            if os.path.exists(compactando):
+                os.remove(compactando)
+            return 0
+
+        encabezado = []
+        if os.path.exists(ruta_libro):
+            with open(ruta_libro, newline="", encoding="utf-8") as f:
+                encabezado = [renombrar.get(c, c) for c in next(csv.reader(f), [])]
+        for fila in filas_nuevas:
+            for columna in fila:
+                if columna not in encabezado:
+                    encabezado.append(columna)
+
+        temporal = ruta_libro + ".tmp"
+        with open(temporal, "w", newline="", encoding="utf-8") as salida:
+            escritor = csv.DictWriter(salida, fieldnames=encabezado)
+            escritor.writeheader()
+            if os.path.exists(ruta_libro):
+                with open(ruta_libro, newline="", encoding="utf-8") as f:
+                    for fila in csv.DictReader(f):
+                        escritor.writerow({renombrar.get(k, k): v for k, v in fila.items()})
+            escritor.writerows(filas_nuevas)
+            salida.flush()
+            os.fsync(salida.fileno())
+        os.replace(temporal, ruta_libro)
+        os.remove(compactando)
+        escribir_instantanea(ruta_libro, renombrar)
+        return len(filas_nuevas)
+
+
+# --- Interfaz común de los libros de notas ---
+
+class LibroCSV:
+    """Libro CSV con diario (el formato de siempre)."""
+
+    def __init__(self, ruta, columna_nota="Calificacion Final", renombrar=None):
+        self.ruta = ruta
+        self.columna_nota = columna_nota
+        self.renombrar = renombrar or {}
+
+    def guardar(self, estudiantes, calificacion, calificacion_subjetiva=None, tarea="", fecha=None):
+        self.guardar_lote([(estudiantes, calificacion, calificacion_subjetiva)], tarea=tarea, fecha=fecha)
+
+    def guardar_lote(self, grupos, tarea="", fecha=None):
+        """Guarda varios grupos (estudiantes, calificacion, calificacion_subjetiva) en un solo anexo."""
+        fecha = fecha or datetime.date.today().strftime('%Y-%m-%d')
+        filas = []
+        for estudiantes, calificacion, calificacion_subjetiva in grupos:
+            for estudiante in estudiantes:
+                fila = {"Estudiante": estudiante, self.columna_nota: f"{calificacion:.2f}"}
+                if calificacion_subjetiva is not None:
+                    fila["Calificacion Subjetiva"] = f"{calificacion_subjetiva:.2f}"
+                if tarea:
+                    fila["Tarea"] = tarea
+                fila["Fecha"] = fecha
+                filas.append(fila)
+        agregar_notas(self.ruta, filas)
+
+    def leer(self, tarea=None):
+        df = leer_libro(self.ruta, renombrar=self.renombrar)
+        if tarea is not None and "Tarea" in df.columns:
+            df = df[df["Tarea"].fillna("") == tarea]
+        return df
+
+    def notas_estudiante(self, estudiante):
+        df = self.leer()
+        return df[df["Estudiante"] == estudiante]
+
+    def ultimas_notas(self):
+        df = self.leer()
+        return df.groupby("Estudiante", sort=True).tail(1) if not df.empty else df
+
+    def consultar(self, columnas=None, estudiante=None, tarea=None, desde=None, hasta=None):
+        """Notas tipadas (float64 y fechas) filtradas por estudiante(s), actividad y rango de fechas.
+
+        Con pyarrow, la instantánea se lee del Parquet solo en las `columnas`
+        pedidas (rehaciéndolo si el CSV es más reciente) y el diario se filtra
+        aparte. Sin pyarrow se filtra el libro completo en pandas.
+        """
+        import pandas as pd
+        filtros = {"estudiante": estudiante, "tarea": tarea, "desde": desde, "hasta": hasta}
+        notas = (self.columna_nota, "Calificacion Subjetiva")
+        if not (hay_pyarrow() and os.path.exists(self.ruta)):
+            df = filtrar_df(tipar_df(self.leer(), notas), **filtros)
+            return df[[c for c in columnas if c in df.columns]] if columnas else df
+        if not instantanea_al_dia(self.ruta):
+            with bloqueo_libro(self.ruta):
+                if not instantanea_al_dia(self.ruta):
+                    escribir_instantanea(self.ruta, self.renombrar)
+        partes = [leer_parquet(ruta_columnar(self.ruta), columnas, **filtros)]
+        pendientes = list(_filas_pendientes(self.ruta))
+        if pendientes:
+            diario = filtrar_df(tipar_df(pd.DataFrame(pendientes).rename(columns=self.renombrar), notas), **filtros)
+            partes.append(diario[[c for c in columnas if c in diario.columns]] if columnas else diario)
+        df = pd.concat(partes, ignore_index=True) if len(partes) > 1 else partes[0]
+        for c in ("Estudiante", "Tarea"):
+            if c in df.columns:
+                df[c] = df[c].fillna("")
+        return df
+
+    def exportar_parquet(self, destino=None, tarea=None):
+        """Exporta el libro (o una actividad) en Parquet con columnas tipadas; sin `destino`, devuelve los bytes."""
+        df = self.consultar(tarea=tarea)
+        if tarea is not None:
+            df = df.drop(columns=["Tarea"], errors="ignore")
+        return parquet_desde_df(df, destino)
+
+    def exportar_csv(self, destino=None, tarea=None):
+        df = self.leer(tarea)
+        if tarea is not None:
+            df = df.drop(columns=["Tarea"], errors="ignore")
+        return df.to_csv(destino, index=False)
+
+    def guardar_reporte(self, grupo, tipo, datos, tarea=""):
+        """Anexa los datos del reporte PDF del grupo para poder regenerarlo en lote."""
+        registro = {"grupo": grupo, "tarea": tarea, "tipo": tipo, "datos": datos}
+        with bloqueo_libro(self.ruta), open(os.path.splitext(self.ruta)[0] + SUFIJO_REPORTES, "a", encoding="utf-8") as f:
+            f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def reportes(self):
+        """Último reporte guardado de cada (grupo, tarea)."""
+        return _ultimos_reportes(_leer_diario(os.path.splitext(self.ruta)[0] + SUFIJO_REPORTES))
+
+    def guardar_puntajes(self, estudiantes, puntajes, calificacion, tarea="", fecha=None):
+        """Anexa los puntajes por componente de cada estudiante y actualiza las
+        estadísticas del curso; al recalificar se restan los puntajes del
+        guardado anterior, como en SQLite."""
+        fecha = fecha or datetime.date.today().strftime('%Y-%m-%d')
+        base = os.path.splitext(self.ruta)[0]
+        lista = puntajes.tolist() if hasattr(puntajes, "tolist") else puntajes
+        lineas = "".join(json.dumps({"Estudiante": est, "Tarea": tarea, "Fecha": fecha,
+                                     "Calificacion": round(float(calificacion), 2), "puntajes": lista},
+                                    ensure_ascii=False) + "\n" for est in estudiantes)
+        # Las estadísticas se leen, actualizan y reescriben bajo el mismo bloqueo.
+        with bloqueo_libro(self.ruta):
+            anteriores = _puntajes_anteriores(base + SUFIJO_PUNTAJES, estudiantes, tarea)
+            with open(base + SUFIJO_PUNTAJES, "a", encoding="utf-8") as f:
+                f.write(lineas)
+                f.flush()
+                os.fsync(f.fileno())
+            estadisticas = actualizar_estadisticas(self.estadisticas(), tarea,
+                                                   [(puntajes, round(float(calificacion), 2))] * len(estudiantes),
+                                                   anteriores)
+            _escribir_estadisticas(base + SUFIJO_ESTADISTICAS, estadisticas)
+
+    def estadisticas(self):
+        """{tarea: EstadisticasTarea}; se lee un archivo de tamaño fijo por actividad."""
+        ruta = os.path.splitext(self.ruta)[0] + SUFIJO_ESTADISTICAS
+        if not os.path.exists(ruta):
+            return {}
+        with open(ruta, encoding="utf-8") as f:
+            return estadisticas_desde_dict(json.load(f))
+
+    # --- Puntajes crudos por rúbrica ---
+
+    def guardar_puntajes_rubrica(self, rubrica, grupos, tarea="", fecha=None):
+        """Anexa los puntajes crudos (enunciados x sub-items) de cada estudiante
+        de `grupos` ((estudiantes, puntajes, calificacion)) con la versión de
+        `rubrica`, y registra la rúbrica si esa versión es nueva."""
+        fecha = fecha or datetime.date.today().strftime('%Y-%m-%d')
+        base = os.path.splitext(self.ruta)[0]
+        lineas = "".join(json.dumps({"Estudiante": est, "Tarea": tarea, "Fecha": fecha,
+                                     "Calificacion": round(float(calificacion), 2), "version": rubrica.version,
+                                     "puntajes": puntajes.tolist() if hasattr(puntajes, "tolist") else puntajes},
+                                    ensure_ascii=False) + "\n"
+                         for estudiantes, puntajes, calificacion in grupos for est in estudiantes)
+        with bloqueo_libro(self.ruta):
+            self._registrar_rubrica(rubrica)
+            with open(base + SUFIJO_PUNTAJES_RUBRICA, "a", encoding="utf-8") as f:
+                f.write(lineas)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _registrar_rubrica(self, rubrica):
+        if rubrica.version not in self.rubricas():
+            with open(os.path.splitext(self.ruta)[0] + SUFIJO_RUBRICAS, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"version": rubrica.version, "rubrica": rubrica.definicion()}, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def rubricas(self):
+        """{version: definición} de las rúbricas con que se guardaron puntajes."""
+        return {r["version"]: r["rubrica"] for r in _leer_diario(os.path.splitext(self.ruta)[0] + SUFIJO_RUBRICAS)}
+
+    def puntajes_rubrica(self, tarea=None):
+        """Registros de puntajes crudos, en el orden en que se guardaron."""
+        registros = _leer_diario(os.path.splitext(self.ruta)[0] + SUFIJO_PUNTAJES_RUBRICA)
+        return [r for r in registros if tarea is None or r.get("Tarea", "") == tarea]
+
+    def reponderar(self, rubrica, tarea=""):
+        """Recalcula con `rubrica` las notas de `tarea` a partir de los puntajes crudos.
+
+        Bajo el bloqueo del libro: integra el diario, cambia en el CSV la última
+        nota de cada estudiante recalculado (si sigue siendo la que dio su
+        rúbrica anterior) y reescribe los puntajes y los reportes guardados, cada
+        archivo con un reemplazo atómico. Devuelve una Reponderacion.
+        """
+        base = os.path.splitext(self.ruta)[0]
+        with bloqueo_libro(self.ruta):
+            compactar_libro(self.ruta, renombrar=self.renombrar)
+            registros = list(_leer_diario(base + SUFIJO_PUNTAJES_RUBRICA))
+            de_tarea = [i for i, r in enumerate(registros) if r.get("Tarea", "") == tarea]
+            posiciones, notas = recalcular([registros[i] for i in de_tarea], self.rubricas(), rubrica)
+            # El registro más reciente de cada estudiante es el que corresponde a su nota.
+            ultimas = {}
+            for posicion, nota in sorted(zip(posiciones, notas.tolist())):
+                registro = registros[de_tarea[posicion]]
+                ultimas[registro["Estudiante"]] = (registro["Calificacion"], nota)
+                registro["Calificacion"], registro["version"] = nota, rubrica.version
+            cambios = self._reescribir_notas(tarea, ultimas) if ultimas else []
+            self._registrar_rubrica(rubrica)
+            if posiciones:
+                _reescribir_jsonl(base + SUFIJO_PUNTAJES_RUBRICA, registros)
+                reportes = list(_leer_diario(base + SUFIJO_REPORTES))
+                for registro in reportes:
+                    if registro.get("tipo") == "rubrica" and registro.get("tarea", "") == tarea:
+                        registro["datos"] = reponderar_reporte(registro["datos"], rubrica) or registro["datos"]
+                if reportes:
+                    _reescribir_jsonl(base + SUFIJO_REPORTES, reportes)
+        omitidas = {registros[i]["Estudiante"] for i in de_tarea} - set(ultimas)
+        return Reponderacion(tabla_cambios(cambios), len(ultimas), len(omitidas), rubrica.version)
+
+    def _reescribir_notas(self, tarea, ultimas):
+        # {estudiante: (nota anterior, nota nueva)} -> cambia la última fila de
+        # cada estudiante en la actividad, si su nota es todavía la anterior.
+        if not os.path.exists(self.ruta):
+            return []
+        with open(self.ruta, newline="", encoding="utf-8") as f:
+            lector = csv.DictReader(f)
+            encabezado, filas = lector.fieldnames, list(lector)
+        ultima_fila = {}
+        for i, fila in enumerate(filas):
+            if fila.get("Estudiante") in ultimas and (fila.get("Tarea") or "") == tarea:
+                ultima_fila[fila["Estudiante"]] = i
+        cambios = []
+        for estudiante, i in ultima_fila.items():
+            anterior, nueva = ultimas[estudiante]
+            try:
+                vigente = float(filas[i][self.columna_nota])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if abs(vigente - anterior) < 0.005:
+                filas[i][self.columna_nota] = f"{nueva:.2f}"
+                cambios.append((estudiante, tarea, anterior, nueva))
+        if cambios:
+            temporal = self.ruta + ".tmp"
+            with open(temporal, "w", newline="", encoding="utf-8") as salida:
+                escritor = csv.DictWriter(salida, fieldnames=encabezado)
+                escritor.writeheader()
+                escritor.writerows(filas)
+                salida.flush()
+                os.fsync(salida.fileno())
+            os.replace(temporal, self.ruta)
+            escribir_instantanea(self.ruta, self.renombrar)
+        return cambios
+
+    def pendientes(self):
+        return contar_pendientes(self.ruta)
+
+    def compactar(self):
+        with bloqueo_libro(self.ruta):
+            integradas = compactar_libro(self.ruta, renombrar=self.renombrar)
+            # Reportes y puntajes solo crecen: al consolidar queda el último de
+            # cada (grupo, tarea) y de cada (estudiante, tarea).
+            base = os.path.splitext(self.ruta)[0]
+            _compactar_jsonl(base + SUFIJO_REPORTES, _ultimos_reportes)
+            vigentes = _compactar_jsonl(base + SUFIJO_PUNTAJES, _ultimos_puntajes)
+            # Se rehacen desde los puntajes vigentes: corrige estadísticas que
+            # contaban cada guardado como una entrega.
+            if vigentes:
+                estadisticas = {}
+                for registro in vigentes:
+                    actualizar_estadisticas(estadisticas, registro["Tarea"],
+                                            [(registro["puntajes"], registro["Calificacion"])])
+                _escribir_estadisticas(base + SUFIJO_ESTADISTICAS, estadisticas)
+        return integradas
+
+
+EXTENSIONES_SQLITE = (".db", ".sqlite", ".sqlite3")
+
+
+def abrir_libro(ruta, columna_nota="Calificacion Final", renombrar=None):
+    """Elige el almacenamiento según la extensión: SQLite para .db/.sqlite, CSV en otro caso."""
+    if ruta.lower().endswith(EXTENSIONES_SQLITE):
+        return LibroSQLite(ruta, columna_nota=columna_nota)
+    return LibroCSV(ruta, columna_nota=columna_nota, renombrar=renombrar)
@@ -0,0 +1,303 @@
+import contextlib
+import datetime
+import io
+import json
+import os
+import sqlite3
+import threading
+
+from nucleo.columnar import parquet_desde_df, tipar_df
+from nucleo.estadisticas import actualizar_estadisticas, estadisticas_desde_dict
+from nucleo.reponderacion import Reponderacion, recalcular, reponderar_reporte, tabla_cambios
+
+# --- Libro de notas en SQLite ---
+#
+# Una fila por (estudiante, tarea): volver a calificar a un grupo actualiza sus
+# filas en lugar de duplicarlas. Las consultas por estudiante, tarea y fecha
+# usan índices, sin recorrer todo el libro.
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS notas (
+    estudiante TEXT NOT NULL,
+    tarea TEXT NOT NULL DEFAULT '',
+    calificacion REAL NOT NULL,
+    calificacion_subjetiva REAL,
+    fecha TEXT NOT NULL,
+    PRIMARY KEY (estudiante, tarea)
+);
+CREATE INDEX IF NOT EXISTS idx_notas_estudiante_fecha ON notas (estudiante, fecha);
+CREATE INDEX IF NOT EXISTS idx_notas_tarea ON notas (tarea);
+CREATE INDEX IF NOT EXISTS idx_notas_fecha ON notas (fecha);
+CREATE TABLE IF NOT EXISTS reportes (
+    grupo TEXT NOT NULL,
+    tarea TEXT NOT NULL DEFAULT '',
+    tipo TEXT NOT NULL,
+    datos TEXT NOT NULL,
+    PRIMARY KEY (grupo, tarea)
+);
+CREATE TABLE IF NOT EXISTS puntajes (
+    estudiante TEXT NOT NULL,
+    tarea TEXT NOT NULL DEFAULT '',
+    calificacion REAL NOT NULL,
+    puntajes TEXT NOT NULL,
+    fecha TEXT NOT NULL,
+    PRIMARY KEY (estudiante, tarea)
+);
+CREATE TABLE IF NOT EXISTS estadisticas (
+    tarea TEXT PRIMARY KEY,
+    datos TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rubricas (
+    version TEXT PRIMARY KEY,
+    datos TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS puntajes_rubrica (
+    estudiante TEXT NOT NULL,
+    tarea TEXT NOT NULL DEFAULT '',
+    version TEXT NOT NULL,
+    calificacion REAL NOT NULL,
+    puntajes TEXT NOT NULL,
+    fecha TEXT NOT NULL,
+    PRIMARY KEY (estudiante, tarea)
+);
+"""
+
+_INICIALIZADOS = set()
+_BLOQUEO_ESQUEMA = threading.Lock()
+
+
+class LibroSQLite:
+    def __init__(self, ruta, columna_nota="Calificacion Final"):
+        self.ruta = ruta
+        self.columna_nota = columna_nota
+        self._inicializar()
+
+    def _inicializar(self):
+        # Streamlit construye el libro en cada rerun: el modo WAL y el esquema
+        # se aplican una sola vez por archivo y proceso.
+        ruta = os.path.abspath(self.ruta)
+        with _BLOQUEO_ESQUEMA:
+            if ruta in _INICIALIZADOS and os.path.exists(ruta):
+                return
+            with self._conectar() as con:
+                con.execute("PRAGMA journal_mode=WAL")
+                con.executescript(ESQUEMA)
+            _INICIALIZADOS.add(ruta)
+
+    @contextlib.contextmanager
+    def _conectar(self):
+        # Una conexión por operación: Streamlit atiende cada rerun en un hilo distinto.
+        con = sqlite3.connect(self.ruta, timeout=30)
+        try:
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    def guardar(self, estudiantes, calificacion, calificacion_subjetiva=None, tarea="", fecha=None):
+        self.guardar_lote([(estudiantes, calificacion, calificacion_subjetiva)], tarea=tarea, fecha=fecha)
+
+    def guardar_lote(self, grupos, tarea="", fecha=None):
+        """Guarda varios grupos (estudiantes, calificacion, calificacion_subjetiva) en una transacción."""
+        fecha = fecha or datetime.date.today().strftime('%Y-%m-%d')
+        filas = [(est, tarea, round(float(calificacion), 2),
+                  None if calificacion_subjetiva is None else round(float(calificacion_subjetiva), 2), fecha)
+                 for estudiantes, calificacion, calificacion_subjetiva in grupos for est in estudiantes]
+        with self._conectar() as con:
+            con.executemany(
+                """INSERT INTO notas (estudiante, tarea, calificacion, calificacion_subjetiva, fecha)
+                   VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT (estudiante, tarea) DO UPDATE SET
+                       calificacion = excluded.calificacion,
+                       calificacion_subjetiva = excluded.calificacion_subjetiva,
+                       fecha = excluded.fecha""",
+                filas,
+            )
+
+    def _consulta(self, sql, parametros=()):
+        import pandas as pd
+        with self._conectar() as con:
+            df = pd.read_sql_query(sql, con, params=parametros)
+        columnas = {"estudiante": "Estudiante", "tarea": "Tarea", "calificacion": self.columna_nota,
+                    "calificacion_subjetiva": "Calificacion Subjetiva", "fecha": "Fecha"}
+        return df.rename(columns=columnas)
+
+    def leer(self, tarea=None):
+        if tarea is None:
+            return self._consulta("SELECT * FROM notas ORDER BY rowid")
+        return self._consulta("SELECT * FROM notas WHERE tarea = ? ORDER BY rowid", (tarea,))
+
+    def notas_estudiante(self, estudiante):
+        return self._consulta("SELECT * FROM notas WHERE estudiante = ? ORDER BY fecha", (estudiante,))
+
+    def notas_por_fecha(self, desde, hasta=None):
+        hasta = hasta or desde
+        return self._consulta("SELECT * FROM notas WHERE fecha BETWEEN ? AND ? ORDER BY fecha", (desde, hasta))
+
+    def ultimas_notas(self):
+        """La nota más reciente de cada estudiante, sin importar la tarea."""
+        return self._consulta(
+            """SELECT estudiante, tarea, calificacion, calificacion_subjetiva, fecha FROM (
+                   SELECT *, ROW_NUMBER() OVER (PARTITION BY estudiante ORDER BY fecha DESC, rowid DESC) AS orden
+                   FROM notas)
+               WHERE orden = 1 ORDER BY estudiante""")
+
+    def consultar(self, columnas=None, estudiante=None, tarea=None, desde=None, hasta=None):
+        """Como LibroCSV.consultar: notas tipadas filtradas con índices, solo en las `columnas` pedidas."""
+        nombres = {"Estudiante": "estudiante", "Tarea": "tarea", self.columna_nota: "calificacion",
+                   "Calificacion Subjetiva": "calificacion_subjetiva", "Fecha": "fecha"}
+        seleccion = ", ".join(nombres[c] for c in columnas if c in nombres) if columnas else "*"
+        condiciones, parametros = [], []
+        if estudiante is not None:
+            estudiantes = [estudiante] if isinstance(estudiante, str) else list(estudiante)
+            condiciones.append(f"estudiante IN ({', '.join('?' * len(estudiantes))})")
+            parametros += estudiantes
+        for condicion, valor in (("tarea = ?", tarea), ("fecha >= ?", desde), ("fecha <= ?", hasta)):
+            if valor is not None:
+                condiciones.append(condicion)
+                parametros.append(str(valor))
+        donde = f" WHERE {' AND '.join(condiciones)}" if condiciones else ""
+        df = self._consulta(f"SELECT {seleccion} FROM notas{donde} ORDER BY rowid", parametros)
+        return tipar_df(df, (self.columna_nota, "Calificacion Subjetiva"))
+
+    def exportar_parquet(self, destino=None, tarea=None):
+        """Como LibroCSV.exportar_parquet."""
+        df = self.consultar(tarea=tarea)
+        if tarea is not None:
+            df = df.drop(columns=["Tarea"])
+        return parquet_desde_df(df, destino)
+
+    def tareas(self):
+        with self._conectar() as con:
+            return [fila[0] for fila in con.execute("SELECT DISTINCT tarea FROM notas ORDER BY tarea")]
+
+    def exportar_csv(self, destino=None, tarea=None):
+        """Exporta con el formato CSV de siempre (el que espera unir_notas.py).
+
+        Con `tarea` se exporta solo esa tarea y sin columna "Tarea"; si
+        `destino` es None devuelve el texto CSV.
+        """
+        df = self.leer(tarea)
+        if tarea is not None or (df["Tarea"] == "").all():
+            df = df.drop(columns=["Tarea"])
+        if df["Calificacion Subjetiva"].isna().all():
+            df = df.drop(columns=["Calificacion Subjetiva"])
+        salida = destino if destino is not None else io.StringIO()
+        df.to_csv(salida, index=False, float_format="%.2f")
+        if destino is None:
+            return salida.getvalue()
+
+    def guardar_reporte(self, grupo, tipo, datos, tarea=""):
+        with self._conectar() as con:
+            con.execute(
+                """INSERT INTO reportes (grupo, tarea, tipo, datos) VALUES (?, ?, ?, ?)
+                   ON CONFLICT (grupo, tarea) DO UPDATE SET tipo = excluded.tipo, datos = excluded.datos""",
+                (grupo, tarea, tipo, json.dumps(datos, ensure_ascii=False)),
+            )
+
+    def reportes(self):
+        with self._conectar() as con:
+            filas = con.execute("SELECT grupo, tarea, tipo, datos FROM reportes ORDER BY rowid").fetchall()
+        return [{"grupo": g, "tarea": t, "tipo": tipo, "datos": json.loads(d)} for g, t, tipo, d in filas]
+
+    def guardar_puntajes(self, estudiantes, puntajes, calificacion, tarea="", fecha=None):
+        """Guarda los puntajes por componente y actualiza las estadísticas en la
+        misma transacción; al recalificar se restan los puntajes anteriores."""
+        fecha = fecha or datetime.date.today().strftime('%Y-%m-%d')
+        texto = json.dumps(puntajes.tolist() if hasattr(puntajes, "tolist") else puntajes)
+        with self._conectar() as con:
+            con.execute("BEGIN IMMEDIATE")
+            marcas = ",".join("?" * len(estudiantes))
+            anteriores = [(json.loads(p), c) for p, c in con.execute(
+                f"SELECT puntajes, calificacion FROM puntajes WHERE tarea = ? AND estudiante IN ({marcas})",
+                (tarea, *estudiantes))]
+            fila = con.execute("SELECT datos FROM estadisticas WHERE tarea = ?", (tarea,)).fetchone()
+            estadisticas = estadisticas_desde_dict({tarea: json.loads(fila[0])} if fila else {})
+            actualizar_estadisticas(estadisticas, tarea, [(puntajes, round(float(calificacion), 2))] * len(estudiantes), anteriores)
+            con.executemany(
+                """INSERT INTO puntajes (estudiante, tarea, calificacion, puntajes, fecha) VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT (estudiante, tarea) DO UPDATE SET calificacion = excluded.calificacion,
+                       puntajes = excluded.puntajes, fecha = excluded.fecha""",
+                [(est, tarea, round(float(calificacion), 2), texto, fecha) for est in estudiantes])
+            con.execute("""INSERT INTO estadisticas (tarea, datos) VALUES (?, ?)
+                           ON CONFLICT (tarea) DO UPDATE SET datos = excluded.datos""",
+                        (tarea, json.dumps(estadisticas[tarea].a_dict())))
+
+    def estadisticas(self):
+        with self._conectar() as con:
+            filas = con.execute("SELECT tarea, datos FROM estadisticas ORDER BY tarea").fetchall()
+        return estadisticas_desde_dict({t: json.loads(d) for t, d in filas})
+
+    def pendientes(self):
+        return 0
+
+    def compactar(self):
+        return 0
+
+    # --- Puntajes crudos por rúbrica ---
+
+    def guardar_puntajes_rubrica(self, rubrica, grupos, tarea="", fecha=None):
+        """Como LibroCSV.guardar_puntajes_rubrica; una fila por (estudiante, tarea)."""
+        fecha = fecha or datetime.date.today().strftime('%Y-%m-%d')
+        filas = [(est, tarea, rubrica.version, round(float(calificacion), 2),
+                  json.dumps(puntajes.tolist() if hasattr(puntajes, "tolist") else puntajes), fecha)
+                 for estudiantes, puntajes, calificacion in grupos for est in estudiantes]
+        with self._conectar() as con:
+            con.execute("INSERT OR IGNORE INTO rubricas (version, datos) VALUES (?, ?)",
+                        (rubrica.version, json.dumps(rubrica.definicion(), ensure_ascii=False)))
+            con.executemany(
+                """INSERT INTO puntajes_rubrica (estudiante, tarea, version, calificacion, puntajes, fecha)
+                   VALUES (?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (estudiante, tarea) DO UPDATE SET version = excluded.version,
+                       calificacion = excluded.calificacion, puntajes = excluded.puntajes, fecha = excluded.fecha""",
+                filas)
+
+    def rubricas(self):
+        with self._conectar() as con:
+            return {v: json.loads(d) for v, d in con.execute("SELECT version, datos FROM rubricas")}
+
+    def puntajes_rubrica(self, tarea=None):
+        sql = "SELECT estudiante, tarea, fecha, calificacion, version, puntajes FROM puntajes_rubrica"
+        with self._conectar() as con:
+            filas = con.execute(sql + " WHERE tarea = ? ORDER BY rowid" if tarea is not None else sql + " ORDER BY rowid",
+                                (tarea,) if tarea is not None else ()).fetchall()
+        return [{"Estudiante": e, "Tarea": t, "Fecha": f, "Calificacion": c, "version": v, "puntajes": json.loads(p)}
+                for e, t, f, c, v, p in filas]
+
+    def reponderar(self, rubrica, tarea=""):
+        """Como LibroCSV.reponderar, en una sola transacción.
+
+        Hay un registro de puntajes por (estudiante, tarea), así que contar
+        registros es contar estudiantes, como en el CSV.
+        """
+        registros = []
+        with self._conectar() as con:
+            con.execute("BEGIN IMMEDIATE")
+            for e, c, v, p in con.execute(
+                    "SELECT estudiante, calificacion, version, puntajes FROM puntajes_rubrica WHERE tarea = ?", (tarea,)):
+                registros.append({"Estudiante": e, "Calificacion": c, "version": v, "puntajes": json.loads(p)})
+            definiciones = {v: json.loads(d) for v, d in con.execute("SELECT version, datos FROM rubricas")}
+            posiciones, notas = recalcular(registros, definiciones, rubrica)
+            cambios = []
+            for posicion, nota in zip(posiciones, notas.tolist()):
+                estudiante, anterior = registros[posicion]["Estudiante"], registros[posicion]["Calificacion"]
+                # Solo si la nota del libro es todavía la que dio la rúbrica anterior.
+                movidas = con.execute(
+                    """UPDATE notas SET calificacion = ? WHERE estudiante = ? AND tarea = ?
+                       AND ROUND(calificacion, 2) = ROUND(?, 2)""", (nota, estudiante, tarea, anterior)).rowcount
+                if movidas:
+                    cambios.append((estudiante, tarea, anterior, nota))
+            con.executemany("UPDATE puntajes_rubrica SET calificacion = ?, version = ? WHERE estudiante = ? AND tarea = ?",
+                            [(nota, rubrica.version, registros[posicion]["Estudiante"], tarea)
+                             for posicion, nota in zip(posiciones, notas.tolist())])
+            con.execute("INSERT OR IGNORE INTO rubricas (version, datos) VALUES (?, ?)",
+                        (rubrica.version, json.dumps(rubrica.definicion(), ensure_ascii=False)))
+            if posiciones:
+                reportes = con.execute("SELECT grupo, datos FROM reportes WHERE tarea = ? AND tipo = 'rubrica'",
+                                       (tarea,)).fetchall()
+                for grupo, datos in reportes:
+                    nuevos = reponderar_reporte(json.loads(datos), rubrica)
+                    if nuevos is not None:
+                        con.execute("UPDATE reportes SET datos = ? WHERE grupo = ? AND tarea = ?",
+                                    (json.dumps(nuevos, ensure_ascii=False), grupo, tarea))
+        return Reponderacion(tabla_cambios(cambios), len(posiciones), len(registros) - len(posiciones), rubrica.version)
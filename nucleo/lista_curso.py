@@ -0,0 +1,292 @@
+import bisect
+import codecs
+import collections
+import csv
+import hashlib
+import heapq
+import io
+import os
+import re
+
+from nucleo.fusion_notas import normalizar_nombre
+
+# --- Lista del curso ---
+
+COLUMNA_NOMBRE = "NOMBRE COMPLETO"
+# Columnas opcionales con el código del estudiante (para el alta en bloque).
+COLUMNAS_ID = ("CODIGO", "CÓDIGO", "ID", "DOCUMENTO", "IDENTIFICACION", "IDENTIFICACIÓN")
+
+
+def huella(contenido):
+    return hashlib.sha1(contenido).hexdigest()
+
+
+def huella_subida(archivo, estado, clave="_huella_lista_curso"):
+    """Huella del contenido de un archivo subido, calculada una vez por subida.
+
+    `estado` es un diccionario que sobrevive entre reruns (st.session_state):
+    mientras el archivo subido sea el mismo no se vuelve a leer.
+    """
+    id_subida = getattr(archivo, "file_id", None)
+    guardada = estado.get(clave)
+    if id_subida is not None and guardada and guardada[0] == id_subida:
+        return guardada[1]
+    calculada = huella(archivo.getvalue())
+    estado[clave] = (id_subida, calculada)
+    return calculada
+
+
+def leer_lista(contenido, encoding=None):
+    """Nombres de la lista del curso."""
+    return leer_indice(contenido, encoding).nombres
+
+
+# --- Importación de la lista ---
+#
+# Las exportaciones institucionales pueden tener cientos de miles de filas y
+# decenas de columnas, en UTF-8 o en la codificación de Windows, separadas por
+# ',' o ';'. La codificación y el separador se deducen de una muestra del
+# inicio; después el archivo se lee por bloques y de cada bloque solo se
+# convierten las columnas de nombre y código, así que la memoria no depende
+# del ancho ni del largo del archivo más allá de los estudiantes que se
+# guardan. Los encabezados se reconocen por alias (sin tildes ni mayúsculas).
+
+ALIAS_NOMBRE = (COLUMNA_NOMBRE, "NOMBRES Y APELLIDOS", "APELLIDOS Y NOMBRES", "NOMBRE DEL ESTUDIANTE",
+                "NOMBRE ESTUDIANTE")
+# Sin nombre completo, se arma con los nombres y luego los apellidos; si
+# tampoco hay apellidos, se usa una de estas columnas tal cual.
+ALIAS_NOMBRES = ("NOMBRES", "NOMBRE")
+ALIAS_APELLIDOS = (("APELLIDOS",), ("PRIMER APELLIDO", "SEGUNDO APELLIDO"))
+ALIAS_NOMBRE_SIMPLE = ("ESTUDIANTE", "NOMBRES", "NOMBRE")
+ALIAS_ID = COLUMNAS_ID + ("CODIGO ESTUDIANTE", "CODIGO ESTUDIANTIL", "ID ESTUDIANTE", "CEDULA",
+                          "NUMERO DE DOCUMENTO", "DOCUMENTO DE IDENTIDAD")
+
+TAMANO_MUESTRA = 64 * 1024
+FILAS_POR_BLOQUE = 20_000
+
+
+def _encabezado(texto):
+    return normalizar_nombre(str(texto).replace("_", " "))
+
+
+def _codificaciones(muestra):
+    """Codificaciones a probar, de la más probable a latin-1 (que nunca falla)."""
+    if muestra.startswith(codecs.BOM_UTF8):
+        return ["utf-8-sig"]
+    if muestra.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return ["utf-16"]
+    try:
+        # La muestra puede cortar un carácter por la mitad: final=False.
+        codecs.getincrementaldecoder("utf-8")().decode(muestra, final=False)
+        return ["utf-8", "cp1252", "latin1"]
+    except UnicodeDecodeError:
+        return ["cp1252", "latin1"]
+
+
+def _separador(texto):
+    lineas = "\n".join(texto.splitlines()[:50])
+    try:
+        return csv.Sniffer().sniff(lineas, delimiters=",;\t|").delimiter
+    except csv.Error:
+        return ","
+
+
+def _columnas(encabezado):
+    """(posiciones que forman el nombre, posición del código o None)."""
+    posiciones = {}
+    for i, columna in enumerate(encabezado):
+        posiciones.setdefault(_encabezado(columna), i)
+    buscar = lambda alias: next((posiciones[_encabezado(a)] for a in alias if _encabezado(a) in posiciones), None)
+    columna_id = buscar(ALIAS_ID)
+    nombre = buscar(ALIAS_NOMBRE)
+    if nombre is not None:
+        return [nombre], columna_id
+    nombres = buscar(ALIAS_NOMBRES)
+    for alias in ALIAS_APELLIDOS:
+        apellidos = [posiciones.get(_encabezado(a)) for a in alias]
+        if nombres is not None and apellidos[0] is not None:
+            return [nombres] + [p for p in apellidos if p is not None], columna_id
+    nombre = buscar(ALIAS_NOMBRE_SIMPLE)
+    if nombre is not None:
+        return [nombre], columna_id
+    raise KeyError(COLUMNA_NOMBRE)
+
+
+def _abrir(fuente):
+    if isinstance(fuente, (bytes, bytearray, memoryview)):
+        return io.BytesIO(fuente), False
+    if isinstance(fuente, (str, os.PathLike)):
+        return open(fuente, "rb"), True
+    fuente.seek(0)
+    return fuente, False
+
+
+def leer_indice(fuente, encoding=None, filas_por_bloque=FILAS_POR_BLOQUE):
+    """Índice de búsqueda de la lista del curso (nombres y, si hay, códigos).
+
+    `fuente` puede ser el contenido (bytes), una ruta o un archivo binario. Las
+    filas repetidas (mismo código o, sin código, mismo nombre) se cuentan una
+    vez. Si no hay columna de nombres se lanza KeyError(COLUMNA_NOMBRE).
+    """
+    archivo, propio = _abrir(fuente)
+    try:
+        inicio = archivo.tell()
+        muestra = archivo.read(TAMANO_MUESTRA)
+        for codificacion in [encoding] if encoding else _codificaciones(muestra):
+            archivo.seek(inicio)
+            try:
+                return _leer_por_bloques(archivo, muestra, codificacion, filas_por_bloque)
+            except UnicodeDecodeError:
+                if encoding:
+                    raise
+    finally:
+        if propio:
+            archivo.close()
+
+
+def _leer_por_bloques(archivo, muestra, codificacion, filas_por_bloque):
+    import pandas as pd
+    texto = muestra.decode(codificacion, errors="ignore").lstrip("\ufeff")
+    separador = _separador(texto)
+    encabezado = next(csv.reader(io.StringIO(texto), delimiter=separador), [])
+    columnas_nombre, columna_id = _columnas(encabezado)
+    usadas = sorted(set(columnas_nombre) | ({columna_id} if columna_id is not None else set()))
+    bloques = pd.read_csv(archivo, encoding=codificacion, sep=separador, usecols=usadas, dtype=str,
+                          keep_default_na=False, chunksize=filas_por_bloque)
+    nombres, claves, ids, vistos = [], [], [], set()
+    filas = duplicados = 0
+    for bloque in bloques:
+        valores = [bloque.iloc[:, usadas.index(i)].tolist() for i in columnas_nombre]
+        codigos = bloque.iloc[:, usadas.index(columna_id)].tolist() if columna_id is not None else [""] * len(bloque)
+        filas += len(bloque)
+        for partes, codigo in zip(zip(*valores), codigos):
+            nombre = " ".join(" ".join(partes).split())
+            if not nombre:
+                continue
+            clave = normalizar_nombre(nombre)
+            codigo = codigo.strip()
+            unica = ("id", normalizar_nombre(codigo)) if codigo else ("nombre", clave)
+            if unica in vistos:
+                duplicados += 1
+                continue
+            vistos.add(unica)
+            nombres.append(nombre)
+            claves.append(clave)
+            ids.append(codigo)
+    indice = IndiceLista(nombres, ids if columna_id is not None else None, claves=claves)
+    indice.importacion = {"codificacion": codificacion, "separador": separador, "filas": filas,
+                          "duplicados": duplicados, "columnas": [encabezado[i] for i in usadas]}
+    return indice
+
+
+# --- Búsqueda en la lista ---
+
+
+def _trigramas(clave):
+    relleno = f"  {clave} "
+    return {relleno[i:i + 3] for i in range(len(relleno) - 2)}
+
+
+class IndiceLista:
+    """Índice de la lista del curso, construido una vez por lista.
+
+    Las claves se normalizan sin tildes ni mayúsculas. `buscar` encuentra los
+    nombres cuyas palabras empiezan por las de la consulta (búsqueda binaria
+    sobre las palabras distintas, ordenadas) y, si no hay ninguno, los más
+    parecidos por trigramas; el índice de trigramas se arma la primera vez que
+    hace falta. `resolver` convierte una lista pegada de nombres o códigos en
+    estudiantes de la lista, de una sola vez.
+    """
+    __slots__ = ("nombres", "claves", "importacion", "_partes", "_por_clave", "_por_id", "_palabras",
+                 "_por_palabra", "_acumulado", "_trigramas")
+
+    def __init__(self, nombres, ids=None, claves=None):
+        self.nombres = tuple(nombres)
+        self.claves = tuple(claves) if claves is not None else tuple(normalizar_nombre(n) for n in self.nombres)
+        # Resumen de leer_indice (codificación, separador, filas, duplicados).
+        self.importacion = None
+        self._partes = tuple(tuple(c.split()) for c in self.claves)
+        self._por_clave = collections.defaultdict(list)
+        self._por_palabra = collections.defaultdict(list)
+        for i, (clave, partes) in enumerate(zip(self.claves, self._partes)):
+            self._por_clave[clave].append(i)
+            for palabra in set(partes):
+                self._por_palabra[palabra].append(i)
+        self._palabras = sorted(self._por_palabra)
+        # _acumulado[j]: cuántos nombres tienen alguna de las primeras j palabras.
+        self._acumulado = [0]
+        for palabra in self._palabras:
+            self._acumulado.append(self._acumulado[-1] + len(self._por_palabra[palabra]))
+        self._trigramas = None
+        self._por_id = {}
+        for i, codigo in enumerate(ids or ()):
+            if isinstance(codigo, str) and codigo.strip():
+                self._por_id[normalizar_nombre(codigo)] = i
+
+    def __len__(self):
+        return len(self.nombres)
+
+    def _rango(self, prefijo):
+        return (bisect.bisect_left(self._palabras, prefijo),
+                bisect.bisect_left(self._palabras, prefijo + "\U0010ffff"))
+
+    def _indice_trigramas(self):
+        if self._trigramas is None:
+            trigramas = collections.defaultdict(list)
+            for i, clave in enumerate(self.claves):
+                for trigrama in _trigramas(clave):
+                    trigramas[trigrama].append(i)
+            self._trigramas = trigramas
+        return self._trigramas
+
+    def _candidatos(self, clave):
+        """Índices cuyos nombres tienen, para cada palabra de `clave`, una que empieza por ella."""
+        prefijos = clave.split()
+        rangos = [self._rango(p) for p in prefijos]
+        # Se parte del prefijo con menos coincidencias y se filtra por los demás.
+        k = min(range(len(prefijos)), key=lambda j: self._acumulado[rangos[j][1]] - self._acumulado[rangos[j][0]])
+        inicio, fin = rangos[k]
+        candidatos = {i for palabra in self._palabras[inicio:fin] for i in self._por_palabra[palabra]}
+        otros = prefijos[:k] + prefijos[k + 1:]
+        if not otros:
+            return candidatos
+        return {i for i in candidatos
+                if all(any(w.startswith(p) for w in self._partes[i]) for p in otros)}
+
+    def buscar(self, consulta, limite=20):
+        clave = normalizar_nombre(consulta)
+        if not clave:
+            return []
+        if clave in self._por_id:
+            return [self.nombres[self._por_id[clave]]]
+        candidatos = self._candidatos(clave)
+        if candidatos:
+            # Primero los que empiezan por la consulta completa; luego, orden de la lista.
+            orden = heapq.nsmallest(limite, candidatos, key=lambda i: (not self.claves[i].startswith(clave), i))
+            return [self.nombres[i] for i in orden]
+        trigramas = _trigramas(clave)
+        indice = self._indice_trigramas()
+        votos = collections.Counter(i for t in trigramas for i in indice.get(t, ()))
+        minimo = 0.4 * len(trigramas)
+        return [self.nombres[i] for i, n in votos.most_common(limite) if n >= minimo]
+
+    def resolver(self, texto):
+        """Nombres de la lista para cada entrada de `texto` (una por línea, o
+        separadas por ';' o ','). Devuelve (encontrados, sin_resolver), donde
+        sin_resolver son las entradas sin coincidencia o con varias."""
+        encontrados, sin_resolver = [], []
+        for entrada in re.split(r"[\n;,\t]+", texto):
+            clave = normalizar_nombre(entrada)
+            if not clave:
+                continue
+            if clave in self._por_id:
+                indices = [self._por_id[clave]]
+            elif clave in self._por_clave:
+                indices = self._por_clave[clave]
+            else:
+                indices = list(self._candidatos(clave))
+            if len(indices) == 1:
+                encontrados.append(self.nombres[indices[0]])
+            else:
+                sin_resolver.append(entrada.strip())
+        return list(dict.fromkeys(encontrados)), sin_resolver
@@ -0,0 +1,51 @@
+import contextlib
+import datetime
+import json
+import os
+import time
+
+# --- Perfilado por ejecución ---
+#
+# Opcional: con CALIFICADOR_PERFIL definida, las apps miden cada fase de la
+# ejecución (lista, widgets, puntuación, guardado, PDF) y muestran un panel en
+# la barra lateral. CALIFICADOR_PERFIL_ARCHIVO (que también lo activa) anexa
+# además cada ejecución como una línea JSON a ese archivo. Sin ninguna de las
+# dos, `fase` no mide nada.
+
+
+class Perfilador:
+    def __init__(self, app, activo=False, archivo=None):
+        self.app, self.activo, self.archivo = app, activo, archivo
+        self.fases = {}
+        self._inicio = time.perf_counter()
+
+    @contextlib.contextmanager
+    def fase(self, nombre):
+        if not self.activo:
+            yield
+            return
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.fases[nombre] = self.fases.get(nombre, 0.0) + (time.perf_counter() - inicio) * 1000
+
+    def total_ms(self):
+        return (time.perf_counter() - self._inicio) * 1000
+
+    def registro(self):
+        return {"fecha": datetime.datetime.now().isoformat(timespec="milliseconds"), "app": self.app,
+                "total_ms": round(self.total_ms(), 3),
+                "fases": {nombre: round(ms, 3) for nombre, ms in self.fases.items()}}
+
+    def exportar(self):
+        """Anexa el registro de esta ejecución al archivo JSON Lines, si hay uno."""
+        if not (self.activo and self.archivo):
+            return
+        with open(self.archivo, "a", encoding="utf-8") as f:
+            f.write(json.dumps(self.registro(), ensure_ascii=False) + "\n")
+
+
+def perfilador_desde_entorno(app):
+    archivo = os.environ.get("CALIFICADOR_PERFIL_ARCHIVO") or None
+    return Perfilador(app, activo=bool(os.environ.get("CALIFICADOR_PERFIL") or archivo), archivo=archivo)
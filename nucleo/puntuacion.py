@@ -0,0 +1,55 @@
+from collections import namedtuple
+
+import numpy as np
+
+# --- Motor de puntuación vectorizado ---
+#
+# Una rúbrica se compila en una matriz preguntas × sub-items: una máscara dice
+# qué sub-items aplican a cada pregunta y un vector guarda el peso de cada
+# pregunta. Los puntajes de un grupo son un arreglo denso con esa forma; los
+# de muchos grupos, un arreglo (grupos, preguntas, sub-items). Todo se calcula
+# en una sola pasada de NumPy.
+
+Puntuacion = namedtuple("Puntuacion", ["nota_final", "puntaje_total", "promedios", "totales_competencia"])
+
+
+class MotorPuntuacion:
+    __slots__ = ("preguntas", "sub_items", "fila", "columna", "mascara", "pesos",
+                 "puntaje_maximo", "escala", "_n_sub_items", "_pesos_normalizados")
+
+    def __init__(self, preguntas, sub_items, mascara, pesos=None, puntaje_maximo=None, escala=5.0):
+        """Con `puntaje_maximo` la nota es escala * total / puntaje_maximo;
+        sin él, el promedio ponderado por `pesos` de los promedios por pregunta."""
+        self.preguntas, self.sub_items = tuple(preguntas), tuple(sub_items)
+        self.fila = {p: i for i, p in enumerate(self.preguntas)}
+        self.columna = {s: j for j, s in enumerate(self.sub_items)}
+        self.mascara = np.asarray(mascara, dtype=bool)
+        if self.mascara.shape != (len(self.preguntas), len(self.sub_items)):
+            raise ValueError("La máscara debe tener forma (preguntas, sub-items).")
+        self.pesos = np.ones(len(self.preguntas)) if pesos is None else np.asarray(pesos, dtype=float)
+        self.puntaje_maximo, self.escala = puntaje_maximo, escala
+        self._n_sub_items = self.mascara.sum(axis=1)
+        total_peso = self.pesos.sum()
+        self._pesos_normalizados = self.pesos / total_peso if total_peso > 0 else np.zeros_like(self.pesos)
+
+    @property
+    def forma(self):
+        return self.mascara.shape
+
+    def vacio(self, grupos=None):
+        """Arreglo de puntajes en cero para un grupo, o para `grupos` grupos."""
+        return np.zeros(self.forma if grupos is None else (grupos,) + self.forma)
+
+    def puntuar(self, puntajes):
+        x = np.asarray(puntajes, dtype=float)
+        if x.shape[-2:] != self.forma:
+            raise ValueError(f"Los puntajes deben terminar en la forma {self.forma}, no {x.shape}.")
+        x = np.where(self.mascara, x, 0.0)
+        sumas = x.sum(axis=-1)
+        promedios = np.divide(sumas, self._n_sub_items, out=np.zeros_like(sumas), where=self._n_sub_items > 0)
+        puntaje_total = sumas.sum(axis=-1)
+        if self.puntaje_maximo:
+            nota_final = self.escala * puntaje_total / self.puntaje_maximo
+        else:
+            nota_final = promedios @ self._pesos_normalizados
+        return Puntuacion(nota_final, puntaje_total, promedios, x.sum(axis=-2))
@@ -0,0 +1,93 @@
+import collections
+
+import numpy as np
+
+from nucleo.rubricas import Rubrica
+
+# --- Reponderación de notas guardadas ---
+#
+# Cada calificación por rúbrica guarda los puntajes crudos (enunciados x
+# sub-items) con la versión de la rúbrica con que se tomaron. Si después se
+# corrige un peso, las notas de la actividad se recalculan con la rúbrica
+# nueva en una sola pasada del motor: los puntajes de cada versión guardada se
+# llevan a la disposición de la rúbrica nueva (por nombre de enunciado y
+# sub-item) y se apilan en un solo arreglo. Los libros (CSV y SQLite) usan
+# estas funciones dentro de su `reponderar`, que reescribe todo de una vez.
+
+# `cambios` es la tabla de notas que se movieron; `recalculadas` y `omitidas`
+# cuentan estudiantes de la actividad (no registros) con nota recalculada o con
+# puntajes de una rúbrica desconocida o incompatible. Los dos libros devuelven
+# las mismas cuentas.
+Reponderacion = collections.namedtuple("Reponderacion", ["cambios", "recalculadas", "omitidas", "version"])
+
+
+def _aplica(rubrica):
+    return {p: set(sub_items) for p, sub_items in rubrica.estructura}
+
+
+def _indices(anterior, nueva):
+    """(filas, columnas) que llevan puntajes de `anterior` a la forma de `nueva`,
+    o None si no califican los mismos sub-items en los mismos enunciados."""
+    if _aplica(anterior) != _aplica(nueva):
+        return None
+    filas = [anterior.motor.fila[p] for p in nueva.preguntas]
+    # Un sub-item que no aplica en ningún enunciado queda en cero por la máscara.
+    columnas = [anterior.motor.columna.get(s, 0) for s in nueva.sub_items]
+    return np.asarray(filas), np.asarray(columnas)
+
+
+def recalcular(registros, definiciones, rubrica):
+    """Notas nuevas (redondeadas a 2 decimales) de `registros` con `rubrica`.
+
+    `registros` son dicts con "version" y "puntajes"; `definiciones`,
+    {version: Rubrica.definicion()}. Devuelve (posiciones de los registros
+    recalculados, notas): los de versiones desconocidas o incompatibles se omiten.
+    """
+    por_version = collections.defaultdict(list)
+    for i, registro in enumerate(registros):
+        por_version[registro.get("version")].append(i)
+    posiciones, bloques = [], []
+    for version, indices in por_version.items():
+        if version not in definiciones:
+            continue
+        anterior = rubrica if version == rubrica.version else Rubrica.desde_definicion(definiciones[version])
+        mapa = _indices(anterior, rubrica)
+        if mapa is None:
+            continue
+        x = np.asarray([registros[i]["puntajes"] for i in indices], dtype=float)
+        bloques.append(x[:, mapa[0]][:, :, mapa[1]])
+        posiciones += indices
+    if not bloques:
+        return [], np.zeros(0)
+    return posiciones, np.round(rubrica.motor.puntuar(np.concatenate(bloques)).nota_final, 2)
+
+
+def reponderar_reporte(datos, rubrica):
+    """Datos de un reporte "rubrica" guardado, recalculados con `rubrica`; None si no es compatible."""
+    try:
+        anterior = Rubrica.desde_lista(datos["rubrica"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if _aplica(anterior) != _aplica(rubrica):
+        return None
+    motor = rubrica.motor
+    puntajes = motor.vacio()
+    for pregunta, valores in datos.get("calificaciones", {}).items():
+        for sub_item, valor in valores.items():
+            if pregunta in motor.fila and sub_item in motor.columna:
+                puntajes[motor.fila[pregunta], motor.columna[sub_item]] = valor
+    resultado = motor.puntuar(puntajes)
+    return {**datos, "rubrica": rubrica.como_lista(), "calificacion_final": float(resultado.nota_final),
+            "promedios_por_pregunta": dict(zip(motor.preguntas, resultado.promedios.tolist()))}
+
+
+def tabla_cambios(cambios):
+    """DataFrame de las notas que se movieron, de mayor a menor cambio.
+
+    `cambios` son tuplas (estudiante, tarea, nota anterior, nota nueva).
+    """
+    import pandas as pd
+    df = pd.DataFrame(cambios, columns=["Estudiante", "Tarea", "Nota anterior", "Nota nueva"])
+    df["Diferencia"] = (df["Nota nueva"] - df["Nota anterior"]).round(2)
+    df = df[df["Diferencia"] != 0]
+    return df.loc[df["Diferencia"].abs().sort_values(ascending=False, kind="stable").index].reset_index(drop=True)
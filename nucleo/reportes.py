@@ -0,0 +1,364 @@
+import concurrent.futures
+import datetime
+import functools
+import io
+import multiprocessing
+import os
+import re
+import time
+import zipfile
+
+from nucleo.fuentes import clase_pdf_unicode, preparar_textos
+from nucleo.taller_vigas import componentes_problemas, componentes_adicionales, problemas, MAX_SCORE
+
+
+# --- Colores y medidas comunes ---
+
+COLOR_ROJO, COLOR_AMARILLO, COLOR_VERDE, COLOR_NEGRO = (220, 53, 69), (255, 193, 7), (40, 167, 69), (0, 0, 0)
+
+
+def color_puntaje_vigas(score):
+    if score < 2.5: return COLOR_ROJO
+    elif score < 3.5: return COLOR_AMARILLO
+    else: return COLOR_VERDE
+
+
+def color_puntaje_0_5(score):
+    if score < 3.0: return COLOR_ROJO
+    elif score < 4.0: return COLOR_AMARILLO
+    else: return COLOR_VERDE
+
+
+# Margen superior por defecto de FPDF (28.35 pt, en mm).
+MARGEN_SUPERIOR = 28.35 / (72 / 25.4)
+
+
+def _nuevo_pdf(unicode=False):
+    # Con `unicode`, los textos fuera de Latin-1 van en la fuente TrueType (ver nucleo.fuentes).
+    from fpdf import FPDF
+    pdf = clase_pdf_unicode()() if unicode else FPDF()
+    pdf.add_page()
+    return pdf
+
+
+# --- Plantillas de reporte ---
+#
+# La parte estática de las tablas (bordes, encabezados, nombres de
+# competencias y sub-items) se recorre una sola vez por rúbrica y se guarda
+# como datos: cada celda con su posición, texto, borde y fuente, y los huecos
+# donde van los valores. Cada reporte vuelve a escribir esas celdas con
+# cell() (desplazadas si la tabla empieza más abajo) y llena los huecos.
+
+class PlantillaPDF:
+    __slots__ = ("celdas", "y_inicio", "y_fin", "fuente_final")
+
+    def __init__(self, dibujar, y_inicio, unicode=False):
+        pdf = _nuevo_pdf(unicode)
+        pdf.set_y(y_inicio)
+        celdas = []
+        escribir = pdf.cell
+
+        def anotar(clave, w, h, texto, border, align):
+            celdas.append((clave, pdf.x, pdf.y, w, h, texto, border, align, pdf.font_style, pdf.font_size_pt))
+
+        def cell(w, h=0, txt="", border=0, ln=0, align="", fill=0, link=""):
+            anotar(None, w, h, txt, border, align)
+            escribir(w, h, txt, border, ln, align, fill, link)
+
+        def reservar(pdf, clave, w, h, border=0, ln=0, align="C"):
+            anotar(clave, w, h, "", border, align)
+            escribir(w, h, "", border, ln)
+
+        pdf.cell = cell
+        dibujar(pdf, reservar)
+        self.y_inicio, self.y_fin = y_inicio, pdf.y
+        self.fuente_final = (pdf.font_family, pdf.font_style, pdf.font_size_pt)
+        # Si la tabla no cabe en una página, se dibuja directamente en cada reporte.
+        self.celdas = tuple(celdas) if pdf.page == 1 else None
+
+    def cabe(self, pdf):
+        return self.celdas is not None and self.y_fin + pdf.y - self.y_inicio <= pdf.page_break_trigger
+
+    def pegar(self, pdf, valores):
+        dy = pdf.y - self.y_inicio
+        familia, estilo, tamano = self.fuente_final
+        for clave, x, y, w, h, texto, borde, alineacion, estilo_celda, tamano_celda in self.celdas:
+            pdf.set_font(familia, estilo_celda, tamano_celda)
+            pdf.set_xy(x, y + dy)
+            if clave is None:
+                pdf.cell(w, h, texto, borde, 0, alineacion)
+                continue
+            texto, color = valores[clave]
+            pdf.set_text_color(*color)
+            pdf.cell(w, h, texto, borde, 0, alineacion)
+            pdf.set_text_color(*COLOR_NEGRO)
+        pdf.set_font(familia, estilo, tamano)
+        pdf.set_xy(pdf.l_margin, self.y_fin + dy)
+
+
+def _celdas_directas(valores):
+    def escribir(pdf, clave, w, h, border=0, ln=0, align="C"):
+        texto, color = valores[clave]
+        pdf.set_text_color(*color)
+        pdf.cell(w, h, texto, border, ln, align)
+        pdf.set_text_color(*COLOR_NEGRO)
+    return escribir
+
+
+def _tabla(pdf, plantilla, dibujar, valores, usar_plantilla):
+    if usar_plantilla and plantilla.cabe(pdf):
+        plantilla.pegar(pdf, valores)
+    else:
+        dibujar(pdf, _celdas_directas(valores))
+
+
+# --- Reporte del Taller de Vigas ---
+
+ANCHO_COMP, ANCHO_PROB, ANCHO_TOTAL = 75, 16, 20
+# Título, nombres, fecha y espacios: la tabla empieza siempre a esta altura.
+Y_TABLA_VIGAS = MARGEN_SUPERIOR + 46
+
+
+def _tabla_vigas(pdf, celda):
+    pdf.set_font("Arial", "B", 10)
+    pdf.cell(ANCHO_COMP, 8, "Competencia", 1, 0, "C")
+    for prob in problemas: pdf.cell(ANCHO_PROB, 8, prob, 1, 0, "C")
+    pdf.cell(ANCHO_TOTAL, 8, "Total", 1, 1, "C")
+
+    pdf.set_font("Arial", "", 9)
+    for comp in componentes_problemas:
+        pdf.cell(ANCHO_COMP, 8, comp.split(':')[1].strip(), 1, 0, "L")
+        for prob in problemas:
+            celda(pdf, ("puntaje", comp, prob), ANCHO_PROB, 8, 1, 0)
+        pdf.set_font("Arial", "B", 9)
+        celda(pdf, ("total", comp), ANCHO_TOTAL, 8, 1, 1)
+        pdf.set_font("Arial", "", 9)
+
+    pdf.ln(5)
+    pdf.set_font("Arial", "B", 10)
+    pdf.cell(ANCHO_COMP, 8, "Componentes Adicionales", 1, 0, "C")
+    pdf.cell(ANCHO_PROB * len(problemas) + ANCHO_TOTAL, 8, "Puntaje", 1, 1, "C")
+    pdf.set_font("Arial", "", 9)
+    for comp in componentes_adicionales:
+        pdf.cell(ANCHO_COMP, 8, comp.split(':')[1].strip(), 1, 0, "L")
+        pdf.set_font("Arial", "B", 9)
+        celda(pdf, ("adicional", comp), ANCHO_PROB * len(problemas) + ANCHO_TOTAL, 8, 1, 1)
+        pdf.set_font("Arial", "", 9)
+
+    pdf.ln(10)
+    pdf.set_font("Arial", "B", 12)
+    pdf.cell(0, 10, "Comentarios por Componente", 0, 1)
+
+
+@functools.lru_cache(maxsize=None)
+def plantilla_vigas(unicode=False):
+    return PlantillaPDF(_tabla_vigas, Y_TABLA_VIGAS, unicode)
+
+
+def _valores_vigas(datos_estudiante):
+    valores = {}
+    for comp, scores in datos_estudiante['scores_grid'].items():
+        for prob in problemas:
+            valores[("puntaje", comp, prob)] = (str(scores[prob]), color_puntaje_vigas(scores[prob]))
+        valores[("total", comp)] = (f"{scores['Total']}/{componentes_problemas[comp]}", COLOR_NEGRO)
+    for comp, score in datos_estudiante['scores_adicionales'].items():
+        valores[("adicional", comp)] = (f"{score}/{componentes_adicionales[comp]}", color_puntaje_vigas(score))
+    return valores
+
+
+def generar_pdf(datos_estudiante, usar_plantilla=True):
+    datos_estudiante, unicode = preparar_textos(datos_estudiante)
+    pdf = _nuevo_pdf(unicode)
+    pdf.set_font("Arial", "B", 16)
+    pdf.cell(0, 10, "Reporte de Calificación - Taller de Vigas", 0, 1, "C")
+    pdf.ln(10)
+    pdf.set_font("Arial", "", 12)
+    pdf.cell(0, 8, f"Estudiante(s): {datos_estudiante['nombres']}", 0, 1)
+    pdf.cell(0, 8, f"Fecha de calificación: {datos_estudiante.get('fecha') or datetime.date.today().strftime('%Y-%m-%d')}", 0, 1)
+    pdf.ln(10)
+
+    _tabla(pdf, plantilla_vigas(unicode), _tabla_vigas, _valores_vigas(datos_estudiante), usar_plantilla)
+
+    pdf.set_font("Arial", "", 10)
+    comentarios_ingresados = False
+    for key, value in datos_estudiante['comentarios'].items():
+        if value.strip():
+            pdf.multi_cell(0, 6, f"- {key}: {value}")
+            comentarios_ingresados = True
+    if not comentarios_ingresados: pdf.multi_cell(0, 6, "No se ingresaron comentarios específicos.")
+    pdf.ln(5)
+    pdf.set_font("Arial", "B", 12)
+    pdf.cell(0, 10, "Comentario Final", 0, 1)
+    pdf.set_font("Arial", "I", 10)
+    pdf.multi_cell(0, 6, datos_estudiante['comentario_final'])
+    pdf.ln(10)
+    pdf.set_font("Arial", "B", 14)
+    pdf.cell(0, 12, f"Puntaje Total: {datos_estudiante['puntaje_total']} / {MAX_SCORE}", 0, 1, "R")
+    pdf.cell(0, 12, f"Calificación Final (Calculada): {datos_estudiante['calificacion_final']:.2f} / 5.0", 0, 1, "R")
+    return pdf.output(dest='S').encode('latin-1')
+
+
+# --- Reporte por rúbrica ---
+
+# Altura de la tabla cuando los nombres ocupan una sola línea; con más líneas
+# la plantilla se desplaza hacia abajo.
+Y_TABLA_RUBRICA = MARGEN_SUPERIOR + 41
+
+
+def _tabla_rubrica(estructura):
+    def dibujar(pdf, celda):
+        pdf.set_font("Arial", "B", 10)
+        pdf.cell(90, 8, "Item Evaluado", 1, 0, "C")
+        pdf.cell(70, 8, "Sub-item", 1, 0, "C")
+        pdf.cell(30, 8, "Puntaje (0-5)", 1, 1, "C")
+        for nombre_pregunta, sub_items in estructura:
+            pdf.set_font("Arial", "B", 9)
+            pdf.cell(90, 8, nombre_pregunta, 1, 0, "L")
+            celda(pdf, ("promedio_texto", nombre_pregunta), 70, 8, 1, 0)
+            celda(pdf, ("promedio", nombre_pregunta), 30, 8, 1, 1)
+            pdf.set_font("Arial", "", 9)
+            for sub_item in sub_items:
+                pdf.cell(90, 6, "", 'L', 0)
+                pdf.cell(70, 6, f"- {sub_item}", 'LR', 0, "L")
+                celda(pdf, ("sub_item", nombre_pregunta, sub_item), 30, 6, 'R', 1)
+        pdf.ln(10)
+    return dibujar
+
+
+def estructura_rubrica(rubrica):
+    # Una Rubrica compilada ya trae su estructura; las listas de dicts (reportes
+    # guardados) se convierten aquí.
+    if hasattr(rubrica, "estructura"):
+        return rubrica.estructura
+    return tuple((p['pregunta'], tuple(p['sub_items'])) for p in rubrica)
+
+
+@functools.lru_cache(maxsize=32)
+def plantilla_rubrica(estructura, unicode=False):
+    return PlantillaPDF(_tabla_rubrica(estructura), Y_TABLA_RUBRICA, unicode)
+
+
+def _valores_rubrica(datos_reporte, estructura):
+    valores = {}
+    for nombre_pregunta, sub_items in estructura:
+        # Usar el promedio guardado para el color
+        promedio_pregunta = datos_reporte['promedios_por_pregunta'][nombre_pregunta]
+        valores[("promedio_texto", nombre_pregunta)] = (f"Promedio: {promedio_pregunta:.2f}", COLOR_NEGRO)
+        valores[("promedio", nombre_pregunta)] = (f"{promedio_pregunta:.2f}", color_puntaje_0_5(promedio_pregunta))
+        for sub_item in sub_items:
+            puntaje_sub_item = datos_reporte['calificaciones'][nombre_pregunta][sub_item]
+            valores[("sub_item", nombre_pregunta, sub_item)] = (f"{puntaje_sub_item:.2f}", COLOR_NEGRO)
+    return valores
+
+
+def generar_reporte_dinamico_pdf(datos_reporte, usar_plantilla=True):
+    datos_reporte, unicode = preparar_textos(datos_reporte)
+    pdf = _nuevo_pdf(unicode)
+    pdf.set_font("Arial", "B", 16)
+    pdf.cell(0, 10, "Reporte de Calificación", 0, 1, "C")
+    pdf.ln(5)
+    pdf.set_font("Arial", "", 12)
+    pdf.multi_cell(0, 8, f"Estudiante(s): {datos_reporte['nombres']}", 0, 1)
+    pdf.cell(0, 8, f"Fecha: {datos_reporte.get('fecha') or datetime.date.today().strftime('%Y-%m-%d')}", 0, 1)
+    pdf.ln(10)
+
+    estructura = estructura_rubrica(datos_reporte['rubrica'])
+    _tabla(pdf, plantilla_rubrica(estructura, unicode), _tabla_rubrica(estructura), _valores_rubrica(datos_reporte, estructura), usar_plantilla)
+
+    pdf.set_font("Arial", "B", 12)
+    pdf.cell(0, 10, "Comentarios de Retroalimentación", 0, 1)
+    pdf.set_font("Arial", "", 10)
+    comentarios_opcionales_ingresados = False
+    for pregunta, comentario in datos_reporte.get('optional_comments', {}).items():
+        if comentario.strip():
+            pdf.set_font("Arial", "B", 10)
+            pdf.multi_cell(0, 6, f"- Sobre '{pregunta}':")
+            pdf.set_font("Arial", "I", 10)
+            pdf.multi_cell(0, 6, f'"{comentario}"')
+            comentarios_opcionales_ingresados = True
+    pdf.ln(5)
+    pdf.set_font("Arial", "B", 12)
+    pdf.cell(0, 10, "Comentario Final", 0, 1)
+    pdf.set_font("Arial", "", 10)
+    pdf.multi_cell(0, 6, datos_reporte.get('final_comment', ''))
+    pdf.ln(10)
+    pdf.set_font("Arial", "B", 14)
+    pdf.cell(0, 12, f"Calificación Final: {datos_reporte['calificacion_final']:.2f} / 5.0", 0, 1, "R")
+    if datos_reporte.get('firmar', False):
+        pdf.set_y(-40)
+        pdf.set_font("Arial", "", 10)
+        pdf.cell(80, 8, "_" * 35, 0, 1, "C")
+        pdf.cell(80, 8, "Firma del Docente", 0, 1, "C")
+    return pdf.output(dest='S').encode('latin-1')
+
+
+# --- Reportes en lote ---
+
+GENERADORES = {
+    "vigas": generar_pdf,
+    "rubrica": generar_reporte_dinamico_pdf,
+}
+
+# Con pocos reportes no compensa arrancar procesos (con "spawn" cada uno
+# reimporta fpdf y este módulo: ~0.6 s).
+MINIMO_PARA_PROCESOS = 32
+
+
+def nombre_archivo_reporte(nombres, tarea=""):
+    base = re.sub(r"[^\w.-]+", "_", f"{tarea} {nombres}".replace(",", "")).strip("_")
+    return f"calificacion_{base or 'grupo'}.pdf"
+
+
+def _renderizar(tipo, datos):
+    return GENERADORES[tipo](datos)
+
+
+def generar_lote_zip(trabajos, destino=None, procesos=None, progreso=None):
+    """Renderiza varios reportes en paralelo y los escribe en un único ZIP.
+
+    `trabajos` es una lista de (nombre_archivo, tipo, datos) con `tipo` en
+    GENERADORES. Cada PDF se agrega al ZIP en cuanto termina; `progreso`, si
+    se da, recibe (hechos, total, reportes_por_segundo). Devuelve los bytes del
+    ZIP (o nada si se dio `destino`) y un resumen con tiempos.
+    """
+    salida = destino if destino is not None else io.BytesIO()
+    total = len(trabajos)
+    procesos = procesos or os.cpu_count() or 1
+    inicio = time.perf_counter()
+    usados = set()
+
+    def nombre_unico(nombre):
+        base, ext = os.path.splitext(nombre)
+        candidato, n = nombre, 1
+        while candidato in usados:
+            n += 1
+            candidato = f"{base}_{n}{ext}"
+        usados.add(candidato)
+        return candidato
+
+    # Los PDF de FPDF ya van comprimidos; el ZIP solo los empaqueta.
+    with zipfile.ZipFile(salida, "w", compression=zipfile.ZIP_STORED) as zf:
+        def agregar(hechos, nombre, pdf_bytes):
+            zf.writestr(nombre_unico(nombre), pdf_bytes)
+            if progreso:
+                transcurrido = time.perf_counter() - inicio
+                progreso(hechos, total, hechos / transcurrido if transcurrido > 0 else 0.0)
+
+        if procesos == 1 or total < MINIMO_PARA_PROCESOS:
+            for hechos, (nombre, tipo, datos) in enumerate(trabajos, start=1):
+                agregar(hechos, nombre, _renderizar(tipo, datos))
+        else:
+            # "spawn": bajo Streamlit el proceso tiene hilos (escritor, sesiones) y un
+            # fork copiaría sus candados tomados.
+            contexto = multiprocessing.get_context("spawn")
+            with concurrent.futures.ProcessPoolExecutor(max_workers=procesos, mp_context=contexto) as ejecutor:
+                futuros = {ejecutor.submit(_renderizar, tipo, datos): nombre for nombre, tipo, datos in trabajos}
+                for hechos, futuro in enumerate(concurrent.futures.as_completed(futuros), start=1):
+                    agregar(hechos, futuros[futuro], futuro.result())
+
+    segundos = time.perf_counter() - inicio
+    resumen = {"reportes": total, "segundos": segundos,
+               "reportes_por_segundo": total / segundos if segundos > 0 else 0.0}
+    if destino is None:
+        return salida.getvalue(), resumen
+    return None, resumen
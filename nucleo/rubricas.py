@@ -0,0 +1,119 @@
+import hashlib
+import io
+import json
+
+import numpy as np
+
+from nucleo.lista_curso import huella
+from nucleo.puntuacion import MotorPuntuacion
+
+# --- Rúbricas ---
+
+
+class Rubrica:
+    """Rúbrica compilada: se valida e indexa una sola vez.
+
+    El formulario recorre `estructura` (enunciado, sub-items), la puntuación usa
+    `motor` y el reporte PDF usa `estructura` como clave de su plantilla. Para
+    guardarla en JSON se usa `como_lista()`, el formato de siempre; junto a los
+    puntajes crudos se guarda `definicion()`, identificada por `version`.
+    """
+    __slots__ = ("preguntas", "sub_items", "mascara", "sobre", "pesos", "huella",
+                 "estructura", "motor", "_lista", "_version")
+
+    def __init__(self, preguntas, sub_items, mascara, sobre, pesos, huella=None):
+        self.preguntas, self.sub_items = tuple(preguntas), tuple(sub_items)
+        if not self.preguntas:
+            raise ValueError("La rúbrica no tiene enunciados.")
+        if len(set(self.preguntas)) != len(self.preguntas):
+            raise ValueError("La rúbrica tiene enunciados repetidos.")
+        self.mascara = np.asarray(mascara, dtype=bool)
+        self.sobre = np.asarray(sobre, dtype=float)
+        self.pesos = np.asarray(pesos, dtype=float)
+        if np.isnan(self.pesos).any() or (self.pesos < 0).any():
+            raise ValueError("Los pesos de la rúbrica deben ser números no negativos.")
+        self.huella = huella
+        # El motor valida la forma de la máscara.
+        self.motor = MotorPuntuacion(self.preguntas, self.sub_items, self.mascara, pesos=self.pesos)
+        self.estructura = tuple((p, tuple(self.sub_items[j] for j in np.flatnonzero(fila)))
+                                for p, fila in zip(self.preguntas, self.mascara))
+        self._lista = None
+        self._version = None
+
+    def __len__(self):
+        return len(self.preguntas)
+
+    def como_lista(self):
+        """Lista de dicts con 'pregunta', 'sub_items', 'sobre' y 'peso'."""
+        if self._lista is None:
+            self._lista = [{'pregunta': p, 'sub_items': list(items), 'sobre': float(sobre), 'peso': float(peso)}
+                           for (p, items), sobre, peso in zip(self.estructura, self.sobre, self.pesos)]
+        return self._lista
+
+    def definicion(self):
+        """Dict JSON con la disposición exacta (enunciados, sub-items, máscara) y los pesos."""
+        return {'preguntas': list(self.preguntas), 'sub_items': list(self.sub_items),
+                'mascara': self.mascara.tolist(), 'sobre': self.sobre.tolist(), 'pesos': self.pesos.tolist()}
+
+    @property
+    def version(self):
+        """Identificador de esta versión de la rúbrica: SHA-1 (12 caracteres) de su definición."""
+        if self._version is None:
+            texto = json.dumps(self.definicion(), ensure_ascii=False, sort_keys=True)
+            self._version = hashlib.sha1(texto.encode('utf-8')).hexdigest()[:12]
+        return self._version
+
+    def tabla(self):
+        """DataFrame con el mismo formato del CSV exportado."""
+        import pandas as pd
+        df = pd.DataFrame(np.where(self.mascara, 'si', 'no'), columns=list(self.sub_items))
+        df.insert(0, 'Enunciado', self.preguntas)
+        df['sobre'], df['peso'] = self.sobre, self.pesos
+        return df
+
+    def a_csv(self):
+        """La rúbrica en el CSV separado por ';' que se puede volver a cargar."""
+        return self.tabla().to_csv(index=False, sep=';').encode('utf-8')
+
+    @classmethod
+    def desde_lista(cls, rubrica, sub_items=None):
+        """Compila una lista de dicts como la que arma el constructor de rúbricas."""
+        sub_items = list(dict.fromkeys(list(sub_items or []) + [s for p in rubrica for s in p['sub_items']]))
+        columna = {s: j for j, s in enumerate(sub_items)}
+        mascara = np.zeros((len(rubrica), len(sub_items)), dtype=bool)
+        for i, p in enumerate(rubrica):
+            mascara[i, [columna[s] for s in p['sub_items']]] = True
+        return cls([p['pregunta'] for p in rubrica], sub_items, mascara,
+                   [p['sobre'] for p in rubrica], [p['peso'] for p in rubrica])
+
+    @classmethod
+    def desde_definicion(cls, definicion):
+        return cls(definicion['preguntas'], definicion['sub_items'], definicion['mascara'],
+                   definicion['sobre'], definicion['pesos'])
+
+
+def compilar_rubrica(df, huella_rubrica=None):
+    """Compila el DataFrame de una rúbrica exportada: enunciado, una columna
+    'si'/'no' por sub-item, 'sobre' y 'peso'."""
+    if len(df.columns) < 3 or list(df.columns[-2:]) != ['sobre', 'peso']:
+        raise ValueError("La rúbrica debe tener las columnas: enunciado, sub-items..., 'sobre' y 'peso'.")
+    preguntas_col, sub_item_cols = df.columns[0], list(df.columns[1:-2])
+    marcas = df[sub_item_cols].fillna('').to_numpy(dtype=str)
+    mascara = np.char.lower(np.char.strip(marcas)) == 'si'
+    try:
+        sobre = df['sobre'].to_numpy(dtype=float)
+        pesos = df['peso'].to_numpy(dtype=float)
+    except ValueError as e:
+        raise ValueError("Las columnas 'sobre' y 'peso' deben ser numéricas.") from e
+    return Rubrica(df[preguntas_col].astype(str).tolist(), sub_item_cols, mascara, sobre, pesos, huella=huella_rubrica)
+
+
+def leer_rubrica(contenido):
+    """Compila el contenido (bytes) de una rúbrica en CSV separado por ';'."""
+    import pandas as pd
+    return compilar_rubrica(pd.read_csv(io.BytesIO(contenido), sep=';'), huella(contenido))
+
+
+def leer_rubrica_csv(ruta):
+    with open(ruta, 'rb') as f:
+        return leer_rubrica(f.read())
@@ -0,0 +1,31 @@
+import functools
+
+import numpy as np
+
+from nucleo.puntuacion import MotorPuntuacion
+
+# --- Definiciones del Taller de Vigas ---
+componentes_problemas = {
+    "C1: Diagrama de cuerpo libre": 25, "C2: Reacciones en los apoyos": 25,
+    "C3: Función de singularidad": 25, "C4: Función de carga cortante": 25,
+    "C5: Función de momento flector": 25, "C6: Diagrama de momento flector": 25,
+    "C7: Diagrama de fuerza cortante": 25,
+}
+componentes_adicionales = {
+    "C8: Deflexión en viga (Punto 2)": 5, "C9: Validación con Software (Punto 3)": 5
+}
+problemas = ["1.a", "1.b", "1.c", "1.d", "1.e"]
+MAX_SCORE = 185
+
+# Los componentes adicionales se califican una sola vez, en su propia fila.
+FILA_ADICIONALES = "Adicionales"
+
+
+@functools.lru_cache(maxsize=None)
+def motor_taller_vigas():
+    filas = problemas + [FILA_ADICIONALES]
+    columnas = list(componentes_problemas) + list(componentes_adicionales)
+    mascara = np.zeros((len(filas), len(columnas)), dtype=bool)
+    mascara[:len(problemas), :len(componentes_problemas)] = True
+    mascara[len(problemas), len(componentes_problemas):] = True
+    return MotorPuntuacion(filas, columnas, mascara, puntaje_maximo=MAX_SCORE)
@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# Las pruebas importan `nucleo` y `benchmarks` desde la raíz del repositorio,
+# se ejecute pytest desde donde se ejecute.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
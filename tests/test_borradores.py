@@ -0,0 +1,97 @@
+import io
+from pathlib import Path
+
+import pytest
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from nucleo.borradores import PARAMETRO_SESION, podar_borradores, ruta_borrador
+
+APP = str(Path(__file__).resolve().parent.parent / "calificador_app.py")
+LISTA = "NOMBRE COMPLETO\nANA PEREZ\nLUIS GOMEZ\n".encode("utf-8")
+
+
+class ArchivoSubido(io.BytesIO):
+    name, file_id = "lista.csv", "lista"
+
+
+@pytest.fixture
+def libro(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    ruta = str(tmp_path / "calificaciones_finales.csv")
+    monkeypatch.setenv("CALIFICADOR_LIBRO", ruta)
+    monkeypatch.setattr(st, "file_uploader", lambda *args, **kwargs: ArchivoSubido(LISTA))
+    return ruta
+
+
+def sesion(parametros=None):
+    app = AppTest.from_file(APP, default_timeout=60)
+    app.query_params.update(parametros or {})
+    return app.run()
+
+
+def calificar_sin_guardar(app):
+    app.selectbox[0].set_value("ANA PEREZ").run()
+    next(b for b in app.button if "Agregar Estudiante" in b.label).click().run()
+    app.text_area(key="comentario_final").input("Comentario privado").run()
+    return app
+
+
+def test_dos_sesiones_no_comparten_borrador(libro):
+    a = calificar_sin_guardar(sesion())
+    b = sesion()
+    assert a.query_params[PARAMETRO_SESION] != b.query_params[PARAMETRO_SESION]
+    assert b.session_state["current_group"] == []
+    assert not any("Se recuperó" in i.value for i in b.info)
+    assert b.text_area(key="comentario_final").value == ""
+
+
+def test_recargar_retoma_el_borrador_de_la_sesion(libro):
+    a = calificar_sin_guardar(sesion())
+    recarga = sesion({PARAMETRO_SESION: a.query_params[PARAMETRO_SESION]})
+    assert recarga.session_state["current_group"] == ["ANA PEREZ"]
+    assert recarga.session_state["comentario_final"] == "Comentario privado"
+    assert any("Se recuperó" in i.value for i in recarga.info)
+
+
+def test_reanudar_la_nota_subjetiva_no_duplica_su_valor(libro, monkeypatch):
+    from streamlit.elements.lib import policies
+    avisos = []
+    monkeypatch.setattr(policies, "_shown_default_value_warning", False)
+    monkeypatch.setattr(policies._LOGGER, "warning", lambda mensaje, *args, **kwargs: avisos.append(mensaje % args))
+    a = calificar_sin_guardar(sesion())
+    a.number_input(key="calificacion_subjetiva").set_value(4.2).run()
+    recarga = sesion({PARAMETRO_SESION: a.query_params[PARAMETRO_SESION]})
+    assert recarga.number_input(key="calificacion_subjetiva").value == 4.2
+    assert not [aviso for aviso in avisos if "default value" in aviso]
+    assert sesion().number_input(key="calificacion_subjetiva").value == 3.0
+
+
+def test_anotar_mientras_se_compacta_no_pierde_cambios(tmp_path):
+    import threading
+    from nucleo.borradores import Borrador
+    borrador = Borrador(str(tmp_path / "libro.borrador_vigas_0123456789ab.jsonl"))
+    hilos = [threading.Thread(target=lambda k=k: [borrador.anotar(f"campo_{k}", i) for i in range(300)])
+             for k in range(4)]
+    for hilo in hilos:
+        hilo.start()
+    while any(hilo.is_alive() for hilo in hilos):
+        borrador.compactar()
+    for hilo in hilos:
+        hilo.join()
+    assert borrador.compactar() == {f"campo_{k}": 299 for k in range(4)}
+
+
+def test_podar_borra_solo_los_borradores_viejos(tmp_path):
+    import os
+    import time
+    libro = str(tmp_path / "calificaciones_finales.csv")
+    viejo, reciente, propio, otra_app = (ruta_borrador(libro, app, sesion) for app, sesion in
+                                         [("vigas", "a" * 12), ("vigas", "b" * 12), ("vigas", "c" * 12), ("rubrica", "d" * 12)])
+    hace_un_mes = time.time() - 30 * 86400
+    for ruta in (viejo, reciente, propio, otra_app):
+        open(ruta, "w").close()
+        if ruta != reciente:
+            os.utime(ruta, (hace_un_mes, hace_un_mes))
+    assert podar_borradores(libro, "vigas", conservar=(propio,)) == 1
+    assert [os.path.exists(r) for r in (viejo, reciente, propio, otra_app)] == [False, True, True, True]
@@ -0,0 +1,63 @@
+import os
+
+import pytest
+
+from nucleo import libro_notas
+from nucleo.columnar import ruta_columnar
+from nucleo.libro_notas import LibroCSV
+
+pytest.importorskip("pyarrow")
+
+
+def libro_con_diario(tmp_path):
+    """Libro con notas consolidadas en el CSV y otras pendientes en el diario."""
+    libro = LibroCSV(str(tmp_path / "calificaciones_finales.csv"))
+    libro.guardar(["Ana", "Luis"], 3.0, tarea="Taller 1", fecha="2025-09-01")
+    libro.guardar(["Eva"], 4.5, 4.0, tarea="Taller 2", fecha="2025-09-08")
+    libro.compactar()
+    libro.guardar(["Ana"], 5.0, tarea="Taller 2", fecha="2025-09-15")
+    return libro
+
+
+def filas(df):
+    return sorted(tuple(str(v) for v in fila) for fila in df.itertuples(index=False))
+
+
+@pytest.mark.parametrize("filtros, esperadas", [
+    ({"estudiante": "Ana"}, [("Ana", "3.0", "Taller 1"), ("Ana", "5.0", "Taller 2")]),
+    ({"estudiante": ["Luis", "Eva"]}, [("Eva", "4.5", "Taller 2"), ("Luis", "3.0", "Taller 1")]),
+    ({"tarea": "Taller 2"}, [("Ana", "5.0", "Taller 2"), ("Eva", "4.5", "Taller 2")]),
+    ({"desde": "2025-09-02", "hasta": "2025-09-10"}, [("Eva", "4.5", "Taller 2")]),
+    ({"tarea": "Taller 3"}, []),
+])
+def test_consultar_filtra_la_instantanea_y_el_diario(tmp_path, filtros, esperadas):
+    libro = libro_con_diario(tmp_path)
+    df = libro.consultar(columnas=["Estudiante", "Calificacion Final", "Tarea"], **filtros)
+    assert list(df.columns) == ["Estudiante", "Calificacion Final", "Tarea"]
+    assert filas(df) == esperadas
+    assert os.path.exists(ruta_columnar(libro.ruta))
+
+
+def test_consultar_da_lo_mismo_con_y_sin_parquet(tmp_path, monkeypatch):
+    libro = libro_con_diario(tmp_path)
+    con_parquet = libro.consultar(desde="2025-09-02")
+    assert str(con_parquet["Fecha"].dtype).startswith("datetime64")
+    assert con_parquet["Calificacion Final"].dtype == "float64"
+    monkeypatch.setattr(libro_notas, "hay_pyarrow", lambda: False)
+    sin_parquet = libro.consultar(desde="2025-09-02")
+    assert filas(con_parquet) == filas(sin_parquet[con_parquet.columns])
+
+
+def test_consultar_rehace_la_instantanea_si_el_csv_cambio(tmp_path):
+    libro = libro_con_diario(tmp_path)
+    libro.consultar()
+    with open(libro.ruta, encoding="utf-8") as f:
+        encabezado = f.readline().strip().split(",")
+    # Una fila agregada a mano al CSV, que queda más reciente que el Parquet.
+    fila = {"Estudiante": "Luis", "Calificacion Final": "2.0", "Fecha": "2025-09-15", "Tarea": "Taller 2"}
+    with open(libro.ruta, "a", encoding="utf-8") as f:
+        f.write(",".join(fila.get(c, "") for c in encabezado) + "\n")
+    marca = os.stat(ruta_columnar(libro.ruta)).st_mtime_ns + 10**9
+    os.utime(libro.ruta, ns=(marca, marca))
+    assert filas(libro.consultar(columnas=["Estudiante", "Tarea"], tarea="Taller 2")) == \
+        [("Ana", "Taller 2"), ("Eva", "Taller 2"), ("Luis", "Taller 2")]
@@ -0,0 +1,71 @@
+import threading
+
+import pytest
+
+import nucleo.escritor
+from nucleo.escritor import EscritorLibro
+
+
+class LibroFalso:
+    columna_nota = "Calificacion Final"
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.llamadas = []
+        self.en_espera, self.seguir = threading.Event(), threading.Event()
+
+    def esperar(self):
+        self.en_espera.set()
+        self.seguir.wait(5)
+
+    def guardar_lote(self, grupos, tarea="", fecha=None):
+        self.llamadas.append(("guardar_lote", tarea, [estudiantes for estudiantes, _, _ in grupos]))
+
+    def guardar_reporte(self, grupo):
+        self.llamadas.append(("guardar_reporte", grupo))
+
+
+@pytest.fixture
+def libro(tmp_path):
+    libro = LibroFalso(str(tmp_path / "libro.csv"))
+    yield libro
+    libro.seguir.set()
+
+
+def test_lote_se_ejecuta_en_el_orden_de_la_cola(libro):
+    escritor = EscritorLibro(libro)
+    # Mientras el hilo espera, lo demás se acumula en un mismo lote.
+    escritor.ejecutar("esperar")
+    libro.en_espera.wait(5)
+    futuros = [escritor.guardar(["ANA"], 4.0, tarea="T1"),
+               escritor.guardar(["LUIS"], 3.0, tarea="T1"),
+               escritor.ejecutar("guardar_reporte", "ANA"),
+               escritor.guardar(["ANA"], 5.0, tarea="T1")]
+    libro.seguir.set()
+    for futuro in futuros:
+        futuro.result(5)
+    escritor.cerrar()
+    assert libro.llamadas == [("guardar_lote", "T1", [["ANA"], ["LUIS"]]),
+                              ("guardar_reporte", "ANA"),
+                              ("guardar_lote", "T1", [["ANA"]])]
+
+
+def test_fallo_del_bloqueo_no_detiene_el_hilo(libro, monkeypatch):
+    bloqueo = nucleo.escritor.bloqueo_libro
+
+    def bloqueo_que_falla(ruta):
+        monkeypatch.setattr(nucleo.escritor, "bloqueo_libro", bloqueo)
+        raise OSError("disco lleno")
+
+    escritor = EscritorLibro(libro)
+    escritor.ejecutar("esperar")
+    libro.en_espera.wait(5)
+    monkeypatch.setattr(nucleo.escritor, "bloqueo_libro", bloqueo_que_falla)
+    fallidos = [escritor.guardar(["ANA"], 4.0), escritor.ejecutar("guardar_reporte", "ANA")]
+    libro.seguir.set()
+    for futuro in fallidos:
+        with pytest.raises(OSError):
+            futuro.result(5)
+    escritor.guardar(["LUIS"], 3.0).result(5)
+    escritor.cerrar()
+    assert libro.llamadas == [("guardar_lote", "", [["LUIS"]])]
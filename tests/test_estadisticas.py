@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+
+from nucleo.libro_notas import abrir_libro
+
+
+@pytest.mark.parametrize("archivo", ["libro.csv", "libro.db"])
+def test_recalificar_reemplaza_la_entrega_anterior(tmp_path, archivo):
+    libro = abrir_libro(str(tmp_path / archivo))
+    libro.guardar_puntajes(["ANA PEREZ", "LUIS GOMEZ"], [1.0, 2.0], 2.0, tarea="Taller 1")
+    libro.guardar_puntajes(["ANA PEREZ"], [3.0, 4.0], 4.0, tarea="Taller 1")
+    libro.guardar_puntajes(["ANA PEREZ"], [5.0, 0.0], 3.0, tarea="Taller 2")
+
+    for _ in range(2):
+        e = libro.estadisticas()["Taller 1"]
+        assert e.nota.n == 2
+        assert e.nota.media == pytest.approx(3.0)
+        np.testing.assert_allclose(e.puntajes.media, [2.0, 3.0])
+        assert libro.estadisticas()["Taller 2"].nota.n == 1
+        # Tras consolidar, un nuevo recálculo sigue restando el guardado vigente.
+        libro.compactar()
+    libro.guardar_puntajes(["LUIS GOMEZ"], [3.0, 4.0], 4.0, tarea="Taller 1")
+    e = libro.estadisticas()["Taller 1"]
+    assert e.nota.n == 2 and e.nota.media == pytest.approx(4.0)
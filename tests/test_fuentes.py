@@ -0,0 +1,58 @@
+import random
+import statistics
+import time
+import unicodedata
+
+import pytest
+
+from benchmarks.datos_sinteticos import datos_rubrica, datos_vigas, rubrica_sintetica
+from nucleo import fuentes
+from nucleo.reportes import generar_pdf, generar_reporte_dinamico_pdf
+from nucleo.rubricas import Rubrica
+
+
+def datos_con_rubrica_nfd(texto_extra=""):
+    # Nombres de enunciado con tildes descompuestas (NFD), como los deja un CSV exportado en macOS.
+    pregunta = unicodedata.normalize("NFD", "Pregunta Análisis")
+    rubrica = Rubrica.desde_lista([{"pregunta": pregunta, "sub_items": ["Planteamiento", "Cálculo"],
+                                    "sobre": 5.0, "peso": 1.0}])
+    return {"nombres": "ANA PÉREZ" + texto_extra, "calificacion_final": 4.0, "rubrica": rubrica,
+            "calificaciones": {pregunta: {"Planteamiento": 4.0, "Cálculo": 4.0}}, "firmar": False,
+            "optional_comments": {pregunta: "Bien"}, "final_comment": "Buen trabajo",
+            "promedios_por_pregunta": {pregunta: 4.0}, "fecha": "2025-09-17"}
+
+
+def test_reporte_con_rubrica_nfd():
+    assert generar_reporte_dinamico_pdf(datos_con_rubrica_nfd()).startswith(b"%PDF")
+
+
+def test_reporte_con_rubrica_nfd_sin_fuente_unicode(monkeypatch):
+    monkeypatch.setattr(fuentes, "archivos_unicode", lambda: None)
+    assert generar_reporte_dinamico_pdf(datos_con_rubrica_nfd(" “ŁUKASZ”")).startswith(b"%PDF")
+
+
+@pytest.mark.skipif(fuentes.archivos_unicode() is None, reason="sin fuente TrueType instalada")
+def test_reporte_con_rubrica_nfd_y_fuente_unicode():
+    assert generar_reporte_dinamico_pdf(datos_con_rubrica_nfd(" “ŁUKASZ”")).startswith(b"%PDF")
+
+
+def mediana_ms(generar, datos, repeticiones=15):
+    generar(datos)
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        generar(datos)
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos) * 1000
+
+
+@pytest.mark.skipif(fuentes.archivos_unicode() is None, reason="sin fuente TrueType instalada")
+@pytest.mark.parametrize("generar", [generar_pdf, generar_reporte_dinamico_pdf])
+def test_reporte_unicode_cuesta_poco_mas_que_latin1(generar):
+    rng = random.Random(0)
+    latino = datos_vigas(0, rng) if generar is generar_pdf else datos_rubrica(0, rubrica_sintetica(4, 3), rng)
+    unicode = dict(latino, nombres=latino["nombres"] + " “ŁUKASZ”")
+    assert fuentes.preparar_textos(unicode)[1] and not fuentes.preparar_textos(latino)[1]
+    # Se incrusta un estilo con los glifos de una celda, no la fuente entera.
+    assert len(generar(unicode)) < len(generar(latino)) + 16 * 1024
+    assert mediana_ms(generar, unicode) < mediana_ms(generar, latino) + 30
@@ -0,0 +1,55 @@
+import io
+import os
+
+from nucleo.fusion_notas import CacheFusion, unir_archivos
+
+LIBRO = ("Estudiante,Calificacion Final,Fecha,Tarea\n"
+         "Ana Pérez,3.0,2025-09-01,Taller 1\n"
+         "Luis Gómez,4.0,2025-09-01,Taller 1\n"
+         "ana perez,4.5,2025-09-08,Taller 2\n"
+         "Ana Pérez,3.5,2025-09-02,Taller 1\n").encode("utf-8")
+
+
+def test_cada_tarea_da_su_propia_columna():
+    unido = unir_archivos([("Nota Final", io.BytesIO(LIBRO))]).set_index("Estudiante")
+    assert list(unido.columns) == ["Nota Final · Taller 1", "Nota Final · Taller 2"]
+    assert unido.loc["Ana Pérez"].tolist() == [3.5, 4.5]
+    assert unido.loc["Luis Gómez", "Nota Final · Taller 1"] == 4.0
+
+
+def test_archivo_sin_tarea_conserva_su_columna():
+    otro = io.BytesIO("Estudiante,Calificacion Final\nANA PEREZ,5\n".encode("utf-8"))
+    unido = unir_archivos([("Nota Final", io.BytesIO(LIBRO)), ("Nota Extra", otro)])
+    assert list(unido.columns) == ["Estudiante", "Nota Final · Taller 1", "Nota Final · Taller 2", "Nota Extra"]
+    assert unido.set_index("Estudiante").loc["Ana Pérez", "Nota Extra"] == 5.0
+
+
+def test_cache_relee_la_ruta_solo_si_cambia_su_fecha_o_tamano(tmp_path):
+    ruta = tmp_path / "taller.csv"
+    ruta.write_bytes(LIBRO)
+    cache = CacheFusion()
+    primera = cache.leer(str(ruta))
+    assert cache.leer(str(ruta)) is primera
+    assert (cache.aciertos, cache.fallos) == (1, 1)
+
+    # Mismo tamaño, otra fecha: se vuelve a abrir y el contenido nuevo se lee.
+    ruta.write_bytes(LIBRO.replace(b"4.0", b"2.0"))
+    marca = os.stat(ruta).st_mtime_ns + 10**9
+    os.utime(ruta, ns=(marca, marca))
+    segunda = cache.leer(str(ruta))
+    assert segunda[2].at["luis gomez", ("Calificacion Final", "Taller 1")] == 2.0
+    assert cache.fallos == 2
+
+    # Misma fecha, otro tamaño.
+    ruta.write_bytes(LIBRO + "Eva Ruiz,5.0,2025-09-01,Taller 1\n".encode("utf-8"))
+    os.utime(ruta, ns=(marca, marca))
+    assert "eva ruiz" in cache.leer(str(ruta))[1].index
+    assert cache.fallos == 3
+
+
+def test_cache_reconoce_el_mismo_contenido_en_otra_ruta(tmp_path):
+    cache = CacheFusion()
+    for nombre in ("a.csv", "b.csv"):
+        (tmp_path / nombre).write_bytes(LIBRO)
+    assert cache.leer(str(tmp_path / "b.csv")) is cache.leer(str(tmp_path / "a.csv"))
+    assert (cache.aciertos, cache.fallos) == (1, 1)
@@ -0,0 +1,42 @@
+import sqlite3
+
+from nucleo import libro_sqlite
+from nucleo.libro_sqlite import LibroSQLite
+
+
+def test_recalificar_actualiza_la_fila_en_lugar_de_duplicarla(tmp_path):
+    libro = LibroSQLite(str(tmp_path / "notas.db"))
+    libro.guardar(["Ana", "Luis"], 3.0, 2.5, tarea="Taller 1", fecha="2025-09-01")
+    libro.guardar(["Ana"], 4.25, None, tarea="Taller 1", fecha="2025-09-08")
+    libro.guardar(["Ana"], 5.0, None, tarea="Taller 2", fecha="2025-09-08")
+    df = libro.leer()
+    assert len(df) == 3
+    ana = df[(df["Estudiante"] == "Ana") & (df["Tarea"] == "Taller 1")].iloc[0]
+    assert (ana["Calificacion Final"], ana["Fecha"]) == (4.25, "2025-09-08")
+    assert ana["Calificacion Subjetiva"] != ana["Calificacion Subjetiva"]  # NaN: la nueva no trae subjetiva
+
+
+def test_guardar_dos_veces_lo_mismo_no_cambia_el_libro(tmp_path):
+    libro = LibroSQLite(str(tmp_path / "notas.db"))
+    grupos = [(["Ana", "Luis"], 3.0, None), (["Eva"], 4.0, 4.5)]
+    libro.guardar_lote(grupos, tarea="Taller 1", fecha="2025-09-01")
+    antes = libro.leer()
+    libro.guardar_lote(grupos, tarea="Taller 1", fecha="2025-09-01")
+    assert libro.leer().equals(antes)
+
+
+def test_el_esquema_se_aplica_una_vez_por_archivo(tmp_path, monkeypatch):
+    ruta = str(tmp_path / "notas.db")
+    LibroSQLite(ruta)
+    sentencias = []
+    conectar = sqlite3.connect
+
+    def conectar_y_anotar(*args, **kwargs):
+        con = conectar(*args, **kwargs)
+        con.set_trace_callback(sentencias.append)
+        return con
+
+    monkeypatch.setattr(libro_sqlite.sqlite3, "connect", conectar_y_anotar)
+    LibroSQLite(ruta).guardar(["Ana"], 3.0, tarea="Taller 1")
+    assert not any("journal_mode" in s or "CREATE" in s for s in sentencias)
+    assert sentencias
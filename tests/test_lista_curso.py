@@ -0,0 +1,56 @@
+import pytest
+
+from nucleo.lista_curso import COLUMNA_NOMBRE, IndiceLista, leer_indice
+
+NOMBRES = ["JESÚS ANTONIO ACUÑA BLANCO", "María José Peña Ortiz", "JOSE MARIA PENA", "Ana Lucía Gómez"]
+CODIGOS = ["2021001", "2021002", "2021003", ""]
+
+
+def indice():
+    return IndiceLista(NOMBRES, CODIGOS)
+
+
+def test_buscar_ignora_tildes_y_mayusculas():
+    assert indice().buscar("acuna") == ["JESÚS ANTONIO ACUÑA BLANCO"]
+    assert indice().buscar("LUCÍA gom") == ["Ana Lucía Gómez"]
+    # Los dos coinciden: primero el que empieza por la consulta completa.
+    assert indice().buscar("jose maria") == ["JOSE MARIA PENA", "María José Peña Ortiz"]
+
+
+def test_buscar_por_codigo_y_con_errores_de_digitacion():
+    assert indice().buscar("2021002") == ["María José Peña Ortiz"]
+    assert indice().buscar("acunna blanco") == ["JESÚS ANTONIO ACUÑA BLANCO"]
+
+
+def test_buscar_nombres_desconocidos_no_devuelve_nada():
+    assert indice().buscar("Zoe Xiomara") == []
+    assert indice().buscar("   ") == []
+
+
+def test_resolver_separa_encontrados_ambiguos_y_desconocidos():
+    encontrados, sin_resolver = indice().resolver("jesus acuna\n2021002; ana lucia gomez, Pena\nZoe Xiomara\n\n")
+    assert encontrados == ["JESÚS ANTONIO ACUÑA BLANCO", "María José Peña Ortiz", "Ana Lucía Gómez"]
+    # "Pena" coincide con dos estudiantes; "Zoe Xiomara" con ninguno.
+    assert sin_resolver == ["Pena", "Zoe Xiomara"]
+
+
+def test_resolver_no_repite_estudiantes():
+    encontrados, sin_resolver = indice().resolver("JOSE MARIA PENA\njosé maría peña\n2021003")
+    assert (encontrados, sin_resolver) == (["JOSE MARIA PENA"], [])
+
+
+def test_leer_indice_deduce_cp1252_y_punto_y_coma():
+    contenido = ("Código;Primer_Apellido;Segundo Apellido;Nombres;Programa\n"
+                 "2021001;Acuña;Blanco;Jesús Antonio;Ingeniería Civil\n"
+                 "2021002;Peña;Ortiz;María José;Ingeniería Civil\n"
+                 "2021001;Acuña;Blanco;Jesús Antonio;Ingeniería Civil\n").encode("cp1252")
+    indice = leer_indice(contenido, filas_por_bloque=2)
+    assert indice.nombres == ("Jesús Antonio Acuña Blanco", "María José Peña Ortiz")
+    assert indice.buscar("2021002") == ["María José Peña Ortiz"]
+    assert {k: indice.importacion[k] for k in ("codificacion", "separador", "filas", "duplicados")} == \
+        {"codificacion": "cp1252", "separador": ";", "filas": 3, "duplicados": 1}
+
+
+def test_leer_indice_sin_columna_de_nombres():
+    with pytest.raises(KeyError, match=COLUMNA_NOMBRE):
+        leer_indice("Código;Programa\n2021001;Civil\n".encode("cp1252"))
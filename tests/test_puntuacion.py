@@ -0,0 +1,77 @@
+import random
+
+import numpy as np
+import pytest
+
+from benchmarks.datos_sinteticos import rubrica_sintetica
+from nucleo.rubricas import Rubrica
+from nucleo.taller_vigas import (FILA_ADICIONALES, MAX_SCORE, componentes_adicionales, componentes_problemas,
+                                 motor_taller_vigas, problemas)
+
+
+def calificaciones_vigas(rng):
+    """Puntajes sueltos como los guardaba la app antes del motor: "<problema>_<componente>_score"."""
+    calificaciones = {f"{prob}_{comp}_score": rng.uniform(0, maximo)
+                      for prob in problemas for comp, maximo in componentes_problemas.items()}
+    calificaciones.update({f"{comp}_score": rng.uniform(0, maximo) for comp, maximo in componentes_adicionales.items()})
+    return calificaciones
+
+
+def vigas_con_bucles(calificaciones):
+    """El cálculo anterior, componente por componente."""
+    total_score = sum(calificaciones.values())
+    totales = {comp: sum(calificaciones[f"{prob}_{comp}_score"] for prob in problemas) for comp in componentes_problemas}
+    totales.update({comp: calificaciones[f"{comp}_score"] for comp in componentes_adicionales})
+    return (5 * total_score / MAX_SCORE) if MAX_SCORE > 0 else 0, total_score, totales
+
+
+def puntajes_vigas(calificaciones):
+    motor = motor_taller_vigas()
+    puntajes = motor.vacio()
+    for prob in problemas:
+        for comp in componentes_problemas:
+            puntajes[motor.fila[prob], motor.columna[comp]] = calificaciones[f"{prob}_{comp}_score"]
+    for comp in componentes_adicionales:
+        puntajes[motor.fila[FILA_ADICIONALES], motor.columna[comp]] = calificaciones[f"{comp}_score"]
+    return puntajes
+
+
+@pytest.mark.parametrize("semilla", range(5))
+def test_motor_vigas_coincide_con_los_bucles_por_componente(semilla):
+    calificaciones = calificaciones_vigas(random.Random(semilla))
+    nota, total, totales = vigas_con_bucles(calificaciones)
+    resultado = motor_taller_vigas().puntuar(puntajes_vigas(calificaciones))
+    assert resultado.nota_final == pytest.approx(nota)
+    assert resultado.puntaje_total == pytest.approx(total)
+    assert resultado.totales_competencia == pytest.approx([totales[c] for c in motor_taller_vigas().sub_items])
+
+
+def test_motor_vigas_puntua_un_lote_como_grupo_por_grupo():
+    lote = np.stack([puntajes_vigas(calificaciones_vigas(random.Random(s))) for s in range(8)])
+    motor = motor_taller_vigas()
+    resultado = motor.puntuar(lote)
+    assert resultado.nota_final == pytest.approx([motor.puntuar(x).nota_final for x in lote])
+
+
+def test_motor_rubrica_coincide_con_el_promedio_ponderado_por_pregunta():
+    rng = random.Random(0)
+    lista = rubrica_sintetica(4, 3)
+    lista[1]['sub_items'] = lista[1]['sub_items'][:1]
+    lista[2]['sub_items'] = []
+    for pregunta, peso in zip(lista, [1.0, 2.0, 0.5, 3.0]):
+        pregunta['peso'] = peso
+    calificaciones = {p['pregunta']: {s: rng.choice([0.0, 2.5, 3.5, 5.0]) for s in p['sub_items']} for p in lista}
+    # El cálculo anterior, pregunta por pregunta.
+    promedios = {p: (sum(v.values()) / len(v) if v else 0) for p, v in calificaciones.items()}
+    total_peso = sum(p['peso'] for p in lista)
+    nota = sum(promedios[p['pregunta']] * p['peso'] for p in lista) / total_peso
+
+    rubrica = Rubrica.desde_lista(lista)
+    motor = rubrica.motor
+    puntajes = motor.vacio()
+    for pregunta, valores in calificaciones.items():
+        for sub_item, valor in valores.items():
+            puntajes[motor.fila[pregunta], motor.columna[sub_item]] = valor
+    resultado = motor.puntuar(puntajes)
+    assert resultado.nota_final == pytest.approx(nota)
+    assert resultado.promedios == pytest.approx([promedios[p] for p in motor.preguntas])
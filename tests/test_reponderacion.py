@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from nucleo.libro_notas import abrir_libro
+from nucleo.rubricas import Rubrica
+
+
+def rubrica(pesos, sub_items=("Planteamiento", "Resultado")):
+    return Rubrica.desde_lista([{'pregunta': f"Punto {k + 1}", 'sub_items': list(sub_items), 'sobre': 5.0, 'peso': peso}
+                                for k, peso in enumerate(pesos)])
+
+
+def calificar(libro, rubrica, estudiantes, puntajes, tarea="Parcial 1"):
+    puntajes = np.asarray(puntajes, dtype=float)
+    nota = float(rubrica.motor.puntuar(puntajes).nota_final)
+    libro.guardar(estudiantes, nota, tarea=tarea, fecha="2025-09-01")
+    libro.guardar_puntajes_rubrica(rubrica, [(estudiantes, puntajes, nota)], tarea=tarea, fecha="2025-09-01")
+    return nota
+
+
+@pytest.mark.parametrize("extension", [".csv", ".db"])
+def test_reponderar_da_las_mismas_notas_y_cuentas_en_ambos_libros(tmp_path, extension):
+    libro = abrir_libro(str(tmp_path / f"notas{extension}"))
+    original, otra = rubrica([1.0, 1.0]), rubrica([1.0, 1.0], sub_items=("Otro",))
+    calificar(libro, original, ["Ana"], [[5.0, 5.0], [0.0, 0.0]])
+    # Luis y Eva se recalificaron: en el CSV tienen dos registros, pero cuentan una vez.
+    calificar(libro, original, ["Luis"], [[0.0, 0.0], [0.0, 0.0]])
+    calificar(libro, original, ["Luis"], [[2.0, 2.0], [2.0, 2.0]])
+    calificar(libro, otra, ["Eva"], [[4.0], [4.0]])
+    calificar(libro, otra, ["Eva"], [[5.0], [5.0]])
+    calificar(libro, original, ["Ana"], [[0.0, 0.0], [0.0, 0.0]], tarea="Parcial 2")
+
+    resultado = libro.reponderar(rubrica([3.0, 1.0]), tarea="Parcial 1")
+
+    assert (resultado.recalculadas, resultado.omitidas) == (2, 1)
+    assert resultado.cambios.to_dict("records") == [
+        {"Estudiante": "Ana", "Tarea": "Parcial 1", "Nota anterior": 2.5, "Nota nueva": 3.75, "Diferencia": 1.25}]
+    ultimas = libro.leer().groupby(["Estudiante", "Tarea"])["Calificacion Final"].last().to_dict()
+    assert ultimas == {("Ana", "Parcial 1"): 3.75, ("Luis", "Parcial 1"): 2.0,
+                       ("Eva", "Parcial 1"): 5.0, ("Ana", "Parcial 2"): 0.0}
+
+
+@pytest.mark.parametrize("extension", [".csv", ".db"])
+def test_reponderar_sin_cambiar_pesos_no_mueve_notas(tmp_path, extension):
+    libro = abrir_libro(str(tmp_path / f"notas{extension}"))
+    original = rubrica([1.0, 2.0])
+    calificar(libro, original, ["Ana", "Luis"], [[5.0, 3.0], [1.0, 0.0]])
+    resultado = libro.reponderar(rubrica([1.0, 2.0]), tarea="Parcial 1")
+    assert (resultado.recalculadas, resultado.omitidas, len(resultado.cambios)) == (2, 0, 0)
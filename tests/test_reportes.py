@@ -0,0 +1,35 @@
+import random
+import re
+import zlib
+
+import pytest
+
+from benchmarks.datos_sinteticos import datos_rubrica, datos_vigas, rubrica_sintetica
+from nucleo import fuentes
+from nucleo.reportes import generar_pdf, generar_reporte_dinamico_pdf
+
+
+def textos(pdf):
+    """Cada texto del PDF con su posición ("BT x y Td (texto) Tj ET"), en orden."""
+    contenido = b"".join(zlib.decompress(flujo) for flujo in re.findall(rb"stream\r?\n(.*?)\r?\nendstream", pdf, re.S)
+                         if flujo.startswith(b"x"))
+    return re.findall(rb"BT [\d.]+ [\d.]+ Td \((?:\\.|[^\\)])*\) Tj ET", contenido)
+
+
+def casos(unicode):
+    rng = random.Random(0)
+    extra = " “ŁUKASZ”" if unicode else ""
+    vigas = datos_vigas(0, rng)
+    vigas["nombres"] += extra
+    rubrica = datos_rubrica(0, rubrica_sintetica(4, 3), rng)
+    # Nombres en varias líneas: la tabla empieza más abajo que en la plantilla.
+    rubrica["nombres"] = ", ".join(f"ESTUDIANTE NÚMERO {k}" for k in range(12)) + extra
+    return [(generar_pdf, vigas), (generar_reporte_dinamico_pdf, rubrica)]
+
+
+@pytest.mark.parametrize("unicode", [False, pytest.param(True, marks=pytest.mark.skipif(
+    fuentes.archivos_unicode() is None, reason="sin fuente TrueType instalada"))])
+def test_plantilla_da_el_mismo_texto_que_el_dibujo_directo(unicode):
+    for generar, datos in casos(unicode):
+        con_plantilla, directo = textos(generar(datos)), textos(generar(datos, usar_plantilla=False))
+        assert con_plantilla and con_plantilla == directo
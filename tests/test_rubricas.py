@@ -0,0 +1,30 @@
+import pytest
+
+from nucleo.rubricas import leer_rubrica
+
+VALIDA = ("Enunciado;Planteamiento;Resultado;sobre;peso\n"
+          "Punto 1;si;si;5;1\n"
+          "Punto 2; SI ;no;5;2\n")
+
+
+def test_rubrica_valida_se_compila_y_se_puede_volver_a_cargar():
+    rubrica = leer_rubrica(VALIDA.encode("utf-8"))
+    assert rubrica.estructura == (("Punto 1", ("Planteamiento", "Resultado")), ("Punto 2", ("Planteamiento",)))
+    assert rubrica.pesos.tolist() == [1.0, 2.0]
+    assert leer_rubrica(rubrica.a_csv()).version == rubrica.version
+
+
+@pytest.mark.parametrize("contenido, mensaje", [
+    ("Enunciado;Planteamiento;peso\nPunto 1;si;1\n", "columnas"),
+    ("Enunciado;Planteamiento;peso;sobre\nPunto 1;si;1;5\n", "columnas"),
+    ("Enunciado;sobre\nPunto 1;5\n", "columnas"),
+    ("Enunciado;Planteamiento;sobre;peso\nPunto 1;si;5;mucho\n", "numéricas"),
+    ("Enunciado;Planteamiento;sobre;peso\nPunto 1;si;cinco;1\n", "numéricas"),
+    ("Enunciado;Planteamiento;sobre;peso\nPunto 1;si;5;-1\n", "no negativos"),
+    ("Enunciado;Planteamiento;sobre;peso\nPunto 1;si;5;\n", "no negativos"),
+    ("Enunciado;Planteamiento;sobre;peso\nPunto 1;si;5;1\nPunto 1;no;5;1\n", "repetidos"),
+    ("Enunciado;Planteamiento;sobre;peso\n", "no tiene enunciados"),
+])
+def test_rubrica_mal_formada_se_rechaza(contenido, mensaje):
+    with pytest.raises(ValueError, match=mensaje):
+        leer_rubrica(contenido.encode("utf-8"))
@@ -1,6 +1,8 @@
 import streamlit as st
-import pandas as pd
 import io
+import os
+from nucleo.columnar import hay_pyarrow, parquet_desde_df
+from nucleo.fusion_notas import archivos_de_carpetas, cache_fusion, nombre_columna, unir_archivos
 
 # Configuración de la página de la aplicación
 st.set_page_config(layout="wide", page_title="Unificador de Calificaciones", page_icon="🔗")
@@ -8,46 +10,55 @@ st.set_page_config(layout="wide", page_title="Unificador de Calificaciones", pag
 # Título y descripción
 st.title("🔗 Unificador de Archivos de Calificaciones")
 st.write(
-    "Esta herramienta te permite cargar dos archivos CSV de calificaciones y unirlos en uno solo. "
-    "La unión se hace por la columna 'Estudiante'. Si un estudiante falta en uno de los archivos, "
-    "su nota aparecerá en blanco en la columna correspondiente."
+    "Esta herramienta te permite cargar varios archivos CSV de calificaciones (o indicar las carpetas donde están) "
+    "y unirlos en uno solo. "
+    "La unión se hace por la columna 'Estudiante', sin distinguir tildes, mayúsculas ni espacios. "
+    "Si un estudiante falta en uno de los archivos, su nota aparecerá en blanco en la columna correspondiente."
 )
 
 st.markdown("---")
 
-# Columnas para cargar los archivos
-col1, col2 = st.columns(2)
+origen = st.radio("Origen de los archivos", ["Subir archivos", "Carpetas"], horizontal=True)
 
-with col1:
-    st.subheader("Archivo 1: Calificaciones Finales")
-    file1 = st.file_uploader("Carga el archivo `calificaciones_finales.csv`", type=["csv"], key="file1")
+if origen == "Subir archivos":
+    # Carga de los archivos (cualquier cantidad)
+    archivos = st.file_uploader(
+        "Carga los archivos de calificaciones (p. ej. `calificaciones_finales.csv`, `calificaciones_finales_tarea_1.csv` "
+        "o la instantánea `calificaciones_finales.parquet`)",
+        type=["csv", "parquet"], accept_multiple_files=True
+    )
+    candidatos = [(nombre_columna(archivo.name), archivo.name, archivo) for archivo in archivos or []]
+else:
+    # Modo carpeta: cada rerun vuelve a mirar las carpetas, pero solo se leen los archivos nuevos o modificados.
+    texto_carpetas = st.text_area(
+        "Carpetas con archivos de calificaciones (una por línea; p. ej. `Calificaciones_finales_corte_1`)",
+        key="carpetas_notas")
+    carpetas = [c.strip() for c in texto_carpetas.splitlines() if c.strip()]
+    faltantes = [c for c in carpetas if not os.path.isdir(c)]
+    if faltantes:
+        st.error("No se encontró la carpeta: " + "; ".join(faltantes))
+    candidatos = [(nombre, os.path.relpath(ruta), ruta) for nombre, ruta in archivos_de_carpetas(
+        [c for c in carpetas if c not in faltantes])]
+    if carpetas and not faltantes:
+        st.caption(f"{len(candidatos)} archivo(s) de calificaciones encontrados.")
+        st.button("🔄 Volver a leer las carpetas")  # pulsarlo basta para volver a ejecutar la app
 
-with col2:
-    st.subheader("Archivo 2: Tarea 1")
-    file2 = st.file_uploader("Carga el archivo `calificaciones_finales_tarea_1.csv`", type=["csv"], key="file2")
+# Lógica para procesar y unir los archivos una vez que hay al menos dos
+if len(candidatos) >= 2:
+    st.subheader("Nombre de la columna de cada archivo")
+    fuentes = []
+    cols = st.columns(min(len(candidatos), 4))
+    for i, (sugerido, etiqueta, archivo) in enumerate(candidatos):
+        with cols[i % len(cols)]:
+            columna = st.text_input(etiqueta, value=sugerido, key=f"columna_{i}_{etiqueta}")
+        fuentes.append((columna.strip() or sugerido, archivo))
 
-# Lógica para procesar y unir los archivos una vez que ambos han sido cargados
-if file1 is not None and file2 is not None:
     try:
-        # Cargar los archivos CSV en DataFrames de pandas
-        df1 = pd.read_csv(file1)
-        df2 = pd.read_csv(file2)
-
-        # Renombrar las columnas de calificación para que sean únicas y claras
-        df1 = df1.rename(columns={"Calificacion Final": "Nota Final", "Estudiante": "Estudiante"})
-        df2 = df2.rename(columns={"Calificacion Final": "Nota Tarea 1", "Estudiante": "Estudiante"})
-        
-        # Eliminar la columna 'Fecha' si existe
-        if 'Fecha' in df1.columns:
-            df1 = df1.drop(columns=['Fecha'])
-        if 'Fecha' in df2.columns:
-            df2 = df2.drop(columns=['Fecha'])
-        
-        # Unir los dos DataFrames
-        merged_df = pd.merge(df1, df2, on="Estudiante", how="outer")
+        # Cada archivo se lee una sola vez mientras no cambie su contenido
+        merged_df = unir_archivos(fuentes, cache=cache_fusion())
 
         st.markdown("---")
-        st.success("✅ ¡Archivos unidos exitosamente! Aquí está el resultado consolidado:")
+        st.success(f"✅ ¡{len(candidatos)} archivos unidos exitosamente! Aquí está el resultado consolidado:")
         
         # Mostrar la tabla con los resultados
         st.dataframe(merged_df.fillna(''))
@@ -55,8 +66,7 @@ if file1 is not None and file2 is not None:
         # Preparar el archivo para la descarga
         output = io.StringIO()
         
-        # --- LÍNEA MODIFICADA AQUÍ ---
-        # Se agrega el parámetro 'decimal=","' para usar comas en los números decimales.
+        # Se usa 'decimal=","' para usar comas en los números decimales.
         merged_df.to_csv(output, index=False, decimal=',')
         
         csv_data = output.getvalue()
@@ -69,6 +79,17 @@ if file1 is not None and file2 is not None:
             mime="text/csv",
         )
 
+        # El mismo consolidado en Parquet: notas numéricas, para unirlo de nuevo sin reinterpretar texto.
+        if hay_pyarrow():
+            st.download_button(
+                label="📥 Descargar Archivo Consolidado (.parquet)",
+                data=parquet_desde_df(merged_df),
+                file_name="calificaciones_consolidadas.parquet",
+                mime="application/vnd.apache.parquet",
+            )
+
     except Exception as e:
         st.error(f"Ocurrió un error al procesar los archivos: {e}")
-        st.warning("Por favor, asegúrate de que ambos archivos tienen una columna llamada 'Estudiante'.")
\ No newline at end of file
+        st.warning("Por favor, asegúrate de que todos los archivos tienen una columna llamada 'Estudiante'.")
+elif candidatos:
+    st.info("Se necesitan al menos dos archivos para unirlos.")